@@ -1,7 +1,17 @@
-import pickle
-from pathlib import Path
+import io
+import json
+import logging
+import os
+
 import streamlit as st
-from streamlit_option_menu import option_menu
+
+from mediguard import metrics, startup
+from mediguard.assets import asset_url, stylesheet_tag
+from mediguard.models import dataset_stamp, get_spec
+
+logger = logging.getLogger("mediguard.app")
+
+startup.render_started()
 
 # ==============================
 # 1. PAGE CONFIGURATION
@@ -16,316 +26,156 @@ st.set_page_config(
 # ==============================
 # 2. GLOBAL STYLING (ADVANCED UI)
 # ==============================
-st.markdown(
-    """
-    <style>
-    /* Import modern font */
-    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700&display=swap');
+# The stylesheet is a static, content-hashed asset (static/mediguard.css), so
+# the browser caches it and reruns only carry this link tag.
+st.markdown(stylesheet_tag(), unsafe_allow_html=True)
 
-    * {
-        font-family: 'Poppins', sans-serif;
-    }
-
-    .stApp {
-        background: radial-gradient(circle at top left, #e0f2ff 0, #f9fafb 35%, #ffffff 100%);
-    }
+# ==============================
+# 3. MODEL LOADING
+# ==============================
+# Models are loaded on first use by the page that needs them, so a session
+# that only visits one page never pays for unpickling (or importing sklearn
+# for) the other two. The registry is shared by all sessions and swaps in
+# retrained model files in the background; each sits behind a process-wide
+# LRU prediction cache.
+@st.cache_resource
+def get_registry():
+    from mediguard.registry import ModelRegistry
 
-    /* SIDEBAR */
-    [data-testid="stSidebar"] {
-        background: linear-gradient(180deg, #ffffff 0%, #f3f6fb 40%, #e8f0ff 100%);
-        border-right: 1px solid #e0e7ff;
-        box-shadow: 4px 0 18px rgba(15, 23, 42, 0.08);
-    }
+    return ModelRegistry().start()
 
-    [data-testid="stSidebar"] .css-1d391kg, /* older versions */
-    [data-testid="stSidebar"] > div {
-        padding-top: 1.5rem;
-    }
 
-    /* TOP HERO AREA */
-    .hero-card {
-        background: linear-gradient(120deg, #2563eb 0%, #38bdf8 40%, #22c55e 100%);
-        border-radius: 24px;
-        padding: 22px 26px;
-        color: white;
-        box-shadow: 0 22px 45px rgba(15, 23, 42, 0.35);
-        position: relative;
-        overflow: hidden;
-    }
-    .hero-title {
-        font-size: 2.0rem;
-        font-weight: 700;
-        letter-spacing: 0.03em;
-        margin-bottom: 0.4rem;
-    }
-    .hero-subtitle {
-        font-size: 0.95rem;
-        opacity: 0.95;
-        max-width: 600px;
-    }
-    .hero-badge {
-        display: inline-flex;
-        align-items: center;
-        gap: 6px;
-        margin-top: 0.8rem;
-        padding: 6px 12px;
-        border-radius: 999px;
-        background: rgba(15, 23, 42, 0.15);
-        font-size: 0.8rem;
-    }
-    .hero-pill-row {
-        display: flex;
-        flex-wrap: wrap;
-        gap: 6px;
-        margin-top: 0.6rem;
-        font-size: 0.78rem;
-    }
-    .hero-pill {
-        padding: 4px 10px;
-        border-radius: 999px;
-        background: rgba(15, 23, 42, 0.16);
-        border: 1px solid rgba(15, 23, 42, 0.16);
-    }
-    .hero-fade-circle {
-        position: absolute;
-        width: 260px;
-        height: 260px;
-        border-radius: 999px;
-        background: radial-gradient(circle, rgba(255,255,255,0.35), transparent 60%);
-        right: -60px;
-        top: -40px;
-        filter: blur(1px);
-        opacity: 0.9;
-    }
-    .hero-fade-circle-small {
-        position: absolute;
-        width: 170px;
-        height: 170px;
-        border-radius: 999px;
-        background: radial-gradient(circle, rgba(15,23,42,0.2), transparent 65%);
-        right: 60px;
-        bottom: -50px;
-        opacity: 0.8;
-    }
-
-    /* INPUT CARDS */
-    .section-card {
-        background: rgba(255, 255, 255, 0.85);
-        border-radius: 20px;
-        padding: 18px 18px 8px 18px;
-        border: 1px solid rgba(148, 163, 184, 0.35);
-        box-shadow: 0 12px 30px rgba(15, 23, 42, 0.06);
-        backdrop-filter: blur(12px);
-        margin-top: 18px;
-        transition: transform 0.15s ease, box-shadow 0.15s ease, border-color 0.15s ease;
-    }
-    .section-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 18px 45px rgba(15, 23, 42, 0.10);
-        border-color: rgba(59, 130, 246, 0.65);
-    }
-    .section-header {
-        font-size: 0.9rem;
-        font-weight: 600;
-        color: #0f172a;
-        display: flex;
-        align-items: center;
-        gap: 6px;
-        margin-bottom: 0.4rem;
-    }
-    .section-subtext {
-        font-size: 0.78rem;
-        color: #6b7280;
-        margin-bottom: 0.7rem;
-    }
+# Every prediction is queued to the audit log, which a background thread
+# flushes to disk in batches (see mediguard.audit).
+@st.cache_resource
+def get_audit_log():
+    from mediguard.audit import AuditLog
 
-    /* STREAMLIT INPUT TWEAKS */
-    label {
-        font-size: 0.83rem !important;
-        font-weight: 500 !important;
-        color: #0f172a !important;
-    }
+    return AuditLog.from_env("app")
 
-    input[type="number"], input[type="text"] {
-        border-radius: 11px !important;
-        border: 1px solid #d1d5db !important;
-        padding: 7px 10px !important;
-        font-size: 0.86rem !important;
-    }
 
-    .stSelectbox > div > div {
-        border-radius: 11px !important;
-        border: 1px solid #d1d5db !important;
-        font-size: 0.86rem !important;
-    }
+# Running per-feature statistics of every scored input, compared against the
+# training data and checkpointed in the background (see mediguard.drift).
+@st.cache_resource
+def get_drift_monitor():
+    from mediguard.drift import DriftMonitor
 
-    .stSlider > div > div > div {
-        color: #2563eb !important;
-    }
+    return DriftMonitor.from_env("app")
 
-    /* BUTTONS */
-    .stButton > button {
-        background: linear-gradient(120deg, #2563eb, #1d4ed8, #22c55e);
-        color: white;
-        border: none;
-        border-radius: 999px;
-        padding: 0.6rem 1.6rem;
-        font-weight: 600;
-        font-size: 0.95rem;
-        letter-spacing: 0.03em;
-        text-transform: uppercase;
-        width: 100%;
-        box-shadow: 0 16px 35px rgba(37, 99, 235, 0.45);
-        transition: all 0.18s ease-in-out;
-    }
-    .stButton > button:hover {
-        transform: translateY(-1.5px) scale(1.01);
-        box-shadow: 0 20px 50px rgba(37, 99, 235, 0.60);
-    }
 
-    /* RESULT CARDS */
-    .result-wrapper {
-        margin-top: 20px;
-    }
-    .result-card {
-        border-radius: 20px;
-        padding: 18px 18px 14px 18px;
-        display: flex;
-        gap: 14px;
-        align-items: flex-start;
-        border: 1px solid;
-        box-shadow: 0 16px 32px rgba(15,23,42,0.16);
-    }
-    .result-card.risk {
-        background: radial-gradient(circle at top left, #fef2f2, #fee2e2);
-        border-color: #f97373;
-    }
-    .result-card.safe {
-        background: radial-gradient(circle at top left, #ecfdf5, #dcfce7);
-        border-color: #22c55e;
-    }
-    .result-icon {
-        font-size: 1.65rem;
-        margin-top: 4px;
-    }
-    .result-content-title {
-        font-size: 1.0rem;
-        font-weight: 600;
-        margin-bottom: 2px;
-    }
-    .result-content-body {
-        font-size: 0.86rem;
-        color: #4b5563;
-    }
-    .result-caption {
-        font-size: 0.78rem;
-        margin-top: 6px;
-        color: #6b7280;
-    }
+# Timing histograms are kept in-process; set MEDIGUARD_METRICS_PORT to expose
+# them for scraping (one endpoint per server process, not per session).
+@st.cache_resource
+def start_metrics_server():
+    port = os.environ.get("MEDIGUARD_METRICS_PORT")
+    host = os.environ.get("MEDIGUARD_METRICS_HOST", "127.0.0.1")
+    return metrics.serve(int(port), host) if port else None
 
-    /* SMALL METRIC TAGS */
-    .metric-row {
-        display: flex;
-        flex-wrap: wrap;
-        gap: 12px;
-        margin-top: 0.4rem;
-        font-size: 0.78rem;
-    }
-    .metric-pill {
-        padding: 3px 10px;
-        border-radius: 999px;
-        background: rgba(148, 163, 184, 0.14);
-        border: 1px solid rgba(148, 163, 184, 0.5);
-        display: inline-flex;
-        align-items: center;
-        gap: 4px;
-    }
 
-    /* DISCLAIMER BOX */
-    .disclaimer-box {
-        font-size: 0.75rem;
-        border-radius: 16px;
-        padding: 10px 12px;
-        border: 1px dashed rgba(148, 163, 184, 0.7);
-        background: rgba(248, 250, 252, 0.9);
-        margin-top: 10px;
-    }
+start_metrics_server()
 
-    </style>
-    """,
-    unsafe_allow_html=True
-)
 
-# ==============================
-# 3. MODEL LOADING
-# ==============================
-working_dir = Path(__file__).resolve().parent
-
-
-@st.cache_resource
-def load_model(filename: str):
-    path = working_dir / "saved_models" / filename
+def load_model(name: str):
     try:
-        with open(path, "rb") as f:
-            return pickle.load(f)
+        with startup.phase(f"load_model:{name}"):
+            return get_registry().get(name)
     except FileNotFoundError:
         return None
     except Exception as e:
-        st.error(f"Error loading {filename}: {e}")
+        st.error(f"Error loading the {name} model: {e}")
         return None
 
 
-diabetes_model = load_model("diabetes_model.sav")
-heart_disease_model = load_model("heart_disease_model.sav")
-parkinsons_model = load_model("parkinsons_model.sav")
-
 # ==============================
 # 4. SIDEBAR NAVIGATION
 # ==============================
-with st.sidebar:
-    st.image("https://cdn-icons-png.flaticon.com/512/3063/3063176.png", width=80)
-    st.markdown("### MediGuard")
-    st.caption("AI-Powered Multi-Disease Screening")
-
-    selected = option_menu(
-        menu_title=None,
-        options=["Diabetes", "Heart Disease", "Parkinson's"],
-        icons=["droplet-half", "heart-pulse", "activity"],
-        default_index=0,
-        styles={
-            "container": {
-                "padding": "0!important",
-                "background-color": "rgba(255,255,255,0)",
-            },
-            "icon": {"color": "#2563eb", "font-size": "16px"},
-            "nav-link": {
-                "font-size": "15px",
-                "text-align": "left",
-                "margin": "4px 0",
-                "border-radius": "999px",
-                "padding": "6px 14px",
-                "border": "1px solid rgba(148,163,184,0.35)",
-            },
-            "nav-link-selected": {
-                "background-color": "#2563eb",
+def render_sidebar() -> str:
+    """Render the navigation sidebar; returns the selected page."""
+    with st.sidebar:
+        with startup.phase("import:streamlit_option_menu"):
+            from streamlit_option_menu import option_menu
+
+        st.markdown(
+            f'<img src="{asset_url("logo.svg")}" width="80" alt="MediGuard logo">',
+            unsafe_allow_html=True,
+        )
+        st.markdown("### MediGuard")
+        st.caption("AI-Powered Multi-Disease Screening")
+
+        selected = option_menu(
+            menu_title=None,
+            options=["Diabetes", "Heart Disease", "Parkinson's", "Full Screening"],
+            icons=["droplet-half", "heart-pulse", "activity", "clipboard2-pulse"],
+            default_index=0,
+            key="page",
+            styles={
+                "container": {
+                    "padding": "0!important",
+                    "background-color": "rgba(255,255,255,0)",
+                },
+                "icon": {"color": "#2563eb", "font-size": "16px"},
+                "nav-link": {
+                    "font-size": "15px",
+                    "text-align": "left",
+                    "margin": "4px 0",
+                    "border-radius": "999px",
+                    "padding": "6px 14px",
+                    "border": "1px solid rgba(148,163,184,0.35)",
+                },
+                "nav-link-selected": {
+                    "background-color": "#2563eb",
+                },
             },
-        },
-    )
+        )
+
+        st.markdown(
+            """
+            <div class="disclaimer-box">
+            <b>Disclaimer</b>: This assistant provides risk estimation based on model patterns only.  
+            It is not a substitute for clinical diagnosis, lab tests, or professional medical advice.
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
+    return selected
 
-    st.markdown(
-        """
-        <div class="disclaimer-box">
-        <b>Disclaimer</b>: This assistant provides risk estimation based on model patterns only.  
-        It is not a substitute for clinical diagnosis, lab tests, or professional medical advice.
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
 
 # ==============================
 # 5. RESULT DISPLAY HELPER
 # ==============================
-def display_result(prediction, positive_class, positive_msg, negative_msg):
+RESULT_MESSAGES = {
+    "diabetes": {
+        "positive_msg": "High Risk: Likely Diabetic Pattern Detected",
+        "negative_msg": "Low Risk: No Strong Diabetic Pattern Detected",
+    },
+    "heart": {
+        "positive_msg": "Alert: Model Suggests Cardiac Disease Pattern",
+        "negative_msg": "Reassuring: No Strong Cardiac Disease Pattern Detected",
+    },
+    "parkinsons": {
+        "positive_msg": "Positive Screen: Parkinson-like Voice Pattern Detected",
+        "negative_msg": "Negative Screen: No Strong Parkinson-like Voice Pattern Detected",
+    },
+}
+
+
+def contributors_html(contributors) -> str:
+    if not contributors:
+        return ""
+    items = "".join(
+        f'<li><span class="{"up" if value > 0 else "down"}">{"▲" if value > 0 else "▼"}</span> '
+        f'{label} ({"raises" if value > 0 else "lowers"} risk, {value:+.2f})</li>'
+        for label, value in contributors
+    )
+    return (
+        '<div class="result-caption">Main factors compared with an average patient:</div>'
+        f'<ol class="result-contributors">{items}</ol>'
+    )
+
+
+def display_result(prediction, positive_class, positive_msg, negative_msg, model_version=None,
+                   contributors=None):
+    factors = contributors_html(contributors)
     st.markdown("<div class='result-wrapper'>", unsafe_allow_html=True)
     if prediction[0] == positive_class:
         st.markdown(
@@ -337,7 +187,7 @@ def display_result(prediction, positive_class, positive_msg, negative_msg):
                     <div class="result-content-body">
                         The model detected a pattern consistent with elevated risk.  
                         Use this result as an early alert and discuss it with a qualified healthcare professional.
-                    </div>
+                    </div>{factors}
                     <div class="result-caption">
                         Recommended: Schedule a consultation, review lifestyle factors, and consider further diagnostic tests.
                     </div>
@@ -355,7 +205,7 @@ def display_result(prediction, positive_class, positive_msg, negative_msg):
                     <div class="result-content-title">{negative_msg}</div>
                     <div class="result-content-body">
                         Based on the information provided, the model did not detect strong indicators of this condition.
-                    </div>
+                    </div>{factors}
                     <div class="result-caption">
                         This is not a medical clearance. Continue regular check-ups and maintain a healthy lifestyle.
                     </div>
@@ -364,12 +214,143 @@ def display_result(prediction, positive_class, positive_msg, negative_msg):
             """,
             unsafe_allow_html=True,
         )
+    if model_version:
+        st.caption(f"Model version {model_version}")
     st.markdown("</div>", unsafe_allow_html=True)
 
 
+def top_contributors(name: str, entry, X, k: int = 5):
+    """Largest exact feature contributions to this prediction, or None if the
+    model is not linear (see mediguard.attribution)."""
+    from mediguard.attribution import get_attributor
+
+    try:
+        attributor = get_attributor(name, entry.model, entry.version)
+    except ValueError:
+        return None
+    schema = get_spec(name).schema
+    return [(schema[column].label, value) for column, value in attributor.top(X, k)]
+
+
+# The percentile index is built once per dataset (see mediguard.percentiles).
+# ``stamp`` is part of the cache key, so an edited or appended CSV is picked
+# up on the next rerun.
+@st.cache_resource(max_entries=8)
+def get_percentile_index(name: str, stamp: tuple):
+    from mediguard.percentiles import load_index
+
+    return load_index(name)
+
+
+def display_percentiles(name: str, X):
+    """Show where each submitted value sits among past positive and negative cases."""
+    try:
+        index = get_percentile_index(name, dataset_stamp(name))
+    except (OSError, ValueError) as e:
+        logger.warning("No percentile index for %s: %s", name, e)
+        return
+    ranks = index.percentiles(X)
+    summary = index.summary()
+    fields = get_spec(name).schema.fields
+    with st.expander("Where this patient sits in the population"):
+        st.dataframe(
+            {
+                "Feature": [f.label for f in fields],
+                "Value": X[0].tolist(),
+                "Percentile among positive cases": ranks[1][0].round(1),
+                "Percentile among negative cases": ranks[0][0].round(1),
+                "Median of positive cases": [summary[1][f.column]["p50"] for f in fields],
+                "Median of negative cases": [summary[0][f.column]["p50"] for f in fields],
+            },
+            hide_index=True,
+            use_container_width=True,
+        )
+
+
+# Keyed on the CSV's stamp like the percentile index, so it follows dataset edits.
+@st.cache_resource(max_entries=8)
+def get_neighbor_index(name: str, stamp: tuple):
+    from mediguard.neighbors import load_neighbor_index
+
+    return load_neighbor_index(name)
+
+
+def display_similar_cases(name: str, X, k: int = 5):
+    """List the ``k`` most similar historical cases and their outcomes."""
+    try:
+        index = get_neighbor_index(name, dataset_stamp(name))
+    except (OSError, ValueError) as e:
+        logger.warning("No neighbour index for %s: %s", name, e)
+        return
+    distances, rows = index.query(X, k)
+    fields = get_spec(name).schema.fields
+    table = {
+        "Case": rows[0].tolist(),
+        "Outcome": ["Positive" if index.y[r] == 1 else "Negative" for r in rows[0]],
+        "Distance": distances[0].round(3),
+    }
+    for j, field in enumerate(fields):
+        table[field.label] = index.X[rows[0], j]
+    with st.expander(f"{len(rows[0])} most similar past cases"):
+        st.dataframe(table, hide_index=True, use_container_width=True)
+
+
+def whatif_controls(name: str, example: str):
+    """Let the user pick up to two features to sweep on submit."""
+    schema = get_spec(name).schema
+    with st.expander("What-if sweep"):
+        columns = st.multiselect(
+            "Features to vary",
+            options=list(schema.columns),
+            format_func=lambda column: schema[column].label,
+            max_selections=2,
+            help=f"Shows how the risk score changes across each feature's range, {example}.",
+        )
+        resolution = st.slider("Grid points per feature", 10, 100, 50)
+    return columns, resolution
+
+
+def display_whatif(name: str, entry, X, columns, resolution: int):
+    """Plot the risk score over a 1-D or 2-D grid around the submitted patient."""
+    from matplotlib.figure import Figure
+
+    from mediguard.whatif import sweep
+
+    with metrics.span("whatif", model=name):
+        result = sweep(name, entry.model, entry.version, X[0], columns, resolution)
+    schema = get_spec(name).schema
+    positions = [schema.columns.index(c) for c in columns]
+    labels = [schema[c].label for c in columns]
+    fig = Figure(figsize=(7, 4))
+    ax = fig.subplots()
+    if len(columns) == 1:
+        ax.plot(result.axes[0], result.scores, color="#2563eb")
+        ax.axhline(0, color="#6b7280", linestyle="--", linewidth=1)
+        ax.axvline(X[0, positions[0]], color="#111827", linewidth=1)
+        ax.set_xlabel(labels[0])
+        ax.set_ylabel("Risk score (> 0: positive)")
+        caption = "The dashed line is the decision boundary; the solid line marks this patient."
+    else:
+        limit = float(abs(result.scores).max()) or 1.0
+        mesh = ax.pcolormesh(result.axes[1], result.axes[0], result.scores, cmap="RdYlGn_r",
+                             vmin=-limit, vmax=limit, shading="auto")
+        if result.scores.min() < 0 < result.scores.max():
+            ax.contour(result.axes[1], result.axes[0], result.scores, levels=[0], colors="#111827")
+        ax.scatter([X[0, positions[1]]], [X[0, positions[0]]], marker="x", color="#111827")
+        ax.set_xlabel(labels[1])
+        ax.set_ylabel(labels[0])
+        fig.colorbar(mesh, ax=ax, label="Risk score (> 0: positive)")
+        caption = "The black contour is the decision boundary; the cross marks this patient."
+    st.pyplot(fig)
+    st.caption(caption)
+
+
 # ==============================
 # 6. PAGE-SPECIFIC UIs
 # ==============================
+# Each page's form and result live in a fragment: submitting a form reruns
+# only that fragment, leaving the styling, sidebar and header untouched.
+# The model is looked up inside the fragment so hot reloads still apply.
 
 # ---- HEADER (CHANGES BY PAGE) ----
 def render_header(title_icon: str, title_text: str, subtitle: str, tags: list[str]):
@@ -415,17 +396,60 @@ def render_header(title_icon: str, title_text: str, subtitle: str, tags: list[st
         )
 
 
-# === DIABETES PAGE ===
-if selected == "Diabetes":
-    render_header(
-        "🩸",
-        "Diabetes Risk Assessment",
-        "Screen type-2 diabetes risk using routinely collected clinical parameters.",
-        ["Fasting glucose", "Blood pressure", "BMI", "Family history proxy"],
+
+# ---- FORM FIELDS (RENDERED FROM THE FEATURE SCHEMA) ----
+def field_input(container, field, value=None):
+    """Render the widget for one schema field and return its encoded value.
+
+    ``value`` pre-fills the widget instead of the field's default.
+    """
+    value = field.default if value is None else value
+    if field.widget == "select":
+        codes = dict(field.choices)
+        index = field.codes.index(value) if value in field.codes else 0
+        return codes[container.selectbox(field.label, options=list(codes), index=index, help=field.help)]
+    if field.widget == "slider":
+        return container.slider(
+            field.label, int(field.min), int(field.max), int(value), help=field.help
+        )
+    cast = int if field.dtype == "int" else float
+    return container.number_input(
+        field.label,
+        min_value=None if field.min is None else cast(field.min),
+        max_value=None if field.max is None else cast(field.max),
+        value=cast(value),
+        step=field.step,
+        format=None if field.dtype == "int" else f"%.{field.decimals}f",
+        help=field.help,
     )
 
+
+def render_fields(schema, layout, defaults=None) -> dict:
+    """Render one row of columns; ``layout`` lists the fields in each column.
+
+    ``defaults`` optionally maps columns to pre-filled values.
+    """
+    defaults = defaults or {}
+    values = {}
+    for col, columns in zip(st.columns(len(layout)), layout):
+        for column in columns:
+            values[column] = field_input(col, schema[column], defaults.get(column))
+    return values
+
+
+@st.cache_data(max_entries=32, show_spinner="Analysing the recording...")
+def extract_voice_features(data: bytes) -> dict:
+    from mediguard.acoustic import extract_features
+
+    return extract_features(io.BytesIO(data))
+
+
+# === DIABETES PAGE ===
+@st.fragment
+def diabetes_page():
+    diabetes_model = load_model("diabetes")
     if diabetes_model is None:
-        st.warning("Model file not found. Ensure 'diabetes_model.sav' exists in 'saved_models/'.")
+        st.warning("Model file not found. Ensure 'diabetes_model.sav' exists in 'saved models/'.")
     else:
         with st.form("diabetes_form"):
             st.markdown(
@@ -439,102 +463,46 @@ if selected == "Diabetes":
                 """,
                 unsafe_allow_html=True,
             )
-            col1, col2, col3 = st.columns(3)
-
-            with col1:
-                Pregnancies = st.number_input(
-                    "Pregnancies",
-                    min_value=0,
-                    max_value=20,
-                    step=1,
-                    help="Number of times pregnant (0 if not applicable).",
-                )
-                SkinThickness = st.number_input(
-                    "Skin Thickness (mm)",
-                    min_value=0,
-                    max_value=100,
-                    value=20,
-                    help="Triceps skinfold thickness.",
-                )
-                DiabetesPedigreeFunction = st.number_input(
-                    "Diabetes Pedigree Function",
-                    min_value=0.0,
-                    max_value=2.5,
-                    value=0.47,
-                    format="%.3f",
-                    help="Proxy for genetic predisposition based on family history.",
-                )
-
-            with col2:
-                Glucose = st.number_input(
-                    "Glucose Level (mg/dL)",
-                    min_value=0,
-                    max_value=500,
-                    value=100,
-                    help="Plasma glucose concentration.",
-                )
-                Insulin = st.number_input(
-                    "Insulin Level (µU/mL)",
-                    min_value=0,
-                    max_value=900,
-                    value=80,
-                    help="2-hour serum insulin.",
-                )
-                Age = st.number_input(
-                    "Age (years)",
-                    min_value=0,
-                    max_value=120,
-                    value=30,
-                )
-
-            with col3:
-                BloodPressure = st.number_input(
-                    "Blood Pressure (mm Hg)",
-                    min_value=0,
-                    max_value=200,
-                    value=70,
-                )
-                BMI = st.number_input(
-                    "Body Mass Index (BMI)",
-                    min_value=0.0,
-                    max_value=70.0,
-                    value=25.0,
-                    format="%.1f",
-                )
-
+            schema = get_spec("diabetes").schema
+            values = render_fields(schema, [
+                ["Pregnancies", "SkinThickness", "DiabetesPedigreeFunction"],
+                ["Glucose", "Insulin", "Age"],
+                ["BloodPressure", "BMI"],
+            ])
+
+            sweep_columns, resolution = whatif_controls("diabetes", "e.g. Glucose and BMI")
             st.markdown("")  # small spacing
             submitted = st.form_submit_button("Run Diabetes Risk Analysis")
 
             if submitted:
-                user_input = [
-                    Pregnancies,
-                    Glucose,
-                    BloodPressure,
-                    SkinThickness,
-                    Insulin,
-                    BMI,
-                    DiabetesPedigreeFunction,
-                    Age,
-                ]
-                prediction = diabetes_model.predict([user_input])
-                display_result(
-                    prediction,
-                    positive_class=1,
-                    positive_msg="High Risk: Likely Diabetic Pattern Detected",
-                    negative_msg="Low Risk: No Strong Diabetic Pattern Detected",
+                with metrics.span("input_assembly", model="diabetes"):
+                    X = schema.from_values(values)
+                prediction = diabetes_model.predict(X)
+                get_audit_log().record("diabetes", X, prediction, diabetes_model.version)
+                get_drift_monitor().observe("diabetes", X)
+                logger.info(
+                    "diabetes prediction=%s model_version=%s", prediction[0], diabetes_model.version
                 )
+                with metrics.span("render_result", model="diabetes"):
+                    display_result(
+                        prediction,
+                        positive_class=1,
+                        **RESULT_MESSAGES["diabetes"],
+                        model_version=diabetes_model.version,
+                        contributors=top_contributors("diabetes", diabetes_model, X),
+                    )
+                display_percentiles("diabetes", X)
+                display_similar_cases("diabetes", X)
+                if sweep_columns:
+                    display_whatif("diabetes", diabetes_model, X, sweep_columns, resolution)
 
-# === HEART DISEASE PAGE ===
-if selected == "Heart Disease":
-    render_header(
-        "❤️",
-        "Cardiovascular Risk Evaluation",
-        "Estimate the presence of heart disease using classic cardiology parameters.",
-        ["Chest pain profile", "Cholesterol", "Stress test", "ECG pattern"],
-    )
 
+# === HEART DISEASE PAGE ===
+@st.fragment
+def heart_disease_page():
+    heart_disease_model = load_model("heart")
     if heart_disease_model is None:
-        st.warning("Model file not found. Ensure 'heart_disease_model.sav' exists in 'saved_models/'.")
+        st.warning("Model file not found. Ensure 'heart_disease_model.sav' exists in 'saved models/'.")
     else:
         with st.form("heart_form"):
             st.markdown(
@@ -549,117 +517,72 @@ if selected == "Heart Disease":
                 unsafe_allow_html=True,
             )
 
-            col1, col2, col3 = st.columns(3)
-
-            with col1:
-                age = st.number_input("Age (years)", min_value=1, max_value=120, value=50)
-                trestbps = st.number_input(
-                    "Resting Blood Pressure (mm Hg)",
-                    min_value=50,
-                    max_value=250,
-                    value=120,
-                )
-                restecg = st.selectbox(
-                    "Resting ECG Result",
-                    options=[0, 1, 2],
-                    format_func=lambda x: ["Normal", "ST-T Wave Abnormality", "Left Ventricular Hypertrophy"][x],
-                )
-                oldpeak = st.number_input(
-                    "ST Depression (Oldpeak)",
-                    min_value=0.0,
-                    max_value=10.0,
-                    value=1.0,
-                    step=0.1,
-                    help="ST depression induced by exercise relative to rest.",
-                )
-
-            with col2:
-                sex_opt = st.selectbox("Sex", options=["Male", "Female"])
-                sex = 1 if sex_opt == "Male" else 0
-
-                chol = st.number_input(
-                    "Serum Cholesterol (mg/dL)",
-                    min_value=100,
-                    max_value=600,
-                    value=200,
-                )
-                thalach = st.number_input(
-                    "Max Heart Rate Achieved (bpm)",
-                    min_value=60,
-                    max_value=220,
-                    value=150,
-                )
-                slope = st.selectbox(
-                    "Slope of Peak Exercise ST Segment",
-                    options=[0, 1, 2],
-                    format_func=lambda x: ["Upsloping", "Flat", "Downsloping"][x],
-                )
-
-            with col3:
-                cp_opt = st.selectbox(
-                    "Chest Pain Type",
-                    options=["Typical Angina", "Atypical Angina", "Non-anginal Pain", "Asymptomatic"],
-                )
-                cp_mapping = {
-                    "Typical Angina": 0,
-                    "Atypical Angina": 1,
-                    "Non-anginal Pain": 2,
-                    "Asymptomatic": 3,
-                }
-                cp = cp_mapping[cp_opt]
-
-                fbs_opt = st.selectbox("Fasting Blood Sugar > 120 mg/dL?", options=["No", "Yes"])
-                fbs = 1 if fbs_opt == "Yes" else 0
-
-                exang_opt = st.selectbox("Exercise-Induced Angina?", options=["No", "Yes"])
-                exang = 1 if exang_opt == "Yes" else 0
-
-                ca = st.slider("Number of Major Vessels (0–3) seen in Fluoroscopy", 0, 3, 0)
-                thal = st.selectbox(
-                    "Thalassemia (Thal)",
-                    options=[0, 1, 2, 3],
-                    format_func=lambda x: ["Unknown", "Normal", "Fixed Defect", "Reversible Defect"][x],
-                )
+            schema = get_spec("heart").schema
+            values = render_fields(schema, [
+                ["age", "trestbps", "restecg", "oldpeak"],
+                ["sex", "chol", "thalach", "slope"],
+                ["cp", "fbs", "exang", "ca", "thal"],
+            ])
 
+            sweep_columns, resolution = whatif_controls(
+                "heart", "e.g. Serum Cholesterol and Resting Blood Pressure"
+            )
             st.markdown("")
             submitted = st.form_submit_button("Run Cardiac Risk Evaluation")
 
             if submitted:
-                user_input = [
-                    age,
-                    sex,
-                    cp,
-                    trestbps,
-                    chol,
-                    fbs,
-                    restecg,
-                    thalach,
-                    exang,
-                    oldpeak,
-                    slope,
-                    ca,
-                    thal,
-                ]
-                prediction = heart_disease_model.predict([user_input])
-                display_result(
-                    prediction,
-                    positive_class=1,
-                    positive_msg="Alert: Model Suggests Cardiac Disease Pattern",
-                    negative_msg="Reassuring: No Strong Cardiac Disease Pattern Detected",
+                with metrics.span("input_assembly", model="heart"):
+                    X = schema.from_values(values)
+                prediction = heart_disease_model.predict(X)
+                get_audit_log().record("heart", X, prediction, heart_disease_model.version)
+                get_drift_monitor().observe("heart", X)
+                logger.info(
+                    "heart prediction=%s model_version=%s", prediction[0], heart_disease_model.version
                 )
+                with metrics.span("render_result", model="heart"):
+                    display_result(
+                        prediction,
+                        positive_class=1,
+                        **RESULT_MESSAGES["heart"],
+                        model_version=heart_disease_model.version,
+                        contributors=top_contributors("heart", heart_disease_model, X),
+                    )
+                display_percentiles("heart", X)
+                display_similar_cases("heart", X)
+                if sweep_columns:
+                    display_whatif("heart", heart_disease_model, X, sweep_columns, resolution)
 
-# === PARKINSON'S PAGE ===
-if selected == "Parkinson's":
-    render_header(
-        "🧠",
-        "Parkinson’s Voice-Based Screening",
-        "Leverage advanced acoustic biomarkers from sustained phonation recordings.",
-        ["Jitter / Shimmer", "HNR", "Non-linear dynamics", "Frequency spread"],
-    )
 
+# === PARKINSON'S PAGE ===
+@st.fragment
+def parkinsons_page():
+    parkinsons_model = load_model("parkinsons")
     if parkinsons_model is None:
-        st.warning("Model file not found. Ensure 'parkinsons_model.sav' exists in 'saved_models/'.")
+        st.warning("Model file not found. Ensure 'parkinsons_model.sav' exists in 'saved models/'.")
     else:
+        recording = st.file_uploader(
+            "Sustained-phonation recording (optional)",
+            type=["wav"],
+            help="A held vowel such as “aaah”, as uncompressed PCM WAV. "
+            "The extracted measurements pre-fill the form below.",
+        )
+        voice = {}
+        if recording is not None:
+            try:
+                voice = extract_voice_features(recording.getvalue())
+            except ValueError as e:
+                st.error(f"Could not analyse {recording.name}: {e}")
+            else:
+                from mediguard.acoustic import UNMEASURED, implausible
+
+                skipped = implausible(voice)
+                voice = {k: v for k, v in voice.items() if k not in skipped}
+                st.success(f"Measurements extracted from {recording.name}; review them before running.")
+                st.info(f"{' and '.join(UNMEASURED)} are not measured from recordings; enter them manually.")
+                if skipped:
+                    st.warning("Left blank because the measurement fell outside the training data's range: "
+                               + ", ".join(skipped))
+
         with st.form("parkinsons_form"):
             # Voice frequency parameters
             st.markdown(
@@ -673,10 +596,8 @@ if selected == "Parkinson's":
                 """,
                 unsafe_allow_html=True,
             )
-            c1, c2, c3 = st.columns(3)
-            fo = c1.number_input("MDVP:Fo(Hz) – Avg Vocal Fundamental Frequency", value=119.99)
-            fhi = c2.number_input("MDVP:Fhi(Hz) – Max Vocal Fundamental Frequency", value=157.30)
-            flo = c3.number_input("MDVP:Flo(Hz) – Min Vocal Fundamental Frequency", value=74.99)
+            schema = get_spec("parkinsons").schema
+            values = render_fields(schema, [["MDVP:Fo(Hz)"], ["MDVP:Fhi(Hz)"], ["MDVP:Flo(Hz)"]], voice)
 
             # Jitter metrics
             st.markdown(
@@ -690,12 +611,9 @@ if selected == "Parkinson's":
                 """,
                 unsafe_allow_html=True,
             )
-            c1, c2, c3, c4, c5 = st.columns(5)
-            jitter_percent = c1.number_input("MDVP:Jitter(%)", value=0.00784, format="%.5f")
-            jitter_abs = c2.number_input("MDVP:Jitter(Abs)", value=0.00007, format="%.5f")
-            rap = c3.number_input("MDVP:RAP", value=0.00370, format="%.5f")
-            ppq = c4.number_input("MDVP:PPQ", value=0.00554, format="%.5f")
-            ddp = c5.number_input("Jitter:DDP", value=0.01109, format="%.5f")
+            values |= render_fields(schema, [
+                ["MDVP:Jitter(%)"], ["MDVP:Jitter(Abs)"], ["MDVP:RAP"], ["MDVP:PPQ"], ["Jitter:DDP"],
+            ], voice)
 
             # Shimmer metrics
             st.markdown(
@@ -709,13 +627,10 @@ if selected == "Parkinson's":
                 """,
                 unsafe_allow_html=True,
             )
-            c1, c2, c3, c4, c5, c6 = st.columns(6)
-            shimmer = c1.number_input("MDVP:Shimmer", value=0.04374, format="%.5f")
-            shimmer_db = c2.number_input("MDVP:Shimmer(dB)", value=0.426, format="%.3f")
-            apq3 = c3.number_input("Shimmer:APQ3", value=0.02182, format="%.5f")
-            apq5 = c4.number_input("Shimmer:APQ5", value=0.03130, format="%.5f")
-            apq = c5.number_input("MDVP:APQ", value=0.02971, format="%.5f")
-            dda = c6.number_input("Shimmer:DDA", value=0.06545, format="%.5f")
+            values |= render_fields(schema, [
+                ["MDVP:Shimmer"], ["MDVP:Shimmer(dB)"], ["Shimmer:APQ3"], ["Shimmer:APQ5"], ["MDVP:APQ"],
+                ["Shimmer:DDA"],
+            ], voice)
 
             # Harmonic & non-linear metrics
             st.markdown(
@@ -729,50 +644,142 @@ if selected == "Parkinson's":
                 """,
                 unsafe_allow_html=True,
             )
-            c1, c2, c3, c4 = st.columns(4)
-            nhr = c1.number_input("NHR", value=0.02211, format="%.5f")
-            hnr = c2.number_input("HNR", value=21.033)
-            rpde = c3.number_input("RPDE", value=0.414783, format="%.6f")
-            dfa = c4.number_input("DFA", value=0.815285, format="%.6f")
-
-            c5, c6, c7, c8 = st.columns(4)
-            spread1 = c5.number_input("spread1", value=-4.813031, format="%.6f")
-            spread2 = c6.number_input("spread2", value=0.266482, format="%.6f")
-            d2 = c7.number_input("D2", value=2.301442, format="%.6f")
-            ppe = c8.number_input("PPE", value=0.284654, format="%.6f")
+            values |= render_fields(schema, [["NHR"], ["HNR"], ["RPDE"], ["DFA"]], voice)
+            values |= render_fields(schema, [["spread1"], ["spread2"], ["D2"], ["PPE"]], voice)
 
+            sweep_columns, resolution = whatif_controls("parkinsons", "e.g. spread1 and PPE")
             st.markdown("")
             submitted = st.form_submit_button("Run Parkinson’s Voice Analysis")
 
             if submitted:
-                user_input = [
-                    fo,
-                    fhi,
-                    flo,
-                    jitter_percent,
-                    jitter_abs,
-                    rap,
-                    ppq,
-                    ddp,
-                    shimmer,
-                    shimmer_db,
-                    apq3,
-                    apq5,
-                    apq,
-                    dda,
-                    nhr,
-                    hnr,
-                    rpde,
-                    dfa,
-                    spread1,
-                    spread2,
-                    d2,
-                    ppe,
-                ]
-                prediction = parkinsons_model.predict([user_input])
-                display_result(
-                    prediction,
-                    positive_class=1,
-                    positive_msg="Positive Screen: Parkinson-like Voice Pattern Detected",
-                    negative_msg="Negative Screen: No Strong Parkinson-like Voice Pattern Detected",
+                with metrics.span("input_assembly", model="parkinsons"):
+                    X = schema.from_values(values)
+                prediction = parkinsons_model.predict(X)
+                get_audit_log().record("parkinsons", X, prediction, parkinsons_model.version)
+                get_drift_monitor().observe("parkinsons", X)
+                logger.info(
+                    "parkinsons prediction=%s model_version=%s", prediction[0], parkinsons_model.version
                 )
+                with metrics.span("render_result", model="parkinsons"):
+                    display_result(
+                        prediction,
+                        positive_class=1,
+                        **RESULT_MESSAGES["parkinsons"],
+                        model_version=parkinsons_model.version,
+                        contributors=top_contributors("parkinsons", parkinsons_model, X),
+                    )
+                display_percentiles("parkinsons", X)
+                display_similar_cases("parkinsons", X)
+                if sweep_columns:
+                    display_whatif("parkinsons", parkinsons_model, X, sweep_columns, resolution)
+
+
+# === FULL SCREENING PAGE ===
+def read_patient_record(upload) -> dict:
+    if upload.name.lower().endswith(".json"):
+        record = json.load(upload)
+        if isinstance(record, list) and record:
+            record = record[0]
+        if not isinstance(record, dict):
+            raise ValueError("Expected a JSON object of column: value pairs")
+        return record
+    import pandas as pd
+
+    frame = pd.read_csv(upload, encoding="utf-8-sig", nrows=1)
+    if frame.empty:
+        raise ValueError("The CSV file has no data rows")
+    return json.loads(frame.iloc[0].to_json())
+
+
+@st.fragment
+def full_screening_page():
+    upload = st.file_uploader(
+        "Patient record (one-row CSV or a JSON object)",
+        type=["csv", "json"],
+        help="Use the column names from the dataset files, e.g. Glucose, chol, MDVP:Fo(Hz).",
+    )
+    if upload is None:
+        st.info("Upload a patient record to score it against every model at once.")
+        return
+    try:
+        record = read_patient_record(upload)
+    except ValueError as e:
+        st.error(f"Could not read {upload.name}: {e}")
+        return
+    with st.expander("Patient record", expanded=False):
+        st.json(record)
+
+    if st.button("Run All Screenings"):
+        from mediguard.audit import audited
+        from mediguard.drift import monitored
+        from mediguard.screening import registry_predictor, screen_all
+
+        predict = audited(registry_predictor(get_registry()), get_audit_log())
+        screen = screen_all(record, monitored(predict, get_drift_monitor()))
+        columns = st.columns(len(screen["results"]))
+        for col, (name, result) in zip(columns, screen["results"].items()):
+            with col:
+                if result["status"] == "ok":
+                    logger.info(
+                        "%s prediction=%s model_version=%s",
+                        name, result["prediction"], result["model_version"],
+                    )
+                    display_result(
+                        [result["prediction"]],
+                        positive_class=1,
+                        **RESULT_MESSAGES[name],
+                        model_version=result["model_version"],
+                    )
+                    st.caption(f"Scored in {result['elapsed_ms']:.2f} ms")
+                elif result["status"] == "skipped":
+                    st.warning(f"{name.title()} skipped; missing: {', '.join(result['missing'])}")
+                else:
+                    st.error(f"{name.title()} failed: {result['error']}")
+        st.caption(f"All screenings completed in {screen['elapsed_ms']:.2f} ms")
+
+
+# ==============================
+# 7. RENDER
+# ==============================
+# The whole run is one timed (and, if enabled, profiled) section. Streamlit
+# ends a run early by raising, e.g. when a newer rerun supersedes it, so the
+# section is closed in a finally.
+_rerun = metrics.begin("rerun")
+selected = None
+try:
+    selected = render_sidebar()
+    if selected == "Diabetes":
+        render_header(
+            "🩸",
+            "Diabetes Risk Assessment",
+            "Screen type-2 diabetes risk using routinely collected clinical parameters.",
+            ["Fasting glucose", "Blood pressure", "BMI", "Family history proxy"],
+        )
+        diabetes_page()
+    elif selected == "Heart Disease":
+        render_header(
+            "❤️",
+            "Cardiovascular Risk Evaluation",
+            "Estimate the presence of heart disease using classic cardiology parameters.",
+            ["Chest pain profile", "Cholesterol", "Stress test", "ECG pattern"],
+        )
+        heart_disease_page()
+    elif selected == "Parkinson's":
+        render_header(
+            "🧠",
+            "Parkinson’s Voice-Based Screening",
+            "Leverage advanced acoustic biomarkers from sustained phonation recordings.",
+            ["Jitter / Shimmer", "HNR", "Non-linear dynamics", "Frequency spread"],
+        )
+        parkinsons_page()
+    elif selected == "Full Screening":
+        render_header(
+            "🩺",
+            "Full Intake Screening",
+            "Score one patient record against the diabetes, heart disease and Parkinson’s models at once.",
+            ["Single upload", "Concurrent scoring", "Per-model timing"],
+        )
+        full_screening_page()
+finally:
+    metrics.end(_rerun, page=selected)
+startup.render_finished()
@@ -0,0 +1 @@
+"""Shared model, scoring and tooling code for the MediGuard screening app."""
@@ -0,0 +1,442 @@
+"""Extract the Parkinson's voice features from sustained-phonation WAV files.
+
+Produces the 22 ``dataset/parkinsons.csv`` columns, in the order the model
+expects, from a recording of a held vowel. The file is read in blocks and
+analysed frame by frame, so memory stays flat for long recordings:
+
+* pitch and harmonicity come from windowed autocorrelation, computed for
+  every frame in a block at once with one FFT;
+* jitter and shimmer come from the glottal cycles found by peak picking
+  guided by each frame's pitch;
+* RPDE, DFA and D2 are computed on a bounded sample of the voiced signal;
+* PPE comes from the pitch track on a semitone scale.
+
+These follow the MDVP and Little et al. definitions but are not
+bit-identical to the tools that produced the dataset; ``implausible`` flags
+values outside the range seen in training. spread1 and spread2 are not
+measured: they come from a pitch-density estimate whose scale this module
+does not reproduce. The CLI leaves them (and any measure that could not be
+computed) blank, so ``mediguard.batch`` marks the row invalid instead of
+scoring values nobody measured; enter them from another tool first::
+
+    python -m mediguard.acoustic recordings/*.wav -o voice.csv --workers 4
+    python -m mediguard.batch parkinsons voice.csv scored.csv --id-column recording
+
+``--impute`` fills the blanks with the training median instead and lists
+them in an ``imputed`` column. Batch refuses such rows unless given
+``--allow-imputed``, for exploratory use only. Batches of recordings are
+spread across processes.
+"""
+import argparse
+import csv
+import sys
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from mediguard.models import get_spec, load_dataset
+
+FEATURES = get_spec("parkinsons").features
+# Left for manual entry; see the module docstring.
+UNMEASURED = ("spread1", "spread2")
+BLOCK_SECONDS = 1.0
+# Voiced audio kept for the nonlinear measures, which need the raw signal.
+NONLINEAR_SECONDS = 2.0
+NONLINEAR_RATE = 11025
+VOICING_THRESHOLD = 0.45
+# A shorter-lag autocorrelation peak within this fraction of the highest one
+# is taken as the period (see StreamingExtractor._pitch).
+PEAK_RATIO = 0.9
+MIN_PERIODS = 10
+# Semitone histogram used for PPE.
+PPE_RANGE = 6.0
+PPE_BIN = 0.1
+
+
+def iter_wav(source, block_seconds: float = BLOCK_SECONDS):
+    """Yield ``(sample_rate, block)`` with mono float64 blocks in [-1, 1]."""
+    with wave.open(str(source) if isinstance(source, Path) else source, "rb") as wav:
+        rate, width, channels = wav.getframerate(), wav.getsampwidth(), wav.getnchannels()
+        if wav.getcomptype() != "NONE":
+            raise ValueError("Only uncompressed PCM WAV files are supported")
+        block = max(1, int(rate * block_seconds))
+        while True:
+            raw = wav.readframes(block)
+            if not raw:
+                break
+            yield rate, _decode(raw, width, channels)
+
+
+def _decode(raw: bytes, width: int, channels: int) -> np.ndarray:
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float64) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2") / 32768.0
+    elif width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        samples = np.where(ints >= 1 << 23, ints - (1 << 24), ints) / float(1 << 23)
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4") / float(1 << 31)
+    else:
+        raise ValueError(f"Unsupported sample width {width}")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples
+
+
+class StreamingExtractor:
+    """Accumulates per-frame and per-cycle measurements over fed blocks."""
+
+    def __init__(self, sample_rate: int, fmin: float = 65.0, fmax: float = 600.0,
+                 frame_seconds: float = 0.04, hop_seconds: float = 0.01):
+        self.rate = sample_rate
+        self.frame = int(round(frame_seconds * sample_rate))
+        self.hop = int(round(hop_seconds * sample_rate))
+        self.min_lag = max(2, int(sample_rate / fmax))
+        self.max_lag = min(int(sample_rate / fmin), self.frame // 2)
+        self._window = np.hanning(self.frame)
+        self._nfft = 1 << (2 * self.frame - 1).bit_length()
+        # Autocorrelation of the window itself, to undo its taper (Boersma 1993).
+        window_ac = np.fft.irfft(np.abs(np.fft.rfft(self._window, self._nfft)) ** 2)[:self.frame]
+        self._window_ac = window_ac / window_ac[0]
+
+        self._buffer = np.zeros(0)
+        self._offset = 0          # absolute sample index of _buffer[0]
+        self._next_frame = 0      # absolute start of the next unanalysed frame
+        self._max_rms = 0.0
+        self._peak = None         # absolute index of the last glottal peak
+        self._peak_time = 0.0     # and its sub-sample position
+        self.f0, self.hnr = [], []
+        self.period_runs, self.amplitude_runs = [], []
+        self._voiced_blocks, self._voiced_samples = [], 0
+        self._decimate = max(1, sample_rate // NONLINEAR_RATE)
+
+    def feed(self, block: np.ndarray):
+        self._buffer = np.concatenate([self._buffer, block])
+        start = self._next_frame - self._offset
+        available = len(self._buffer) - start - self.frame
+        if available < 0:
+            return
+        n_frames = available // self.hop + 1
+        frames = sliding_window_view(self._buffer[start:], self.frame)[::self.hop][:n_frames]
+        periods, strengths = self._pitch(frames)
+        for i, (period, strength) in enumerate(zip(periods, strengths)):
+            frame_start = self._next_frame + i * self.hop
+            if period:
+                self.f0.append(self.rate / period)
+                r = min(strength, 0.999)
+                self.hnr.append(r)
+                self._track_cycles(frame_start, period)
+                if self._voiced_samples < NONLINEAR_SECONDS * self.rate:
+                    lo = frame_start - self._offset
+                    self._voiced_blocks.append(self._buffer[lo:lo + self.hop])
+                    self._voiced_samples += self.hop
+            else:
+                self._peak = None
+        self._next_frame += n_frames * self.hop
+        keep_from = self._next_frame if self._peak is None else min(self._next_frame, self._peak)
+        drop = keep_from - self._offset
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._offset += drop
+
+    def _pitch(self, frames: np.ndarray):
+        """Pitch period (samples, 0 if unvoiced) and autocorrelation peak per frame."""
+        x = frames - frames.mean(axis=1, keepdims=True)
+        rms = np.sqrt((x ** 2).mean(axis=1))
+        self._max_rms = max(self._max_rms, float(rms.max(initial=0)))
+        ac = np.fft.irfft(np.abs(np.fft.rfft(x * self._window, self._nfft, axis=1)) ** 2,
+                          axis=1)[:, :self.frame]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ac = ac / ac[:, :1] / self._window_ac
+        ac = np.nan_to_num(ac)
+        segment = ac[:, self.min_lag:self.max_lag + 1]
+        # Multiples of the period correlate about as well as the period itself,
+        # and the window correction inflates long lags further, so take the
+        # shortest-lag peak that comes close to the best one rather than the
+        # overall maximum.
+        peaks = np.zeros(segment.shape, dtype=bool)
+        peaks[:, 1:-1] = (segment[:, 1:-1] >= segment[:, :-2]) & (segment[:, 1:-1] > segment[:, 2:])
+        best = np.where(peaks, segment, -np.inf).max(axis=1, keepdims=True)
+        candidates = peaks & (segment >= PEAK_RATIO * best)
+        rows = np.arange(len(segment))
+        k = np.where(candidates.any(axis=1), candidates.argmax(axis=1), segment.argmax(axis=1))
+        strength = segment[rows, k]
+        # Parabolic interpolation around the peak for sub-sample periods.
+        left = segment[rows, np.maximum(k - 1, 0)]
+        right = segment[rows, np.minimum(k + 1, segment.shape[1] - 1)]
+        denom = left - 2 * strength + right
+        with np.errstate(invalid="ignore", divide="ignore"):
+            shift = np.where(denom < 0, 0.5 * (left - right) / denom, 0.0)
+        period = k + self.min_lag + np.clip(shift, -0.5, 0.5)
+        voiced = (strength > VOICING_THRESHOLD) & (rms > 0.05 * self._max_rms) & (rms > 0)
+        return np.where(voiced, period, 0.0), np.clip(strength, 0, 1)
+
+    def _track_cycles(self, frame_start: int, period: float):
+        x, base = self._buffer, self._offset
+        end = base + len(x)
+        if self._peak is None or self._peak < frame_start - 2 * period:
+            lo = frame_start
+            hi = min(frame_start + int(np.ceil(period)), end)
+            self._peak = lo + int(np.argmax(x[lo - base:hi - base]))
+            self._peak_time = self._refine(self._peak)
+            self.period_runs.append([])
+            self.amplitude_runs.append([])
+        while True:
+            lo = self._peak + int(0.8 * period)
+            hi = self._peak + int(1.25 * period) + 1
+            if lo >= frame_start + self.hop or hi > end:
+                break
+            peak = lo + int(np.argmax(x[lo - base:hi - base]))
+            peak_time = self._refine(peak)
+            cycle = x[self._peak - base:peak - base]
+            self.period_runs[-1].append((peak_time - self._peak_time) / self.rate)
+            self.amplitude_runs[-1].append(float(cycle.max() - cycle.min()))
+            self._peak, self._peak_time = peak, peak_time
+
+    def _refine(self, peak: int) -> float:
+        """Sub-sample position of the peak at ``peak``, by parabolic interpolation;
+        whole-sample peak times would add up to a sample of jitter per cycle."""
+        i = peak - self._offset
+        if i < 1 or i + 1 >= len(self._buffer):
+            return float(peak)
+        left, centre, right = self._buffer[i - 1:i + 2]
+        denom = left - 2 * centre + right
+        return peak + (0.5 * (left - right) / denom if denom < 0 else 0.0)
+
+    def result(self) -> dict:
+        periods = [np.asarray(run) for run in self.period_runs if len(run) >= 3]
+        amplitudes = [np.asarray(run) for run in self.amplitude_runs if len(run) >= 3]
+        if sum(len(p) for p in periods) < MIN_PERIODS:
+            raise ValueError("No sustained voicing found in the recording")
+        f0 = np.asarray(self.f0)
+        r = np.asarray(self.hnr)
+        mean_period = np.concatenate(periods).mean()
+        mean_amplitude = np.concatenate(amplitudes).mean()
+        voiced = np.concatenate(self._voiced_blocks)[::self._decimate]
+        rap = _perturbation(periods, 3) / mean_period
+        apq3 = _perturbation(amplitudes, 3) / mean_amplitude
+        features = {
+            "MDVP:Fo(Hz)": f0.mean(),
+            "MDVP:Fhi(Hz)": f0.max(),
+            "MDVP:Flo(Hz)": f0.min(),
+            # Stored as a fraction in dataset/parkinsons.csv despite the name.
+            "MDVP:Jitter(%)": _mean_abs_diff(periods) / mean_period,
+            "MDVP:Jitter(Abs)": _mean_abs_diff(periods),
+            "MDVP:RAP": rap,
+            "MDVP:PPQ": _perturbation(periods, 5) / mean_period,
+            "Jitter:DDP": 3 * rap,
+            "MDVP:Shimmer": _mean_abs_diff(amplitudes) / mean_amplitude,
+            "MDVP:Shimmer(dB)": _mean_abs_diff([20 * np.log10(np.maximum(a, 1e-12)) for a in amplitudes]),
+            "Shimmer:APQ3": apq3,
+            "Shimmer:APQ5": _perturbation(amplitudes, 5) / mean_amplitude,
+            "MDVP:APQ": _perturbation(amplitudes, 11) / mean_amplitude,
+            "Shimmer:DDA": 3 * apq3,
+            "NHR": float(np.mean((1 - r) / r)),
+            "HNR": float(np.mean(10 * np.log10(r / (1 - r)))),
+            "RPDE": rpde(voiced),
+            "DFA": dfa(voiced),
+            "D2": correlation_dimension(voiced),
+            "PPE": pitch_entropy(f0),
+        }
+        return {name: float(features[name]) for name in FEATURES if name in features}
+
+
+def _mean_abs_diff(runs) -> float:
+    diffs = np.concatenate([np.abs(np.diff(run)) for run in runs])
+    return float(diffs.mean())
+
+
+def _perturbation(runs, k: int) -> float:
+    """Mean absolute deviation of each value from its ``k``-point moving average."""
+    deviations = []
+    for run in runs:
+        if len(run) < k:
+            continue
+        average = sliding_window_view(run, k).mean(axis=1)
+        deviations.append(np.abs(run[k // 2:len(run) - k // 2] - average))
+    if not deviations:
+        return float("nan")
+    return float(np.concatenate(deviations).mean())
+
+
+def _embed(x: np.ndarray, dim: int, delay: int) -> np.ndarray:
+    span = (dim - 1) * delay
+    return sliding_window_view(x, span + 1)[:, ::delay]
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    x = x - x.mean()
+    peak = np.abs(x).max()
+    return x / peak if peak > 0 else x
+
+
+def rpde(x: np.ndarray, dim: int = 4, delay: int = 4, radius: float = 0.12,
+         max_points: int = 2000, horizon: int = 400) -> float:
+    """Recurrence period density entropy, normalized to [0, 1]."""
+    points = _embed(_normalize(x), dim, delay)[:max_points + horizon]
+    n = len(points) - horizon
+    if n <= 0:
+        return float("nan")
+    lags = np.arange(1, horizon + 1)
+    later = points[np.arange(n)[:, None] + lags]
+    inside = np.linalg.norm(later - points[:n, None, :], axis=2) < radius
+    # A recurrence is the first return to the ball after having left it.
+    returned = inside & (np.cumsum(~inside, axis=1) > 0)
+    has_return = returned.any(axis=1)
+    times = returned[has_return].argmax(axis=1) + 1
+    if len(times) == 0:
+        return float("nan")
+    density = np.bincount(times, minlength=horizon + 1)[1:] / len(times)
+    density = density[density > 0]
+    return float(-(density * np.log(density)).sum() / np.log(horizon))
+
+
+def dfa(x: np.ndarray, scales=None) -> float:
+    """Detrended fluctuation scaling exponent, mapped into (0, 1) by a logistic
+    function as in Little et al. (2007)."""
+    y = np.cumsum(x - x.mean())
+    if scales is None:
+        scales = np.unique(np.logspace(np.log10(50), np.log10(max(51, len(y) // 10)), 12).astype(int))
+    fluctuations = []
+    for n in scales:
+        boxes = y[:len(y) // n * n].reshape(-1, n)
+        t = np.arange(n) - (n - 1) / 2
+        slope = (boxes - boxes.mean(axis=1, keepdims=True)) @ t / (t @ t)
+        residual = boxes - boxes.mean(axis=1, keepdims=True) - np.outer(slope, t)
+        fluctuations.append(np.sqrt((residual ** 2).mean()))
+    alpha = np.polyfit(np.log(scales), np.log(fluctuations), 1)[0]
+    return float(1 / (1 + np.exp(-alpha)))
+
+
+def correlation_dimension(x: np.ndarray, dim: int = 6, delay: int = 4,
+                          max_points: int = 1000) -> float:
+    """Grassberger-Procaccia correlation dimension estimate."""
+    points = _embed(_normalize(x), dim, delay)
+    points = points[:: max(1, len(points) // max_points)][:max_points]
+    diff = points[:, None, :] - points[None, :, :]
+    distances = np.sqrt((diff ** 2).sum(axis=2))[np.triu_indices(len(points), 1)]
+    distances = distances[distances > 0]
+    radii = np.quantile(distances, [0.01, 0.02, 0.05, 0.1])
+    correlation = np.array([(distances < r).mean() for r in radii])
+    # Strictly periodic signals leave no pairs at the smallest radii.
+    usable = (radii > 0) & (correlation > 0)
+    if len(np.unique(radii[usable])) < 2:
+        return float("nan")
+    return float(np.polyfit(np.log(radii[usable]), np.log(correlation[usable]), 1)[0])
+
+
+def pitch_entropy(f0: np.ndarray) -> float:
+    """PPE from the pitch track on a semitone scale.
+
+    The track is whitened with a second-order linear predictor; PPE is the
+    normalized entropy of the residual's distribution.
+    """
+    semitones = 12 * np.log2(f0 / np.median(f0))
+    if len(semitones) > 3:
+        lagged = np.column_stack([semitones[1:-1], semitones[:-2]])
+        coef, *_ = np.linalg.lstsq(lagged, semitones[2:], rcond=None)
+        residual = semitones[2:] - lagged @ coef
+    else:
+        residual = semitones - semitones.mean()
+    # Fixed semitone bins, so a steadier voice scores a lower entropy.
+    edges = np.arange(-PPE_RANGE, PPE_RANGE + PPE_BIN / 2, PPE_BIN)
+    counts, _ = np.histogram(np.clip(residual, -PPE_RANGE, PPE_RANGE), bins=edges)
+    p = counts[counts > 0] / counts.sum()
+    return float(max(0.0, -(p * np.log(p)).sum() / np.log(len(edges) - 1)))
+
+
+@lru_cache(maxsize=None)
+def _training_stats() -> tuple[dict, dict]:
+    X, _ = load_dataset("parkinsons")
+    return X.median().to_dict(), {c: (X[c].min(), X[c].max()) for c in X.columns}
+
+
+def implausible(features: dict) -> list[str]:
+    """Names of the features that are NaN or outside the training range."""
+    _, ranges = _training_stats()
+    return [name for name, value in features.items()
+            if not ranges[name][0] <= value <= ranges[name][1]]
+
+
+def extract_features(source, block_seconds: float = BLOCK_SECONDS) -> dict:
+    """Measured features of one recording (a path or binary file object), in
+    model order; ``UNMEASURED`` and NaN measures need filling before scoring."""
+    extractor = None
+    try:
+        for rate, block in iter_wav(source, block_seconds):
+            if extractor is None:
+                extractor = StreamingExtractor(rate)
+            extractor.feed(block)
+    except (EOFError, wave.Error) as e:
+        raise ValueError(f"Not a readable WAV file: {e}") from e
+    if extractor is None:
+        raise ValueError("The recording is empty")
+    return extractor.result()
+
+
+def _extract_one(path: str):
+    try:
+        return path, extract_features(Path(path)), None
+    except (OSError, ValueError) as e:
+        return path, None, str(e)
+
+
+def extract_many(paths, workers: int | None = None):
+    """Yield ``(path, features, error)`` for each recording, in input order,
+    with recordings analysed in parallel processes."""
+    paths = [str(p) for p in paths]
+    if workers == 1 or len(paths) == 1:
+        yield from map(_extract_one, paths)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_extract_one, paths, chunksize=max(1, len(paths) // 64))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recordings", nargs="+", help="WAV files")
+    parser.add_argument("--output", "-o", help="CSV destination (default: stdout)")
+    parser.add_argument("--workers", type=int, help="processes (default: one per CPU)")
+    parser.add_argument("--impute", action="store_true",
+                        help="fill unmeasured values with the training median and list them "
+                        "in an 'imputed' column (batch refuses these rows by default)")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    failed = 0
+    try:
+        writer = csv.writer(out)
+        writer.writerow(["recording", *FEATURES, *(["imputed"] if args.impute else [])])
+        for path, features, error in extract_many(args.recordings, args.workers):
+            if error:
+                failed += 1
+                print(f"{path}: {error}", file=sys.stderr)
+                continue
+            outside = [name for name in implausible(features) if not np.isnan(features[name])]
+            if outside:
+                print(f"{path}: outside the training range: {', '.join(outside)}", file=sys.stderr)
+            missing = [name for name in FEATURES if np.isnan(features.get(name, np.nan))]
+            if not args.impute:
+                writer.writerow([path, *("" if name in missing else f"{features[name]:.6g}"
+                                         for name in FEATURES)])
+                continue
+            medians, _ = _training_stats()
+            row = features | {name: medians[name] for name in missing}
+            writer.writerow([path, *(f"{row[name]:.6g}" for name in FEATURES), ";".join(missing)])
+    except OSError as e:
+        sys.exit(f"error: {e}")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if failed:
+        sys.exit(f"error: {failed} of {len(args.recordings)} recordings failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Compact, versioned binary artifact for the linear screening models.
+
+Layout (little-endian)::
+
+    b"MGLM" | uint16 format version | uint32 header length | JSON header
+    | zero padding to a 64-byte boundary | float64[n_features + 1] payload
+
+The payload is the weight vector followed by the bias. The header records the
+model name, estimator type, feature order, class labels, payload offset and a
+SHA-256 of the payload and metadata. Loading memory-maps the payload, so every
+worker process shares one physical copy of the weights and nothing is
+unpickled::
+
+    python -m mediguard.artifact export            # all saved models
+    python -m mediguard.artifact inspect "saved models/diabetes_model.mgm"
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from mediguard.scorer import LinearScorer
+
+MAGIC = b"MGLM"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<4sHI")
+_DTYPE = np.dtype("<f8")
+
+
+class ArtifactError(ValueError):
+    pass
+
+
+def content_hash(payload: bytes, features, classes) -> str:
+    digest = hashlib.sha256(payload)
+    digest.update(json.dumps([list(features), list(classes)]).encode())
+    return digest.hexdigest()
+
+
+def export_artifact(model, path, name: str | None = None, features=None) -> dict:
+    """Write ``model`` (a fitted linear estimator or ``LinearScorer``) to ``path``.
+
+    Returns the header that was written.
+    """
+    scorer = model if isinstance(model, LinearScorer) else LinearScorer.from_estimator(model)
+    features = list(features if features is not None else scorer.features or [])
+    if len(features) != scorer.n_features:
+        raise ArtifactError(
+            f"Need {scorer.n_features} feature names to export, got {len(features)}"
+        )
+    classes = scorer.classes.tolist()
+    payload = np.append(scorer.coef, scorer.intercept).astype(_DTYPE).tobytes()
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "name": name,
+        "estimator": type(model).__name__,
+        "features": features,
+        "classes": classes,
+        "dtype": _DTYPE.str,
+        "sha256": content_hash(payload, features, classes),
+    }
+    # The payload offset depends on the header length and vice versa; reserve
+    # a fixed-width field so one pass is enough.
+    header["payload_offset"] = 0
+    size = _PREFIX.size + len(json.dumps(header).encode()) + 16
+    header["payload_offset"] = -(-size // ALIGNMENT) * ALIGNMENT
+    encoded = json.dumps(header).encode()
+
+    # Loaded scorers are views into a mapping of the old file, so it must be
+    # replaced rather than rewritten in place.
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+            f.write(encoded)
+            f.write(b"\0" * (header["payload_offset"] - _PREFIX.size - len(encoded)))
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return header
+
+
+def _parse_header(buf, path) -> dict:
+    if len(buf) < _PREFIX.size:
+        raise ArtifactError(f"{path} is too short to be a model artifact")
+    magic, version, length = _PREFIX.unpack_from(buf)
+    if magic != MAGIC:
+        raise ArtifactError(f"{path} is not a model artifact")
+    if version > FORMAT_VERSION:
+        raise ArtifactError(f"{path} uses format version {version}; this reader supports {FORMAT_VERSION}")
+    return json.loads(bytes(buf[_PREFIX.size:_PREFIX.size + length]))
+
+
+def read_header(path) -> dict:
+    with open(path, "rb") as f:
+        return _parse_header(f.read(), path)
+
+
+def load_artifact(path, verify: bool = True) -> LinearScorer:
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header = _parse_header(buf, path)
+    n = len(header["features"])
+    payload = np.frombuffer(buf, dtype=header["dtype"], count=n + 1, offset=header["payload_offset"])
+    if verify and content_hash(payload.tobytes(), header["features"], header["classes"]) != header["sha256"]:
+        raise ArtifactError(f"{path} failed its content hash check")
+    return LinearScorer(payload[:n], payload[n], header["classes"], header["features"],
+                        version=header["sha256"][:12])
+
+
+def main(argv=None):
+    from mediguard.models import DISEASES, get_spec, load_estimator, model_path
+
+    parser = argparse.ArgumentParser(description="Export or inspect model artifacts")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="convert saved pickles to artifacts")
+    export.add_argument("diseases", nargs="*", help=f"any of {', '.join(DISEASES)} (default: all)")
+    inspect = sub.add_parser("inspect", help="print an artifact's header")
+    inspect.add_argument("path", type=Path)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "inspect":
+            print(json.dumps(read_header(args.path), indent=2))
+            return
+        for name in args.diseases or DISEASES:
+            spec = get_spec(name)
+            dst = model_path(spec.model_file).with_name(spec.artifact_file)
+            header = export_artifact(load_estimator(name), dst, name, spec.features)
+            print(f"{name}: wrote {dst} ({header['sha256'][:12]})")
+    except (OSError, ValueError) as e:
+        sys.exit(f"error: {e}")
+
+
+if __name__ == "__main__":
+    main()
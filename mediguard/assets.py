@@ -0,0 +1,40 @@
+"""Static, content-hashed UI assets.
+
+The global stylesheet and sidebar logo live in ``static/`` and are served by
+Streamlit's component file route, which sends ``Cache-Control: public`` and a
+real ``Content-Type``. (The ``app/static`` route serves everything but images
+as ``text/plain``, which browsers refuse to apply as CSS.) URLs carry a
+content hash, so the browser fetches each file once per version and a rerun
+only re-sends a short ``<link>`` tag instead of the whole stylesheet.
+"""
+import hashlib
+import mimetypes
+from functools import lru_cache
+
+from mediguard.models import ROOT
+
+STATIC_DIR = ROOT / "static"
+
+mimetypes.add_type("image/svg+xml", ".svg")
+
+
+@lru_cache(maxsize=None)
+def _base_url() -> str:
+    import streamlit.components.v1 as components
+
+    components.declare_component("static", path=str(STATIC_DIR))
+    return f"component/{__name__}.static"
+
+
+@lru_cache(maxsize=64)
+def _digest(filename: str, mtime_ns: int) -> str:
+    return hashlib.sha256((STATIC_DIR / filename).read_bytes()).hexdigest()[:12]
+
+
+def asset_url(filename: str) -> str:
+    mtime_ns = (STATIC_DIR / filename).stat().st_mtime_ns
+    return f"{_base_url()}/{filename}?v={_digest(filename, mtime_ns)}"
+
+
+def stylesheet_tag(filename: str = "mediguard.css") -> str:
+    return f'<link rel="stylesheet" href="{asset_url(filename)}">'
@@ -0,0 +1,64 @@
+"""Exact per-feature attributions for the linear screening models.
+
+A linear model scores ``w.x + b``, so relative to a baseline patient ``x0``
+(the dataset mean) each feature contributes exactly ``w * (x - x0)`` and the
+contributions sum to the difference between the two scores. For a batch
+that is one broadcast multiply::
+
+    attributor = get_attributor("heart", scorer, version)
+    attributor.contributions(X)           # (rows, features)
+    attributor.top(X[0], k=5)             # [(column, contribution), ...]
+
+Positive contributions push towards the positive class.
+"""
+import threading
+
+import numpy as np
+
+from mediguard.models import get_spec, load_dataset
+
+
+class Attributor:
+    def __init__(self, coef, intercept: float, baseline, columns):
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.baseline = np.ascontiguousarray(baseline, dtype=np.float64)
+        self.columns = tuple(columns)
+        self.baseline_score = float(self.baseline @ self.coef + intercept)
+
+    def contributions(self, X) -> np.ndarray:
+        return (np.atleast_2d(np.asarray(X, dtype=np.float64)) - self.baseline) * self.coef
+
+    def top(self, row, k: int = 5) -> list[tuple[str, float]]:
+        """The ``k`` largest contributions for one row by magnitude, largest first."""
+        contributions = self.contributions(row)[0]
+        order = np.argsort(-np.abs(contributions), kind="stable")[:k]
+        return [(self.columns[j], float(contributions[j])) for j in order]
+
+
+_attributors: dict[tuple[str, str | None], Attributor] = {}
+_lock = threading.Lock()
+
+
+def baseline(name: str) -> np.ndarray:
+    X, _ = load_dataset(name)
+    return X.to_numpy(dtype=np.float64).mean(axis=0)
+
+
+def get_attributor(name: str, scorer, version: str | None) -> Attributor:
+    """Return the cached ``Attributor`` for ``version`` of the ``name`` model.
+
+    Raises ``ValueError`` if ``scorer`` is not a ``LinearScorer``.
+    """
+    if not hasattr(scorer, "coef"):
+        raise ValueError(f"The {name} model is not linear; no exact attribution")
+    key = (name, version)
+    with _lock:
+        attributor = _attributors.get(key)
+        if attributor is None:
+            # Drop attributors for superseded versions of this model.
+            for stale in [k for k in _attributors if k[0] == name]:
+                del _attributors[stale]
+            attributor = _attributors[key] = Attributor(
+                scorer.coef, scorer.intercept, baseline(name), get_spec(name).features
+            )
+        return attributor
@@ -0,0 +1,269 @@
+"""Asynchronous, batched audit log of every prediction.
+
+``AuditLog.record`` only puts the inputs, model version and output on a
+bounded queue; a background thread serializes whatever has accumulated
+every ``flush_interval`` seconds and appends it to a JSON Lines file in one
+write. The file is rotated by size into timestamped files
+(``app.jsonl.20261018T093000123456Z``) that are all kept unless
+``backup_count`` asks for deletion, and batches can also be inserted into a
+SQLite table. A failed write is retried every ``retry_interval`` seconds
+until it succeeds, so an entry may be written twice but is not lost while
+the process lives; meanwhile the queue fills and ``record`` blocks, then
+raises. Queued records are flushed when the log is closed, including at
+interpreter exit.
+
+Configuration comes from the environment (see :meth:`AuditLog.from_env`)::
+
+    MEDIGUARD_AUDIT_DIR=/var/log/mediguard MEDIGUARD_AUDIT_SQLITE=audit.db \\
+        streamlit run app.py
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from mediguard import metrics
+from mediguard.models import get_spec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_MAX_QUEUE = 10_000
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_RETRY_INTERVAL = 5.0
+# How long ``record`` waits for room in a full queue before raising.
+DEFAULT_PUT_TIMEOUT = 30.0
+
+_STOP = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit (
+    ts TEXT NOT NULL,
+    source TEXT NOT NULL,
+    disease TEXT NOT NULL,
+    model_version TEXT,
+    prediction INTEGER,
+    inputs TEXT NOT NULL
+)
+"""
+
+
+class AuditLog:
+    def __init__(self, path, source: str = "app", flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_queue: int = DEFAULT_MAX_QUEUE, max_bytes: int = DEFAULT_MAX_BYTES,
+                 backup_count: int | None = None, sqlite_path=None,
+                 retry_interval: float = DEFAULT_RETRY_INTERVAL,
+                 put_timeout: float = DEFAULT_PUT_TIMEOUT):
+        self.path = Path(path)
+        self.source = source
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        # None keeps every rotated file; a count deletes the oldest beyond it.
+        self.backup_count = backup_count
+        self.sqlite_path = sqlite_path
+        self.retry_interval = retry_interval
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(max_queue)
+        self._closed = False
+        self._stopping = threading.Event()
+        self._file = None
+        self._db = None
+        # Serialized entries not yet written to the file / the database.
+        self._lines = []
+        self._rows = []
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls, source: str) -> "AuditLog":
+        env = os.environ.get
+        backups = env("MEDIGUARD_AUDIT_BACKUPS")
+        return cls(
+            Path(env("MEDIGUARD_AUDIT_DIR", "audit")) / f"{source}.jsonl",
+            source=source,
+            flush_interval=float(env("MEDIGUARD_AUDIT_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)),
+            max_queue=int(env("MEDIGUARD_AUDIT_MAX_QUEUE", DEFAULT_MAX_QUEUE)),
+            max_bytes=int(env("MEDIGUARD_AUDIT_MAX_BYTES", DEFAULT_MAX_BYTES)),
+            backup_count=int(backups) if backups else None,
+            sqlite_path=env("MEDIGUARD_AUDIT_SQLITE") or None,
+            retry_interval=float(env("MEDIGUARD_AUDIT_RETRY_INTERVAL", DEFAULT_RETRY_INTERVAL)),
+        )
+
+    def record(self, disease: str, X, predictions, model_version):
+        """Queue one audit entry per row of ``X``.
+
+        Returns immediately unless the queue is full; audit entries are never
+        dropped, so a full queue applies backpressure instead, and raises
+        ``RuntimeError`` if it stays full for ``put_timeout`` seconds or the
+        writer thread has died.
+        """
+        if self._closed:
+            raise RuntimeError("Audit log is closed")
+        if not self._thread.is_alive():
+            raise RuntimeError("Audit writer has stopped; entries cannot be recorded")
+        item = (time.time(), disease, np.asarray(X), np.asarray(predictions), model_version)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            metrics.increment("mediguard_audit_backpressure_total")
+            try:
+                self._queue.put(item, timeout=self.put_timeout)
+            except queue.Full:
+                raise RuntimeError(
+                    f"Audit log {self.path} has not accepted entries for {self.put_timeout:g}s"
+                ) from None
+
+    def close(self, timeout: float | None = None):
+        """Flush everything queued so far and stop the writer."""
+        if self._closed:
+            return
+        self._closed = True
+        self._stopping.set()
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            stopping = False
+            while not stopping:
+                if self._lines or self._rows:
+                    # The last write failed. Retry before taking more, so a
+                    # full queue pushes back on record() rather than growing
+                    # this backlog.
+                    if self._stopping.wait(self.retry_interval):
+                        break
+                    self._flush()
+                    continue
+                batch, stopping = self._collect()
+                if batch:
+                    self._serialize(batch)
+                    self._flush()
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    self._serialize([item])
+            if (self._lines or self._rows) and not self._flush():
+                logger.error("Audit log closed with %d entries unwritten",
+                             max(len(self._lines), len(self._rows)))
+        finally:
+            if self._file is not None:
+                self._file.close()
+            if self._db is not None:
+                self._db.close()
+
+    def _collect(self):
+        """Block for the next entry, then gather the flush interval's worth."""
+        item = self._queue.get()
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while item is not _STOP:
+            batch.append(item)
+            # Wait out the flush interval, then take whatever else is already
+            # queued without blocking.
+            remaining = deadline - time.monotonic()
+            try:
+                item = (self._queue.get(timeout=remaining) if remaining > 0
+                        else self._queue.get_nowait())
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _serialize(self, batch):
+        for ts, disease, X, predictions, version in batch:
+            stamp = datetime.fromtimestamp(ts, timezone.utc).isoformat()
+            try:
+                columns = get_spec(disease).features
+            except ValueError:
+                logger.error("Dropping audit entry for unknown model %r", disease)
+                metrics.increment("mediguard_audit_errors_total")
+                continue
+            for values, prediction in zip(X.tolist(), predictions.tolist()):
+                inputs = dict(zip(columns, values))
+                self._lines.append(json.dumps({
+                    "ts": stamp, "source": self.source, "disease": disease,
+                    "model_version": version, "prediction": prediction, "inputs": inputs,
+                }) + "\n")
+                if self.sqlite_path:
+                    self._rows.append((stamp, self.source, disease, version, prediction,
+                                       json.dumps(inputs)))
+
+    def _flush(self) -> bool:
+        """Write the pending entries; on failure keep them for the next try."""
+        try:
+            with metrics.span("audit_flush"):
+                if self._lines:
+                    if self._file is None:
+                        self.path.parent.mkdir(parents=True, exist_ok=True)
+                        self._file = open(self.path, "a", encoding="utf-8")
+                    self._file.write("".join(self._lines))
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    written, self._lines = len(self._lines), []
+                    metrics.increment("mediguard_audit_records_total", written, source=self.source)
+                    if self._file.tell() >= self.max_bytes:
+                        self._rotate()
+                if self._rows:
+                    if self._db is None:
+                        self._db = sqlite3.connect(self.sqlite_path)
+                        self._db.execute(_SCHEMA)
+                    with self._db:
+                        self._db.executemany("INSERT INTO audit VALUES (?, ?, ?, ?, ?, ?)", self._rows)
+                    self._rows = []
+        except Exception:
+            logger.exception("Failed to write %d audit entries; retrying in %gs",
+                             max(len(self._lines), len(self._rows)), self.retry_interval)
+            metrics.increment("mediguard_audit_errors_total")
+            # Reopen on the next try, e.g. after the directory was recreated.
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
+            return False
+        return True
+
+    def rotated(self) -> list[Path]:
+        """Rotated files of this log, oldest first."""
+        pattern = re.compile(re.escape(self.path.name) + r"\.\d{8}T\d{12}Z(\.\d+)?")
+        return sorted(p for p in self.path.parent.glob(self.path.name + ".*")
+                      if pattern.fullmatch(p.name))
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        target = self.path.with_name(f"{self.path.name}.{stamp}")
+        n = 0
+        while target.exists():
+            n += 1
+            target = self.path.with_name(f"{self.path.name}.{stamp}.{n}")
+        self.path.replace(target)
+        if self.backup_count is not None:
+            for old in self.rotated()[:-self.backup_count or None]:
+                old.unlink()
+
+
+def audited(predict, log: AuditLog):
+    """Wrap a ``predict(name, X) -> (predictions, version)`` callable so every
+    call is recorded in ``log``."""
+
+    def wrapper(name, X):
+        predictions, version = predict(name, X)
+        log.record(name, X, predictions, version)
+        return predictions, version
+
+    return wrapper
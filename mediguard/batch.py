@@ -0,0 +1,148 @@
+"""Headless batch scoring of large CSV exports.
+
+The input is read in fixed-size chunks and each chunk is scored with a single
+vectorized ``predict`` call, so memory stays flat regardless of file size.
+Columns are matched by name and each row is validated against the
+disease's feature schema: rows that fail are written with an empty
+prediction and the reason in the ``error`` column, and counted, rather than
+stopping the run. Input files are parsed once into
+the binary cache (see ``mediguard.ingest``), so re-scoring the same export,
+e.g. after a retrain, skips CSV parsing. Only the feature and id columns are
+cached; ``--no-cache`` streams the file through pandas instead::
+
+    python -m mediguard.batch diabetes clinic_export.csv predictions.csv
+
+``--attributions`` adds one ``<feature>_contribution`` column per feature with
+its exact contribution to the score (see ``mediguard.attribution``).
+
+Rows whose ``imputed`` column names features that were filled in rather than
+measured (see ``mediguard.acoustic --impute``) are refused like invalid rows
+unless ``--allow-imputed`` is given; the column is copied to the output.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from mediguard.attribution import get_attributor
+from mediguard.cache import DEFAULT_CACHE_SIZE
+from mediguard.ingest import load_table, read_header
+from mediguard.models import DISEASES, get_spec
+from mediguard.registry import ModelRegistry
+
+DEFAULT_CHUNK_SIZE = 50_000
+IMPUTED = "imputed"
+
+
+def score_csv(name: str, src, dst, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              id_columns: tuple[str, ...] = (),
+              cache_size: int = DEFAULT_CACHE_SIZE, attributions: bool = False,
+              table_cache: bool = True, allow_imputed: bool = False) -> tuple[int, int]:
+    """Score ``src`` with the ``name`` model and write predictions to ``dst``.
+
+    Returns the number of rows read and how many of them were invalid.
+    """
+    spec = get_spec(name)
+    model = ModelRegistry(reload_interval=0, cache_size=cache_size).get(name)
+    attributor = get_attributor(name, model.model, model.version) if attributions else None
+    features = list(spec.features)
+    id_columns = [c for c in id_columns if c not in features and c != IMPUTED]
+    text = id_columns + [IMPUTED]
+
+    if table_cache and isinstance(src, (str, Path)):
+        # Identifiers are copied through verbatim, so keep them as text. Feature
+        # types are inferred, so a stray non-numeric cell marks one row invalid
+        # instead of failing the parse.
+        columns = features + id_columns + ([IMPUTED] if IMPUTED in read_header(src) else [])
+        table = load_table(src, {column: "str" for column in text if column in columns},
+                           columns=columns)
+        reader = table.chunks(columns, chunk_size)
+    else:
+        # Same treatment as the cached path: identifiers verbatim, every chunk
+        # alike, blanks as "" rather than NaN.
+        wanted = set(features + text)
+        reader = pd.read_csv(
+            src,
+            chunksize=chunk_size,
+            usecols=lambda column: column in wanted,
+            dtype={column: str for column in text},
+            keep_default_na=False,
+            encoding="utf-8-sig",
+        )
+    rows = invalid = 0
+    for chunk in reader:
+        out = chunk[id_columns].copy() if id_columns else pd.DataFrame(index=chunk.index)
+        X = spec.schema.from_frame(chunk, coerce=True)
+        errors = spec.schema.row_errors(X)
+        if IMPUTED in chunk.columns:
+            imputed = chunk[IMPUTED].fillna("").astype(str).to_numpy(dtype=object)
+            out[IMPUTED] = imputed
+            if not allow_imputed:
+                refused = (imputed != "") & (errors == "")
+                errors[refused] = "not measured (imputed): " + imputed[refused]
+        valid = errors == ""
+        predictions = pd.array([pd.NA] * len(X), dtype="Int64")
+        if valid.any():
+            predictions[valid] = model.predict(X[valid], cache_size)
+        out["prediction"] = predictions
+        out["model_version"] = model.version
+        out["error"] = errors
+        if attributor is not None:
+            contributions = np.full(X.shape, np.nan)
+            if valid.any():
+                contributions[valid] = attributor.contributions(X[valid])
+            for j, feature in enumerate(features):
+                out[f"{feature}_contribution"] = contributions[:, j]
+        out.to_csv(dst, header=rows == 0, index=not id_columns, index_label="row")
+        rows += len(chunk)
+        invalid += int((~valid).sum())
+    return rows, invalid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("disease", choices=sorted(DISEASES))
+    parser.add_argument("input", help="CSV laid out like dataset/<disease>.csv ('-' for stdin)")
+    parser.add_argument("output", help="destination CSV ('-' for stdout)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--id-column",
+        action="append",
+        default=[],
+        help="input column to copy through to the output (repeatable); "
+        "defaults to the 0-based row number",
+    )
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="LRU prediction cache entries (0 disables)")
+    parser.add_argument("--attributions", action="store_true",
+                        help="add per-feature contribution columns")
+    parser.add_argument("--no-cache", dest="table_cache", action="store_false",
+                        help="read the input directly instead of through the table cache")
+    parser.add_argument("--allow-imputed", action="store_true",
+                        help="score rows whose 'imputed' column lists filled-in features")
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be positive")
+
+    src = sys.stdin if args.input == "-" else args.input
+    try:
+        if args.output == "-":
+            rows, invalid = score_csv(args.disease, src, sys.stdout, args.chunk_size,
+                                      tuple(args.id_column), args.cache_size, args.attributions,
+                                      args.table_cache, args.allow_imputed)
+        else:
+            with open(args.output, "w", newline="") as dst:
+                rows, invalid = score_csv(args.disease, src, dst, args.chunk_size,
+                                          tuple(args.id_column), args.cache_size, args.attributions,
+                                          args.table_cache, args.allow_imputed)
+    except (OSError, ValueError) as e:
+        sys.exit(f"error: {e}")
+    print(f"Scored {rows - invalid} rows with the {args.disease} model", file=sys.stderr)
+    if invalid:
+        print(f"{invalid} invalid rows left unscored; see the error column", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
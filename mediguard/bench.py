@@ -0,0 +1,190 @@
+"""Inference and page-rerun benchmarks, written as JSON for comparing runs.
+
+    python -m mediguard.bench --output bench.json
+
+Reports, for each saved model: single-row ``predict`` latency percentiles
+(sklearn estimator and compiled scorer), batched throughput at several batch
+sizes, unpickle time and artifact load time; plus Streamlit rerun time for
+each page, driven headlessly through ``streamlit.testing``.
+"""
+import argparse
+import atexit
+import json
+import os
+import pickle
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from unittest import mock
+
+import numpy as np
+
+from mediguard.ingest import dataset_table
+from mediguard.models import DISEASES, ROOT, get_spec, load_estimator, model_path
+from mediguard.scorer import compile_model
+
+BATCH_SIZES = (1, 16, 256, 4096, 65536)
+PAGES = {"diabetes": "Diabetes", "heart": "Heart Disease", "parkinsons": "Parkinson's"}
+
+
+def summarize(samples) -> dict:
+    us = np.asarray(samples) * 1e6
+    return {
+        "n": len(us),
+        "mean_us": round(float(us.mean()), 3),
+        "p50_us": round(float(np.percentile(us, 50)), 3),
+        "p95_us": round(float(np.percentile(us, 95)), 3),
+        "p99_us": round(float(np.percentile(us, 99)), 3),
+    }
+
+
+def sample_rows(name: str) -> np.ndarray:
+    return dataset_table(name).matrix(get_spec(name).features)
+
+
+def bench_latency(model, X: np.ndarray, repeat: int) -> dict:
+    rows = [X[i % len(X)].reshape(1, -1) for i in range(repeat)]
+    model.predict(rows[0])
+    samples = []
+    for row in rows:
+        start = time.perf_counter()
+        model.predict(row)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_throughput(model, X: np.ndarray, batch_sizes=BATCH_SIZES, min_time: float = 0.2) -> dict:
+    out = {}
+    for size in batch_sizes:
+        batch = np.resize(X, (size, X.shape[1]))
+        model.predict(batch)
+        calls, start = 0, time.perf_counter()
+        while True:
+            model.predict(batch)
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        out[str(size)] = {"rows_per_s": round(calls * size / elapsed, 1),
+                          "call_us": round(elapsed / calls * 1e6, 3)}
+    return out
+
+
+def bench_unpickle(name: str, repeat: int) -> dict:
+    data = model_path(get_spec(name).model_file).read_bytes()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pickle.loads(data)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_artifact_load(name: str, repeat: int) -> dict | None:
+    from mediguard.artifact import load_artifact
+
+    path = model_path(get_spec(name).artifact_file)
+    if not path.exists():
+        return None
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load_artifact(path)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_pages(repeat: int) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    # Keep the benchmark's submissions out of the real audit log and drift
+    # state. The app's writers close at exit, so remove the directory after
+    # them (atexit runs hooks in reverse order of registration).
+    scratch = tempfile.mkdtemp(prefix="mediguard-bench-")
+    atexit.register(shutil.rmtree, scratch, True)
+    with mock.patch.dict(os.environ, MEDIGUARD_AUDIT_DIR=os.path.join(scratch, "audit"),
+                         MEDIGUARD_DRIFT_DIR=os.path.join(scratch, "drift")):
+        return _bench_pages(AppTest, repeat)
+
+
+def _bench_pages(AppTest, repeat: int) -> dict:
+    out = {}
+    for name, page in PAGES.items():
+        at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=60)
+        at.session_state["page"] = page
+        start = time.perf_counter()
+        at.run()
+        first = time.perf_counter() - start
+        if at.exception:
+            raise RuntimeError(f"{page} page raised: {at.exception[0].message}")
+        reruns, submits = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            at.run()
+            reruns.append(time.perf_counter() - start)
+            at.button[0].click()
+            start = time.perf_counter()
+            at.run()
+            submits.append(time.perf_counter() - start)
+        out[name] = {
+            "first_run_ms": round(first * 1000, 3),
+            "rerun": summarize(reruns),
+            "submit": summarize(submits),
+        }
+    return out
+
+
+def run(repeat: int = 2000, page_repeat: int = 20, include_pages: bool = True) -> dict:
+    import sklearn
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+        },
+        "predict_latency": {},
+        "throughput": {},
+        "unpickle": {},
+        "artifact_load": {},
+    }
+    for name in DISEASES:
+        X = sample_rows(name)
+        estimator = load_estimator(name)
+        variants = {"sklearn": estimator, "compiled": compile_model(estimator)}
+        results["predict_latency"][name] = {
+            k: bench_latency(m, X, repeat) for k, m in variants.items()
+        }
+        results["throughput"][name] = {k: bench_throughput(m, X) for k, m in variants.items()}
+        results["unpickle"][name] = bench_unpickle(name, max(repeat // 20, 10))
+        results["artifact_load"][name] = bench_artifact_load(name, max(repeat // 20, 10))
+    if include_pages:
+        results["page_rerun"] = bench_pages(page_repeat)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark inference and page reruns")
+    parser.add_argument("--repeat", type=int, default=2000, help="single-row predict calls per model")
+    parser.add_argument("--page-repeat", type=int, default=20, help="reruns per Streamlit page")
+    parser.add_argument("--skip-pages", action="store_true", help="skip the Streamlit rerun benchmark")
+    parser.add_argument("--output", "-o", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore")
+    results = run(args.repeat, args.page_repeat, not args.skip_pages)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
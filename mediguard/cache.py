@@ -0,0 +1,123 @@
+"""Bounded LRU prediction cache keyed on the quantized feature vector.
+
+Rows are rounded to the precision each feature is entered with on the form,
+so resubmitting the same values (or values that only differ beyond the
+displayed precision) is answered without calling the model. One cache per
+model is shared by every session in the process.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from mediguard.models import get_spec
+
+DEFAULT_CACHE_SIZE = int(os.environ.get("MEDIGUARD_CACHE_SIZE", 4096))
+
+
+class PredictionCache:
+    def __init__(self, precision, maxsize: int = DEFAULT_CACHE_SIZE, version=None):
+        self.maxsize = maxsize
+        self.version = version
+        self._scale = 10.0 ** np.asarray(precision, dtype=np.float64)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def keys(self, X: np.ndarray) -> list[tuple]:
+        return list(map(tuple, np.rint(X * self._scale).astype(np.int64).tolist()))
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                raise
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "version": self.version,
+            }
+
+
+class CachedModel:
+    """Wraps a model so ``predict`` only scores rows missing from the cache."""
+
+    def __init__(self, model, cache: PredictionCache):
+        self.model = model
+        self.cache = cache
+
+    def predict(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        keys = self.cache.keys(X)
+        results = [None] * len(keys)
+        missing = []
+        for i, key in enumerate(keys):
+            try:
+                results[i] = self.cache.get(key)
+            except KeyError:
+                missing.append(i)
+        if missing:
+            predictions = self.model.predict(X[missing])
+            for i, prediction in zip(missing, predictions):
+                results[i] = prediction
+                self.cache.put(keys[i], prediction)
+        return np.asarray(results)
+
+
+_caches: dict[str, PredictionCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, maxsize: int = DEFAULT_CACHE_SIZE) -> PredictionCache:
+    """Return the process-wide cache for the ``name`` model."""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = PredictionCache(get_spec(name).precision, maxsize)
+        return _caches[name]
+
+
+def reset_cache(name: str, version, maxsize: int = DEFAULT_CACHE_SIZE) -> PredictionCache:
+    """Start a fresh cache of ``maxsize`` rows for a newly loaded ``version``
+    of the model."""
+    with _caches_lock:
+        _caches[name] = PredictionCache(get_spec(name).precision, maxsize, version)
+        return _caches[name]
+
+
+def cached(name: str, model, maxsize: int = DEFAULT_CACHE_SIZE, version=None):
+    """Put the process-wide cache in front of ``model``.
+
+    When ``version`` is given and the cache belongs to a different model
+    version (a reload happened mid-request), the model is used uncached.
+    """
+    if maxsize <= 0:
+        return model
+    cache = get_cache(name, maxsize)
+    if version is not None and cache.version != version:
+        return model
+    return CachedModel(model, cache)
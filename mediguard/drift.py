@@ -0,0 +1,417 @@
+"""Streaming input-drift monitor against the training data.
+
+For every disease the monitor keeps fixed-size running statistics over all
+scored inputs: count, mean and variance per feature (Welford's algorithm,
+merged a batch at a time) and a histogram over the training set's ventile
+bins, from which quantiles are estimated. Memory and update cost do not
+grow with the number of predictions, and an update is a few vectorized
+operations on a ``(rows, features)`` array::
+
+    monitor = DriftMonitor.from_env("app")
+    monitor.observe("heart", X)
+    monitor.report("heart")   # {column: {"psi", "mean_shift", ..., "status"}}
+
+Each feature gets a population stability index (PSI) over those bins, plus
+the shift of its mean in training standard deviations. State is
+checkpointed to ``MEDIGUARD_DRIFT_DIR`` (default ``drift/``) from a
+background thread, so it survives restarts. It is discarded when the
+training data it was compared against changes.
+The latest PSI values are exported as ``mediguard_drift_psi`` gauges::
+
+    python -m mediguard.drift --source app      # print the saved report
+"""
+import argparse
+import atexit
+import json
+import logging
+import os
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from mediguard import metrics
+from mediguard.models import DATASET_DIR, DISEASES, ROOT, get_spec, load_dataset
+from mediguard.registry import file_digest
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_DIR = ROOT / ".cache" / "drift"
+BINS = 20
+DEFAULT_CHECKPOINT_INTERVAL = 30.0
+# Conventional PSI thresholds: below 0.1 is stable, above 0.25 a real shift.
+PSI_WARN = 0.1
+PSI_DRIFT = 0.25
+# Fewer inputs than this are too noisy to judge.
+MIN_COUNT = 50
+# Rows buffered per disease before they are folded into the statistics, so
+# single-row predictions pay for an append rather than a dozen tiny numpy ops.
+FOLD_ROWS = 256
+FORMAT_VERSION = 1
+
+
+def _bin_counts(X: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Per-feature histogram counts, shape ``(features, len(edges[0]) + 1)``."""
+    n_features, n_edges = edges.shape
+    bins = (X[:, :, None] >= edges[None, :, :]).sum(axis=2)
+    bins += np.arange(n_features) * (n_edges + 1)
+    return np.bincount(bins.ravel(), minlength=n_features * (n_edges + 1)).reshape(n_features, -1)
+
+
+class ReferenceProfile:
+    """Training-set statistics that live inputs are compared against."""
+
+    def __init__(self, name: str, columns, mean, std, edges, expected, digest: str = ""):
+        self.name = name
+        self.columns = tuple(columns)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.std = np.asarray(std, dtype=np.float64)
+        # (features, BINS - 1) inner bin edges at the training ventiles.
+        self.edges = np.asarray(edges, dtype=np.float64)
+        # (features, BINS) share of training rows in each bin.
+        self.expected = np.asarray(expected, dtype=np.float64)
+        self.digest = digest
+
+    @classmethod
+    def from_arrays(cls, name, columns, X, digest: str = "") -> "ReferenceProfile":
+        X = np.asarray(X, dtype=np.float64)
+        edges = np.quantile(X, np.linspace(0, 1, BINS + 1)[1:-1], axis=0).T
+        expected = _bin_counts(X, edges) / len(X)
+        return cls(name, columns, X.mean(axis=0), X.std(axis=0, ddof=1), edges, expected, digest)
+
+    def save(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez(tmp, format_version=FORMAT_VERSION, columns=np.array(self.columns),
+                 mean=self.mean, std=self.std, edges=self.edges, expected=self.expected,
+                 digest=self.digest)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, name: str, path) -> "ReferenceProfile":
+        with np.load(path) as data:
+            if int(data["format_version"]) != FORMAT_VERSION:
+                raise ValueError(f"{path} has an unsupported reference format")
+            return cls(name, data["columns"].tolist(), data["mean"], data["std"], data["edges"],
+                       data["expected"], str(data["digest"]))
+
+
+def reference_path(name: str):
+    return REFERENCE_DIR / f"{name}.reference.npz"
+
+
+def load_reference(name: str) -> ReferenceProfile:
+    """Load the stored reference profile for ``name``, rebuilding it if the
+    dataset has changed."""
+    spec = get_spec(name)
+    digest = file_digest(DATASET_DIR / spec.dataset_file)
+    path = reference_path(name)
+    try:
+        reference = ReferenceProfile.load(name, path)
+        if reference.digest == digest and reference.columns == spec.features:
+            return reference
+    except (OSError, ValueError, KeyError):
+        pass
+    X, _ = load_dataset(name)
+    reference = ReferenceProfile.from_arrays(name, spec.features, X.to_numpy(dtype=np.float64),
+                                             digest)
+    reference.save(path)
+    return reference
+
+
+class RunningStats:
+    """Constant-size summary of every row observed for one disease."""
+
+    def __init__(self, n_features: int):
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.min = np.full(n_features, np.inf)
+        self.max = np.full(n_features, -np.inf)
+        self.counts = np.zeros((n_features, BINS), dtype=np.int64)
+
+    def update(self, X: np.ndarray, edges: np.ndarray):
+        n = len(X)
+        batch_mean = X.mean(axis=0)
+        batch_m2 = ((X - batch_mean) ** 2).sum(axis=0)
+        # Chan et al.'s pairwise combination of two Welford summaries.
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * (n / total)
+        self.m2 += batch_m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+        np.minimum(self.min, X.min(axis=0), out=self.min)
+        np.maximum(self.max, X.max(axis=0), out=self.max)
+        self.counts += _bin_counts(X, edges)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.zeros_like(self.m2)
+
+    def quantiles(self, qs, edges: np.ndarray) -> np.ndarray:
+        """Quantiles estimated from the histogram, interpolating linearly within
+        each bin; shape ``(features, len(qs))``."""
+        bounds = np.column_stack([self.min, np.clip(edges, self.min[:, None], self.max[:, None]),
+                                  self.max])
+        cumulative = np.cumsum(self.counts, axis=1) / max(self.count, 1)
+        out = np.empty((len(bounds), len(qs)))
+        for j in range(len(bounds)):
+            out[j] = np.interp(qs, np.concatenate([[0], cumulative[j]]), bounds[j])
+        return out
+
+    def state(self) -> dict:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min,
+                "max": self.max, "counts": self.counts}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "RunningStats":
+        stats = cls(len(state["mean"]))
+        stats.count = int(state["count"])
+        for key in ("mean", "m2", "min", "max", "counts"):
+            getattr(stats, key)[...] = state[key]
+        return stats
+
+
+def psi(observed_counts: np.ndarray, expected: np.ndarray, floor: float = 1e-4) -> np.ndarray:
+    """Population stability index per feature (row)."""
+    total = observed_counts.sum(axis=1, keepdims=True)
+    observed = np.maximum(observed_counts / np.maximum(total, 1), floor)
+    expected = np.maximum(expected, floor)
+    return ((observed - expected) * np.log(observed / expected)).sum(axis=1)
+
+
+def _status(score: float, count: int) -> str:
+    if count < MIN_COUNT:
+        return "insufficient data"
+    if score >= PSI_DRIFT:
+        return "drift"
+    if score >= PSI_WARN:
+        return "warn"
+    return "ok"
+
+
+def drift_report(reference: ReferenceProfile, stats: RunningStats) -> dict:
+    """Per-feature drift scores of ``stats`` against ``reference``."""
+    scores = psi(stats.counts, reference.expected)
+    scale = np.where(reference.std > 0, reference.std, 1.0)
+    shift = (stats.mean - reference.mean) / scale
+    std_ratio = stats.std / scale
+    quantiles = stats.quantiles((0.05, 0.5, 0.95), reference.edges)
+    return {
+        column: {
+            "psi": round(float(scores[j]), 4),
+            "mean_shift": round(float(shift[j]), 3),
+            "std_ratio": round(float(std_ratio[j]), 3),
+            "mean": float(stats.mean[j]),
+            "p05": float(quantiles[j, 0]),
+            "p50": float(quantiles[j, 1]),
+            "p95": float(quantiles[j, 2]),
+            "status": _status(float(scores[j]), stats.count),
+        }
+        for j, column in enumerate(reference.columns)
+    }
+
+
+class DriftMonitor:
+    def __init__(self, path, source: str = "app",
+                 checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL):
+        self.path = Path(path)
+        self.source = source
+        self.checkpoint_interval = checkpoint_interval
+        self._references: dict[str, ReferenceProfile] = {}
+        self._stats: dict[str, RunningStats] = {}
+        self._restored = self._read_checkpoint()
+        self._pending: dict[str, list] = {}
+        self._pending_rows: dict[str, int] = {}
+        self._lock = threading.Lock()
+        # Held while a reference profile is read from disk, so observe() on
+        # other threads keeps going; taken before self._lock, never inside it.
+        self._reference_lock = threading.Lock()
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread = None
+        if checkpoint_interval > 0:
+            self._thread = threading.Thread(target=self._run, name="drift-checkpoint", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls, source: str, checkpoint_interval: float | None = None) -> "DriftMonitor":
+        env = os.environ.get
+        if checkpoint_interval is None:
+            checkpoint_interval = float(
+                env("MEDIGUARD_DRIFT_CHECKPOINT_INTERVAL", DEFAULT_CHECKPOINT_INTERVAL)
+            )
+        return cls(
+            Path(env("MEDIGUARD_DRIFT_DIR", "drift")) / f"{source}.npz",
+            source=source,
+            checkpoint_interval=checkpoint_interval,
+        )
+
+    def reference(self, name: str) -> ReferenceProfile:
+        """Load (once) the training profile for ``name``; must not be called
+        with ``self._lock`` held."""
+        reference = self._references.get(name)
+        if reference is None:
+            with self._reference_lock:
+                reference = self._references.get(name)
+                if reference is None:
+                    reference = load_reference(name)
+                    with self._lock:
+                        restored = self._restored.pop(name, None)
+                        if restored is not None and restored[0] == reference.digest:
+                            self._stats[name] = restored[1]
+                        self._references[name] = reference
+        return reference
+
+    def observe(self, name: str, X):
+        """Add the rows of ``X`` to the running statistics for ``name``."""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        if not len(X):
+            return
+        self.reference(name)
+        with self._lock:
+            self._pending.setdefault(name, []).append(X)
+            rows = self._pending_rows[name] = self._pending_rows.get(name, 0) + len(X)
+            self._dirty = True
+            if rows >= FOLD_ROWS:
+                self._fold(name)
+
+    def _fold(self, name: str):
+        # Called with self._lock held; observe() loaded the reference.
+        pending = self._pending.pop(name, None)
+        self._pending_rows.pop(name, None)
+        if not pending:
+            return
+        X = np.concatenate(pending)
+        edges = self._references[name].edges
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = RunningStats(X.shape[1])
+        stats.update(X, edges)
+
+    def report(self, name: str | None = None) -> dict:
+        """``{disease: {"count", "features": {column: scores}}}``, or one
+        disease's entry when ``name`` is given."""
+        with self._lock:
+            for n in list(self._pending):
+                self._fold(n)
+            names = [name] if name else [*self._stats, *self._restored]
+        for n in names:
+            self.reference(n)
+        with self._lock:
+            snapshot = {}
+            for n in names:
+                reference = self._references[n]
+                if n in self._stats:
+                    snapshot[n] = (reference, RunningStats.from_state(self._stats[n].state()))
+        out = {
+            n: {"count": stats.count, "features": drift_report(reference, stats)}
+            for n, (reference, stats) in snapshot.items()
+        }
+        if name:
+            return out.get(name, {"count": 0, "features": {}})
+        return out
+
+    def checkpoint(self):
+        """Write the current state to disk and refresh the PSI gauges."""
+        with self._lock:
+            for name in list(self._pending):
+                self._fold(name)
+            self._dirty = False
+            # Diseases not seen since the restart keep their restored state.
+            arrays = {}
+            for name, (digest, stats) in self._restored.items():
+                arrays[f"{name}/digest"] = digest
+                for key, value in stats.state().items():
+                    arrays[f"{name}/{key}"] = value
+            for name, stats in self._stats.items():
+                arrays[f"{name}/digest"] = self._references[name].digest
+                for key, value in stats.state().items():
+                    arrays[f"{name}/{key}"] = value
+                scores = psi(stats.counts, self._references[name].expected)
+                for column, score in zip(self._references[name].columns, scores):
+                    metrics.gauge("mediguard_drift_psi", round(float(score), 4),
+                                  model=name, feature=column)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp.npz")
+        np.savez(tmp, format_version=FORMAT_VERSION, **arrays)
+        tmp.replace(self.path)
+
+    def _read_checkpoint(self) -> dict:
+        """``{disease: (reference digest, RunningStats)}`` from the last checkpoint."""
+        if not self.path.exists():
+            return {}
+        try:
+            with np.load(self.path) as data:
+                if int(data["format_version"]) != FORMAT_VERSION:
+                    raise ValueError("unsupported checkpoint format")
+                names = {key.split("/", 1)[0] for key in data.files if "/" in key}
+                return {
+                    name: (str(data[f"{name}/digest"]), RunningStats.from_state(
+                        {key: data[f"{name}/{key}"]
+                         for key in ("count", "mean", "m2", "min", "max", "counts")}
+                    ))
+                    for name in names
+                }
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable drift checkpoint %s: %s", self.path, e)
+            return {}
+
+    def _run(self):
+        while not self._stop.wait(self.checkpoint_interval):
+            if self._dirty:
+                try:
+                    self.checkpoint()
+                except Exception:
+                    logger.exception("Failed to checkpoint drift state to %s", self.path)
+
+    def close(self):
+        """Stop the checkpoint thread and write a final checkpoint."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._dirty:
+            self.checkpoint()
+
+
+def monitored(predict, monitor: DriftMonitor):
+    """Wrap a ``predict(name, X) -> (predictions, version)`` callable so every
+    input is fed to ``monitor``."""
+
+    def wrapper(name, X):
+        result = predict(name, X)
+        monitor.observe(name, X)
+        return result
+
+    return wrapper
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("diseases", nargs="*", help=f"default: {' '.join(DISEASES)}")
+    parser.add_argument("--source", default="app", help="checkpoint to read (app, service, ...)")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        monitor = DriftMonitor.from_env(args.source, checkpoint_interval=0)
+        report = {name: monitor.report(name) for name in args.diseases or DISEASES}
+    except (OSError, ValueError) as e:
+        sys.exit(f"error: {e}")
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+    for name, entry in report.items():
+        print(f"{name}: {entry['count']} inputs")
+        for column, scores in entry["features"].items():
+            print(f"  {column:<20} psi={scores['psi']:<8} mean_shift={scores['mean_shift']:<8}"
+                  f" {scores['status']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Estimator construction and the per-fold fit used by cross-validation.
+
+Kept apart from ``mediguard.training`` because ``joblib.Memory`` keys its
+cache on the cached function's module: under ``python -m
+mediguard.training`` that module would be ``__main__``, so the same fold
+would be cached twice depending on how it was launched.
+"""
+import time
+
+
+def build_estimator(kind: str, params: dict):
+    if kind == "svc_linear":
+        from sklearn.svm import SVC
+
+        return SVC(kernel="linear", **params)
+    if kind == "logistic_regression":
+        from sklearn.linear_model import LogisticRegression
+
+        return LogisticRegression(**params)
+    if kind == "sgd":
+        from sklearn.linear_model import SGDClassifier
+
+        return SGDClassifier(**params)
+    raise ValueError(f"Unknown estimator {kind!r}")
+
+
+def fit_fold(kind: str, params: dict, X_train, y_train, X_test, y_test) -> dict:
+    """Fit one fold and score it; cached on disk via ``joblib.Memory``."""
+    from sklearn import metrics
+
+    estimator = build_estimator(kind, params)
+    start = time.perf_counter()
+    estimator.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    predicted = estimator.predict(X_test)
+    return {
+        "accuracy": metrics.accuracy_score(y_test, predicted),
+        "precision": metrics.precision_score(y_test, predicted, zero_division=0),
+        "recall": metrics.recall_score(y_test, predicted, zero_division=0),
+        "f1": metrics.f1_score(y_test, predicted, zero_division=0),
+        "roc_auc": metrics.roc_auc_score(y_test, estimator.decision_function(X_test)),
+        "fit_seconds": fit_seconds,
+    }
@@ -0,0 +1,410 @@
+"""Parse-once columnar cache for CSV tables.
+
+The first read of a CSV parses it in chunks with an explicit dtype per
+column and writes each column to its own binary file under
+``.cache/tables``. Numeric columns are raw little-endian arrays. Text
+columns are UTF-8 bytes plus an offsets array. Later reads memory-map
+those files, so no text is parsed and only the slices actually used are
+paged in::
+
+    table = dataset_table("heart")
+    table.matrix(["age", "chol"])            # (rows, 2) float64
+    table.frame(["age"], start=0, stop=100)  # DataFrame view of a row range
+
+A leading UTF-8 BOM is stripped, so ``heart.csv``'s first column is ``age``
+rather than ``\\ufeffage``. The cache is keyed by the file's path. It is
+rebuilt when the file's SHA-256 or the requested dtypes change, or when a
+caller needs a column it did not store. A size/mtime stamp skips rehashing
+unchanged files. Tables of files outside ``dataset/`` are evicted, least
+recently used first, once the cache exceeds ``MEDIGUARD_TABLE_CACHE_BYTES``
+(default 2 GiB)::
+
+    python -m mediguard.ingest                 # build the dataset/ caches
+    python -m mediguard.ingest clinic_export.csv
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from mediguard.models import DATASET_DIR, DISEASES, ROOT, get_spec
+from mediguard.registry import file_digest
+
+TABLE_DIR = ROOT / ".cache" / "tables"
+MAX_CACHE_BYTES = int(os.environ.get("MEDIGUARD_TABLE_CACHE_BYTES", 2 << 30))
+DEFAULT_CHUNK_SIZE = 100_000
+FORMAT_VERSION = 1
+# Text columns are kept verbatim, so identifiers such as "007" survive
+# unchanged. Columns without an explicit dtype are stored as float64 if the
+# first chunk parses as numbers, and as text otherwise.
+TEXT = "str"
+NUMERIC = ("float64", "int64")
+
+
+def dataset_dtypes(name: str) -> dict[str, str]:
+    """The dtype schema for ``dataset/<name>.csv``: features as float64, the
+    outcome as int64."""
+    spec = get_spec(name)
+    return {**{column: "float64" for column in spec.features}, spec.target: "int64"}
+
+
+def read_header(path) -> list[str]:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def _stamp(path: Path) -> list:
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+class StringColumn:
+    """A memory-mapped column of text values, decoded on access."""
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, rows: slice) -> np.ndarray:
+        start, stop, _ = rows.indices(len(self))
+        bounds = self.offsets[start:stop + 1]
+        raw = self.data[bounds[0]:bounds[-1]].tobytes() if stop > start else b""
+        base = bounds[0] if stop > start else 0
+        return np.array([raw[a - base:b - base].decode() for a, b in zip(bounds[:-1], bounds[1:])],
+                        dtype=object)
+
+
+class Table:
+    """Read-only view of one cached CSV."""
+
+    def __init__(self, directory: Path, meta: dict):
+        self.directory = directory
+        self.meta = meta
+        self.rows = meta["rows"]
+        self.dtypes = {c["name"]: c["dtype"] for c in meta["columns"]}
+        self.columns = tuple(self.dtypes)
+        self._files = {c["name"]: c["file"] for c in meta["columns"]}
+        self._cache = {}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str):
+        """The memory-mapped column ``name``: an ndarray, or a :class:`StringColumn`."""
+        if name not in self.dtypes:
+            raise ValueError(f"Missing column(s) {name}")
+        column = self._cache.get(name)
+        if column is None:
+            column = self._cache[name] = self._map(name)
+        return column
+
+    def _map(self, name: str):
+        base = self.directory / self._files[name]
+        if self.dtypes[name] == TEXT:
+            return StringColumn(_memmap(base.with_suffix(".offsets"), "<i8", self.rows + 1),
+                                _memmap(base.with_suffix(".data"), "u1"))
+        return _memmap(base.with_suffix(".bin"), "<" + np.dtype(self.dtypes[name]).str[1:],
+                       self.rows)
+
+    def require(self, columns):
+        missing = [c for c in columns if c not in self.dtypes]
+        if missing:
+            raise ValueError(f"Missing column(s) {', '.join(missing)}")
+
+    def matrix(self, columns, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Numeric ``columns`` for rows ``[start, stop)`` as a float64 matrix."""
+        self.require(columns)
+        text = [c for c in columns if self.dtypes[c] == TEXT]
+        if text:
+            raise ValueError(f"Non-numeric column(s) {', '.join(text)}")
+        stop = self.rows if stop is None else min(stop, self.rows)
+        X = np.empty((max(stop - start, 0), len(columns)), dtype=np.float64)
+        for j, name in enumerate(columns):
+            X[:, j] = self.column(name)[start:stop]
+        return X
+
+    def frame(self, columns=None, start: int = 0, stop: int | None = None):
+        """Rows ``[start, stop)`` of ``columns`` as a DataFrame indexed by row number."""
+        import pandas as pd
+
+        columns = list(self.columns if columns is None else columns)
+        self.require(columns)
+        stop = self.rows if stop is None else min(stop, self.rows)
+        return pd.DataFrame(
+            {name: np.asarray(self.column(name)[start:stop]) for name in columns},
+            index=pd.RangeIndex(start, max(start, stop)),
+        )
+
+    def chunks(self, columns=None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        for start in range(0, self.rows, chunk_size):
+            yield self.frame(columns, start, start + chunk_size)
+
+
+def _memmap(path: Path, dtype: str, length: int | None = None) -> np.ndarray:
+    if length == 0 or path.stat().st_size == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=None if length is None else (length,))
+
+
+def table_dir(path: Path) -> Path:
+    key = hashlib.sha256(str(path).encode()).hexdigest()[:16]
+    return TABLE_DIR / f"{path.stem}-{key}"
+
+
+def _read_meta(directory: Path) -> dict | None:
+    try:
+        with open(directory / "meta.json") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("format_version") == FORMAT_VERSION else None
+
+
+def _write_meta(directory: Path, meta: dict):
+    tmp = directory / "meta.json.tmp"
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=1)
+    tmp.replace(directory / "meta.json")
+
+
+def _infer_dtypes(path: Path, columns, chunk_size: int) -> dict[str, str]:
+    import pandas as pd
+
+    if not columns:
+        return {}
+    sample = pd.read_csv(path, encoding="utf-8-sig", usecols=columns, nrows=chunk_size)
+    return {
+        column: "float64" if pd.api.types.is_numeric_dtype(sample[column])
+        and not pd.api.types.is_bool_dtype(sample[column]) else TEXT
+        for column in columns
+    }
+
+
+def _numeric_columns(path: Path, columns, chunk_size: int) -> set[str]:
+    """The ``columns`` whose every non-empty value parses as a number."""
+    import pandas as pd
+
+    numeric = set(columns)
+    for chunk in pd.read_csv(path, encoding="utf-8-sig", usecols=columns, dtype=object,
+                             chunksize=chunk_size):
+        for column in list(numeric):
+            values = chunk[column]
+            if pd.to_numeric(values, errors="coerce").isna().sum() > values.isna().sum():
+                numeric.discard(column)
+    return numeric
+
+
+def _parse(path: Path, directory: Path, header, dtypes: dict, chunk_size: int) -> int:
+    """Write the ``header`` columns of ``path`` into ``directory``; returns the row count."""
+    import pandas as pd
+
+    files, offsets = {}, {}
+    try:
+        for i, column in enumerate(header):
+            base = directory / f"c{i}"
+            if dtypes[column] == TEXT:
+                files[column] = (open(base.with_suffix(".offsets"), "wb"),
+                                 open(base.with_suffix(".data"), "wb"))
+                files[column][0].write(np.zeros(1, dtype="<i8").tobytes())
+                offsets[column] = 0
+            else:
+                files[column] = (open(base.with_suffix(".bin"), "wb"),)
+        rows = 0
+        try:
+            reader = pd.read_csv(
+                path,
+                encoding="utf-8-sig",
+                usecols=list(header),
+                dtype={c: (object if d == TEXT else d) for c, d in dtypes.items()},
+                chunksize=chunk_size,
+            )
+            for chunk in reader:
+                for column, dtype in dtypes.items():
+                    values = chunk[column]
+                    if dtype == TEXT:
+                        encoded = [str(v).encode() for v in values.fillna("")]
+                        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+                        ends = offsets[column] + np.cumsum(lengths)
+                        files[column][0].write(ends.astype("<i8").tobytes())
+                        files[column][1].write(b"".join(encoded))
+                        if len(ends):
+                            offsets[column] = int(ends[-1])
+                    else:
+                        little_endian = np.dtype(dtype).newbyteorder("<")
+                        files[column][0].write(values.to_numpy(dtype=little_endian).tobytes())
+                rows += len(chunk)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Could not parse {path.name}: {e}") from e
+    finally:
+        for handles in files.values():
+            for f in handles:
+                f.close()
+    return rows
+
+
+def build_table(path: Path, directory: Path, dtypes: dict, digest: str,
+                chunk_size: int = DEFAULT_CHUNK_SIZE, columns=None) -> Table:
+    """Parse ``path`` (only ``columns``, if given) into a fresh cache at ``directory``."""
+    header = read_header(path)
+    if len(set(header)) != len(header):
+        raise ValueError(f"{path.name} has duplicate column names")
+    missing = [c for c in [*dtypes, *(columns or ())] if c not in header]
+    if columns is not None:
+        header = [c for c in header if c in columns or c in dtypes]
+    if missing:
+        raise ValueError(f"{path.name} is missing column(s) {', '.join(missing)}")
+    for column, dtype in dtypes.items():
+        if dtype not in NUMERIC + (TEXT,):
+            raise ValueError(f"Unsupported dtype {dtype!r} for column {column!r}")
+    stamp = _stamp(path)
+    inferred = _infer_dtypes(path, [c for c in header if c not in dtypes], chunk_size)
+
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=directory.name + ".", dir=directory.parent))
+    try:
+        try:
+            columns = {**inferred, **dtypes}
+            rows = _parse(path, tmp, header, columns, chunk_size)
+        except ValueError:
+            guessed = [c for c, d in inferred.items() if d != TEXT]
+            if not guessed:
+                raise
+            # A column that looked numeric in the first chunk is not; find
+            # which with a scan of just those columns and parse again.
+            numeric = _numeric_columns(path, guessed, chunk_size)
+            columns = {**{c: "float64" if c in numeric else TEXT for c in inferred}, **dtypes}
+            rows = _parse(path, tmp, header, columns, chunk_size)
+        dtypes = {column: columns[column] for column in header}
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "source": str(path),
+            "digest": digest,
+            "stamp": stamp,
+            "rows": rows,
+            "columns": [{"name": c, "dtype": dtypes[c], "file": f"c{i}"} for i, c in enumerate(header)],
+        }
+        _write_meta(tmp, meta)
+        # Readers holding maps of the old files keep them until they close.
+        shutil.rmtree(directory, ignore_errors=True)
+        try:
+            os.replace(tmp, directory)
+        except OSError:
+            # Another process finished the same build first; use theirs.
+            other = _read_meta(directory)
+            if other is None or other["digest"] != digest:
+                raise
+            shutil.rmtree(tmp, ignore_errors=True)
+            return Table(directory, other)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return Table(directory, meta)
+
+
+def _matches(meta: dict, dtypes: dict, columns) -> bool:
+    stored = {c["name"]: c["dtype"] for c in meta["columns"]}
+    return (all(stored.get(column) == dtype for column, dtype in dtypes.items())
+            and all(column in stored for column in columns or ()))
+
+
+def _size(directory: Path) -> int:
+    return sum(f.stat().st_size for f in directory.iterdir())
+
+
+def prune(max_bytes: int | None = None, keep: Path | None = None) -> list[Path]:
+    """Evict the least recently used tables of non-``dataset/`` files until the
+    cache fits in ``max_bytes`` (default ``MAX_CACHE_BYTES``); returns the
+    removed directories."""
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    tables = []
+    for directory in TABLE_DIR.glob("*"):
+        meta = _read_meta(directory)
+        if meta is None:
+            continue
+        try:
+            tables.append((directory.stat().st_mtime, directory, _size(directory), meta["source"]))
+        except OSError:
+            continue
+    total = sum(size for _, _, size, _ in tables)
+    removed = []
+    for _, directory, size, source in sorted(tables):
+        if total <= max_bytes:
+            break
+        if directory == keep or Path(source).parent == DATASET_DIR.resolve():
+            continue
+        shutil.rmtree(directory, ignore_errors=True)
+        total -= size
+        removed.append(directory)
+    return removed
+
+
+def load_table(path, dtypes: dict | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+               columns=None) -> Table:
+    """Return the cached table for the CSV at ``path``, parsing it first if
+    the cache is missing or stale.
+
+    ``dtypes`` maps columns to ``"float64"``, ``"int64"`` or ``"str"``; other
+    columns are inferred from the first chunk. ``columns`` limits a new cache
+    to those columns (plus the ``dtypes`` ones) instead of the whole file.
+    Raises ``ValueError`` if a listed column is missing or does not parse as
+    its dtype.
+    """
+    path = Path(path).resolve()
+    dtypes = dict(dtypes or {})
+    directory = table_dir(path)
+    meta = _read_meta(directory)
+    if meta is not None and _matches(meta, dtypes, columns):
+        try:
+            # The directory's mtime records the last use, for prune().
+            os.utime(directory)
+        except OSError:
+            pass
+        stamp = _stamp(path)
+        if meta["stamp"] == stamp:
+            return Table(directory, meta)
+        digest = file_digest(path)
+        if meta["digest"] == digest:
+            # Touched but unchanged; remember the new stamp to skip the hash next time.
+            meta["stamp"] = stamp
+            _write_meta(directory, meta)
+            return Table(directory, meta)
+    else:
+        digest = file_digest(path)
+    table = build_table(path, directory, dtypes, digest, chunk_size, columns)
+    prune(keep=directory)
+    return table
+
+
+def dataset_table(name: str) -> Table:
+    """The cached ``dataset/`` table for disease ``name``."""
+    return load_table(DATASET_DIR / get_spec(name).dataset_file, dataset_dtypes(name))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*",
+                        help="CSV files to cache (default: every dataset/ table)")
+    args = parser.parse_args(argv)
+
+    try:
+        tables = [(p, load_table(p)) for p in args.paths] or [
+            (DATASET_DIR / get_spec(name).dataset_file, dataset_table(name)) for name in DISEASES
+        ]
+    except (OSError, ValueError) as e:
+        sys.exit(f"error: {e}")
+    for path, table in tables:
+        print(f"{path}: {len(table)} rows, {len(table.columns)} columns -> {table.directory}")
+
+
+if __name__ == "__main__":
+    main()
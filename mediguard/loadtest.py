@@ -0,0 +1,282 @@
+"""Concurrent-session load test against a local ``streamlit run app.py``.
+
+Starts the app in a subprocess and drives N simulated clinicians over the
+same websocket protocol the browser uses. Each session repeatedly switches
+to a random disease page and submits its form with a row drawn from
+``dataset/``. For each N the report gives rerun latency percentiles,
+throughput and the server's resident memory per session, as JSON::
+
+    python -m mediguard.loadtest --sessions 1 5 10 25 --iterations 20 -o load.json
+
+Memory is read from ``/proc``, so the RSS figures need Linux.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+
+from mediguard.bench import PAGES, summarize
+from mediguard.models import DISEASES, ROOT, get_spec, load_dataset
+
+SESSION_LEVELS = (1, 5, 10, 25)
+STARTUP_TIMEOUT = 60
+RUN_TIMEOUT = 60
+
+
+def rss_bytes(pid: int) -> int | None:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, env: dict) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", str(ROOT / "app.py"),
+         "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"streamlit exited: {proc.stderr.read().decode()[-2000:]}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("streamlit did not become healthy in time")
+
+
+class Session:
+    """One simulated browser tab speaking Streamlit's websocket protocol."""
+
+    def __init__(self, port: int):
+        self.url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        self.widgets = {}
+        self.page_widget = None
+        self.page = None
+
+    async def connect(self):
+        from tornado.websocket import websocket_connect
+
+        self.ws = await websocket_connect(self.url, max_message_size=64 * 1024 * 1024)
+
+    def close(self):
+        self.ws.close()
+
+    async def rerun(self, states=(), fragment_id: str = "") -> float:
+        """Send one rerun and wait for it to finish; returns seconds taken."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        if fragment_id:
+            msg.rerun_script.fragment_id = fragment_id
+        msg.rerun_script.widget_states.widgets.extend(states)
+        start = time.perf_counter()
+        self.ws.write_message(msg.SerializeToString(), binary=True)
+        widgets = {}
+        while True:
+            data = await asyncio.wait_for(self.ws.read_message(), RUN_TIMEOUT)
+            if data is None:
+                raise ConnectionError("server closed the session")
+            fm = ForwardMsg()
+            fm.ParseFromString(data)
+            kind = fm.WhichOneof("type")
+            if kind == "delta" and fm.delta.WhichOneof("type") == "new_element":
+                element = fm.delta.new_element
+                etype = element.WhichOneof("type")
+                if etype == "exception":
+                    raise RuntimeError(f"app raised: {element.exception.message}")
+                if etype in ("number_input", "selectbox", "slider", "button", "multiselect"):
+                    widget = getattr(element, etype)
+                    widgets[widget.label] = (etype, widget, fm.delta.fragment_id)
+                elif etype == "component_instance" and self.page_widget is None:
+                    self.page_widget = element.component_instance.id
+            elif kind == "script_finished":
+                break
+        if widgets:
+            self.widgets = widgets
+        return time.perf_counter() - start
+
+    def _page_state(self, page: str):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        state = WidgetState(id=self.page_widget)
+        state.json_value = json.dumps(page)
+        return state
+
+    async def open_page(self, page: str) -> float:
+        self.page = page
+        return await self.rerun([self._page_state(page)])
+
+    async def submit(self, name: str, row) -> float:
+        """Fill the current page's form with ``row`` and submit it."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        states = [self._page_state(self.page)]
+        fragment_id = ""
+        for field, value in zip(get_spec(name).schema.fields, row):
+            etype, widget, fragment_id = self.widgets[field.label]
+            state = WidgetState(id=widget.id)
+            if etype == "selectbox":
+                state.int_value = field.codes.index(int(value))
+            elif etype == "slider":
+                state.double_array_value.data.append(float(value))
+            elif widget.data_type == widget.INT:
+                state.int_value = int(value)
+            else:
+                state.double_value = float(value)
+            states.append(state)
+        button = next(w for etype, w, _ in self.widgets.values()
+                      if etype == "button" and w.is_form_submitter)
+        states.append(WidgetState(id=button.id, trigger_value=True))
+        return await self.rerun(states, fragment_id)
+
+
+async def run_session(port: int, rows: dict, iterations: int, think: float, rng, samples: dict):
+    """Drive one session; it is returned still connected so its server-side
+    state counts towards the memory measurement."""
+    session = Session(port)
+    await session.connect()
+    try:
+        samples["first_run"].append(await session.rerun())
+        for _ in range(iterations):
+            name = rng.choice(list(rows))
+            samples["page_switch"].append(await session.open_page(PAGES[name]))
+            row = rows[name][rng.randrange(len(rows[name]))]
+            samples["submit"].append(await session.submit(name, row))
+            if think:
+                await asyncio.sleep(rng.uniform(0, 2 * think))
+    except BaseException:
+        session.close()
+        raise
+    return session
+
+
+async def run_level(port: int, pid: int, n: int, rows: dict, iterations: int, think: float,
+                    seed: int) -> dict:
+    samples = {"first_run": [], "page_switch": [], "submit": []}
+    rss_before = rss_bytes(pid)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        run_session(port, rows, iterations, think, random.Random(seed + i), samples)
+        for i in range(n)
+    ), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    # Sampled while every session is still connected and holding its state.
+    rss_peak = rss_bytes(pid)
+    errors = [repr(r) for r in results if isinstance(r, BaseException)]
+    for r in results:
+        if isinstance(r, Session):
+            r.close()
+    reruns = sum(len(v) for v in samples.values())
+    report = {
+        "sessions": n,
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "reruns_per_s": round(reruns / elapsed, 2) if elapsed else None,
+        "submits_per_s": round(len(samples["submit"]) / elapsed, 2) if elapsed else None,
+        "latency": {kind: summarize(v) for kind, v in samples.items() if v},
+        "rss_before_mb": rss_before and round(rss_before / 2**20, 1),
+        "rss_peak_mb": rss_peak and round(rss_peak / 2**20, 1),
+        "rss_per_session_mb": (
+            round((rss_peak - rss_before) / n / 2**20, 3) if rss_before and rss_peak else None
+        ),
+    }
+    if errors:
+        report["first_errors"] = errors[:3]
+    return report
+
+
+def run(levels, iterations: int, think: float, seed: int, port: int | None = None) -> dict:
+    rows = {}
+    for name in DISEASES:
+        X, _ = load_dataset(name)
+        rows[name] = X.to_numpy(dtype=np.float64)
+    port = port or free_port()
+    # Keep the synthetic traffic out of the real audit log and drift state.
+    with tempfile.TemporaryDirectory() as scratch:
+        env = dict(os.environ, MEDIGUARD_AUDIT_DIR=os.path.join(scratch, "audit"),
+                   MEDIGUARD_DRIFT_DIR=os.path.join(scratch, "drift"))
+        proc = start_server(port, env)
+        try:
+            # One warm-up session pays the imports and model loads, so the
+            # levels measure steady-state cost.
+            asyncio.run(run_level(port, proc.pid, 1, rows, len(DISEASES), 0, seed))
+            baseline = rss_bytes(proc.pid)
+            levels_out = [
+                asyncio.run(run_level(port, proc.pid, n, rows, iterations, think, seed + 1000 * i))
+                for i, n in enumerate(levels)
+            ]
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "iterations": iterations,
+        "think_ms": think * 1000,
+        "rss_after_warmup_mb": baseline and round(baseline / 2**20, 1),
+        "levels": levels_out,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=list(SESSION_LEVELS),
+                        help="concurrent session counts to test, in order")
+    parser.add_argument("--iterations", type=int, default=10,
+                        help="page switch + submit cycles per session")
+    parser.add_argument("--think-ms", type=float, default=0,
+                        help="mean pause between cycles")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, help="default: a free port")
+    parser.add_argument("--output", "-o", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+    if min(args.sessions) < 1 or args.iterations < 1:
+        parser.error("--sessions and --iterations must be positive")
+
+    try:
+        results = run(args.sessions, args.iterations, args.think_ms / 1000, args.seed, args.port)
+    except (OSError, RuntimeError) as e:
+        sys.exit(f"error: {e}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Low-overhead in-process metrics and an optional slow-request profiler.
+
+Timing spans feed fixed-bucket histograms (one bisect and a few additions
+per observation) labelled by span and model, and are rendered in the
+Prometheus text format by :func:`render`. The HTTP service serves them at
+``GET /metrics``; the Streamlit app serves them on
+``MEDIGUARD_METRICS_PORT`` when set, bound to localhost unless
+``MEDIGUARD_METRICS_HOST`` says otherwise (e.g. ``0.0.0.0`` for a scraper on
+another machine).
+
+With ``MEDIGUARD_PROFILE_SLOW_MS`` set, profiled sections are sampled by a
+background thread and, when slower than the threshold, their stacks are
+written in folded flame-graph format (``flamegraph.pl``/speedscope) to
+``MEDIGUARD_PROFILE_DIR``.
+"""
+import bisect
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans range from microsecond dot products to whole page reruns.
+BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count", "_lock")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(BUCKETS, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+
+_histograms: dict[tuple, Histogram] = {}
+_counters: dict[tuple, int] = {}
+_gauges: dict[tuple, float] = {}
+_registry_lock = threading.Lock()
+
+
+def _labels_key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted(labels.items())))
+
+
+def observe(name: str, seconds: float, **labels):
+    key = _labels_key(name, labels)
+    hist = _histograms.get(key)
+    if hist is None:
+        with _registry_lock:
+            hist = _histograms.setdefault(key, Histogram())
+    hist.observe(seconds)
+
+
+def increment(name: str, value: int = 1, **labels):
+    key = _labels_key(name, labels)
+    with _registry_lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def gauge(name: str, value: float, **labels):
+    key = _labels_key(name, labels)
+    with _registry_lock:
+        _gauges[key] = value
+
+
+@contextmanager
+def span(name: str, **labels):
+    """Time the block into ``mediguard_span_seconds{span=name, ...}``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe("mediguard_span_seconds", time.perf_counter() - start, span=name, **labels)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()) -> str:
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def render() -> str:
+    """Return every metric in the Prometheus text exposition format."""
+    lines = []
+    with _registry_lock:
+        histograms = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+        gauges = sorted(_gauges.items())
+    seen = set()
+    for (name, labels), hist in histograms:
+        if name not in seen:
+            lines.append(f"# TYPE {name} histogram")
+            seen.add(name)
+        with hist._lock:
+            counts, total, count = list(hist.counts), hist.sum, hist.count
+        cumulative = 0
+        for bound, n in zip(BUCKETS + (float("inf"),), counts):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', le)])} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    for (name, labels), value in counters:
+        if name not in seen:
+            lines.append(f"# TYPE {name} counter")
+            seen.add(name)
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    for (name, labels), value in gauges:
+        if name not in seen:
+            lines.append(f"# TYPE {name} gauge")
+            seen.add(name)
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _registry_lock:
+        _histograms.clear()
+        _counters.clear()
+        _gauges.clear()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve ``/metrics`` from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+# ------------------------------------------------------------------
+# Slow-request sampling profiler
+# ------------------------------------------------------------------
+class SlowRequestProfiler:
+    """Samples the stacks of threads inside a profiled section.
+
+    Sampling only runs while at least one section is active, and a section's
+    samples are written out only when it ran longer than ``threshold``.
+    """
+
+    def __init__(self, threshold: float, output_dir: Path, interval: float = 0.001):
+        self.threshold = threshold
+        self.output_dir = Path(output_dir)
+        self.interval = interval
+        self._active: dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        threading.Thread(target=self._sample, name="slow-request-profiler", daemon=True).start()
+
+    def start(self, name: str):
+        """Begin sampling the calling thread; pass the result to ``finish``.
+
+        A thread has at most one open section: starting a new one replaces
+        any section left open by an exception.
+        """
+        stacks = Counter()
+        with self._lock:
+            self._active[threading.get_ident()] = stacks
+            self._wake.set()
+        return (name, threading.get_ident(), stacks, time.perf_counter())
+
+    def finish(self, session):
+        name, ident, stacks, start = session
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            if self._active.get(ident) is stacks:
+                del self._active[ident]
+        if elapsed >= self.threshold and stacks:
+            self._dump(name, elapsed, stacks)
+
+    def _sample(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                active = dict(self._active)
+                if not active:
+                    self._wake.clear()
+                    continue
+            frames = sys._current_frames()
+            for ident, stacks in active.items():
+                frame = frames.get(ident)
+                if frame is not None:
+                    stacks[_fold(frame)] += 1
+                else:
+                    # The thread exited without finishing its section.
+                    with self._lock:
+                        if self._active.get(ident) is stacks:
+                            del self._active[ident]
+            time.sleep(self.interval)
+
+    def _dump(self, name: str, elapsed: float, stacks: Counter):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+        path = self.output_dir / f"{time.strftime('%Y%m%dT%H%M%S')}-{safe}-{int(elapsed * 1000)}ms.folded"
+        with open(path, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        logger.warning("Slow %s (%.1f ms); profile written to %s", name, elapsed * 1000, path)
+
+
+def _fold(frame) -> str:
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+_profiler = None
+if os.environ.get("MEDIGUARD_PROFILE_SLOW_MS"):
+    _profiler = SlowRequestProfiler(
+        float(os.environ["MEDIGUARD_PROFILE_SLOW_MS"]) / 1000,
+        os.environ.get("MEDIGUARD_PROFILE_DIR", "profiles"),
+    )
+
+
+def begin(name: str):
+    """Start timing (and, if enabled, profiling) a section that cannot be
+    expressed as a ``with`` block, such as a whole Streamlit script run."""
+    session = _profiler.start(name) if _profiler is not None else None
+    return (name, time.perf_counter(), session)
+
+
+def end(token, **labels):
+    name, start, session = token
+    observe("mediguard_span_seconds", time.perf_counter() - start, span=name, **labels)
+    if session is not None:
+        _profiler.finish(session)
+
+
+@contextmanager
+def profiled(name: str, **labels):
+    """Like ``span``, but also profiled when the slow-request profiler is on."""
+    token = begin(name)
+    try:
+        yield
+    finally:
+        end(token, **labels)
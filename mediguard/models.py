@@ -0,0 +1,148 @@
+"""Disease model registry: file locations, schemas and loading."""
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+
+from mediguard.schema import SCHEMAS, FeatureSchema, SchemaError
+
+ROOT = Path(__file__).resolve().parent.parent
+DATASET_DIR = ROOT / "dataset"
+
+# The app historically looked in 'saved_models/', while the repo ships the
+# pickles in 'saved models/'. Accept either so both layouts keep working.
+MODEL_DIRS = (ROOT / "saved_models", ROOT / "saved models")
+
+
+@dataclass(frozen=True)
+class DiseaseSpec:
+    name: str
+    model_file: str
+    dataset_file: str
+    schema: FeatureSchema
+    target: str
+
+    @property
+    def features(self) -> tuple[str, ...]:
+        return self.schema.columns
+
+    @property
+    def precision(self) -> tuple[int, ...]:
+        """Decimal places each feature is entered with on the form."""
+        return self.schema.precision
+
+    @property
+    def artifact_file(self) -> str:
+        return self.model_file.rsplit(".", 1)[0] + ".mgm"
+
+
+DISEASES = {
+    "diabetes": DiseaseSpec(
+        name="diabetes",
+        model_file="diabetes_model.sav",
+        dataset_file="diabetes.csv",
+        schema=SCHEMAS["diabetes"],
+        target="Outcome",
+    ),
+    "heart": DiseaseSpec(
+        name="heart",
+        model_file="heart_disease_model.sav",
+        dataset_file="heart.csv",
+        schema=SCHEMAS["heart"],
+        target="target",
+    ),
+    "parkinsons": DiseaseSpec(
+        name="parkinsons",
+        model_file="parkinsons_model.sav",
+        dataset_file="parkinsons.csv",
+        schema=SCHEMAS["parkinsons"],
+        target="status",
+    ),
+}
+
+
+def get_spec(name: str) -> DiseaseSpec:
+    try:
+        return DISEASES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown disease {name!r}; expected one of {', '.join(DISEASES)}"
+        ) from None
+
+
+def model_path(filename: str) -> Path:
+    for directory in MODEL_DIRS:
+        path = directory / filename
+        if path.exists():
+            return path
+    return MODEL_DIRS[0] / filename
+
+
+def load_dataset(name: str):
+    """Return the ``dataset/`` table for ``name`` as ``(X, y)``.
+
+    Read through the binary cache in ``mediguard.ingest``, so the CSV is only
+    parsed again after it changes.
+    """
+    from mediguard.ingest import dataset_table
+
+    spec = get_spec(name)
+    data = dataset_table(name).frame([*spec.features, spec.target])
+    return data[list(spec.features)], data[spec.target]
+
+
+def dataset_stamp(name: str) -> tuple[int, int]:
+    """Size and mtime of the ``dataset/`` CSV for ``name``; a change means
+    indexes built from it must be refreshed."""
+    st = (DATASET_DIR / get_spec(name).dataset_file).stat()
+    return (st.st_size, st.st_mtime_ns)
+
+
+def load_estimator(name: str):
+    with open(model_path(get_spec(name).model_file), "rb") as f:
+        return pickle.load(f)
+
+
+# A fresh checkout writes both files within moments of each other in no
+# particular order; only a pickle written well after the artifact is newer.
+_ARTIFACT_GRACE_NS = 2_000_000_000
+
+
+def model_source(name: str) -> Path:
+    """Return the file ``load_scorer`` would read for ``name``.
+
+    That is the memory-mapped artifact (see ``mediguard.artifact``) unless the
+    pickle next to it is newer, e.g. straight after a notebook retrain.
+    """
+    spec = get_spec(name)
+    pickled = model_path(spec.model_file)
+    artifact = model_path(spec.artifact_file)
+    if artifact.exists() and not (
+        pickled.exists()
+        and pickled.stat().st_mtime_ns > artifact.stat().st_mtime_ns + _ARTIFACT_GRACE_NS
+    ):
+        return artifact
+    return pickled
+
+
+def load_scorer(name: str, path: Path | None = None):
+    """Load the ``name`` model for scoring.
+
+    Artifacts load without unpickling or importing sklearn; pickled
+    estimators are compiled to a ``LinearScorer`` where possible.
+    """
+    from mediguard.artifact import load_artifact
+    from mediguard.scorer import compile_model
+
+    path = path or model_source(name)
+    if path.suffix == ".mgm":
+        model = load_artifact(path)
+    else:
+        with open(path, "rb") as f:
+            model = compile_model(pickle.load(f))
+    # A model trained on a different column order would score garbage
+    # without any error, so refuse it up front.
+    features = getattr(model, "features", None)
+    if features and tuple(features) != get_spec(name).features:
+        raise SchemaError(f"{path.name} was trained on columns {list(features)}, "
+                          f"which do not match the {name} schema")
+    return model
@@ -0,0 +1,141 @@
+"""Nearest labelled cases ("similar patients") from the training data.
+
+Each dataset is standardized and indexed once with a KD-tree, so a lookup
+visits O(log n) nodes instead of scanning every case::
+
+    index = load_neighbor_index("heart")
+    distances, rows = index.query(X, k=5)
+    index.similar(X, k=5)   # per patient: [{"row", "outcome", "distance"}, ...]
+
+The cases and the built tree's arrays are saved with ``np.savez`` under
+``.cache/neighbors``, keyed by the dataset's SHA-256 and the scikit-learn
+version, so neither the CSV nor the tree is processed again at startup and
+loading never unpickles anything::
+
+    python -m mediguard.neighbors            # build all indexes
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from mediguard.models import DATASET_DIR, DISEASES, ROOT, get_spec, load_dataset
+from mediguard.registry import file_digest
+
+INDEX_DIR = ROOT / ".cache" / "neighbors"
+DEFAULT_K = 5
+FORMAT_VERSION = 3
+# The array part of ``KDTree.__getstate__``; it is followed by seven integer
+# counters, the distance metric and the (unused) sample weights.
+TREE_ARRAYS = ("data", "idx_array", "node_data", "node_bounds")
+TREE_STATE_LENGTH = len(TREE_ARRAYS) + 7 + 2
+
+
+def tree_arrays(tree) -> dict:
+    """The Euclidean ``tree``'s state as plain arrays, for ``np.savez``."""
+    state = tree.__getstate__()
+    if len(state) != TREE_STATE_LENGTH or state[-1] is not None:
+        raise ValueError("Unsupported KDTree state layout")
+    arrays = {f"tree_{key}": value for key, value in zip(TREE_ARRAYS, state)}
+    arrays["tree_counters"] = np.array(state[len(TREE_ARRAYS):-2], dtype=np.int64)
+    return arrays
+
+
+def restore_tree(arrays):
+    """Rebuild a Euclidean KDTree from :func:`tree_arrays` output without refitting."""
+    from sklearn.metrics import DistanceMetric
+    from sklearn.neighbors import KDTree
+
+    tree = KDTree.__new__(KDTree)
+    tree.__setstate__((
+        *(np.ascontiguousarray(arrays[f"tree_{key}"]) for key in TREE_ARRAYS),
+        *(int(n) for n in arrays["tree_counters"]),
+        DistanceMetric.get_metric("euclidean"),
+        None,
+    ))
+    return tree
+
+
+class NeighborIndex:
+    def __init__(self, name: str, X, y, leaf_size: int = 30, tree=None):
+        from sklearn.neighbors import KDTree
+
+        self.name = name
+        self.X = np.ascontiguousarray(X, dtype=np.float64)
+        self.y = np.asarray(y)
+        self.mean = self.X.mean(axis=0)
+        # Constant columns would divide by zero; leave them unscaled.
+        scale = self.X.std(axis=0)
+        self.scale = np.where(scale > 0, scale, 1.0)
+        self.tree = tree if tree is not None else KDTree(self.standardize(self.X), leaf_size=leaf_size)
+
+    def __len__(self) -> int:
+        return len(self.X)
+
+    def standardize(self, X) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+
+    def query(self, X, k: int = DEFAULT_K) -> tuple[np.ndarray, np.ndarray]:
+        """Standardized distances and dataset row numbers of the ``k`` nearest
+        cases to each row of ``X``, nearest first."""
+        k = min(k, len(self))
+        return self.tree.query(self.standardize(np.atleast_2d(X)), k=k)
+
+    def similar(self, X, k: int = DEFAULT_K) -> list[list[dict]]:
+        distances, rows = self.query(X, k)
+        return [
+            [
+                {"row": int(r), "outcome": self.y[r].item(), "distance": round(float(d), 4)}
+                for d, r in zip(row_distances, row_numbers)
+            ]
+            for row_distances, row_numbers in zip(distances, rows)
+        ]
+
+
+def index_path(name: str):
+    return INDEX_DIR / f"{name}.npz"
+
+
+def build_neighbor_index(name: str) -> NeighborIndex:
+    X, y = load_dataset(name)
+    return NeighborIndex(name, X.to_numpy(dtype=np.float64), y.to_numpy())
+
+
+def load_neighbor_index(name: str) -> NeighborIndex:
+    """Load the cached index for ``name``, rebuilding it if the dataset changed."""
+    import sklearn
+
+    digest = file_digest(DATASET_DIR / get_spec(name).dataset_file)
+    path = index_path(name)
+    try:
+        with np.load(path) as data:
+            if (int(data["format_version"]) == FORMAT_VERSION and str(data["digest"]) == digest
+                    and str(data["sklearn_version"]) == sklearn.__version__):
+                return NeighborIndex(name, data["X"], data["y"], tree=restore_tree(data))
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    index = build_neighbor_index(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp.npz")
+    np.savez(tmp, format_version=FORMAT_VERSION, digest=digest, sklearn_version=sklearn.__version__,
+             X=index.X, y=index.y, **tree_arrays(index.tree))
+    tmp.replace(path)
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("diseases", nargs="*", help=f"default: {' '.join(DISEASES)}")
+    args = parser.parse_args(argv)
+
+    try:
+        for name in args.diseases or DISEASES:
+            index = load_neighbor_index(name)
+            print(f"{name}: {len(index)} cases -> {index_path(name)}")
+    except (OSError, ValueError) as e:
+        sys.exit(f"error: {e}")
+
+
+if __name__ == "__main__":
+    main()
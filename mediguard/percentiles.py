@@ -0,0 +1,250 @@
+"""Population percentile index: where a patient's values sit among past cases.
+
+For each disease the index keeps, per outcome class, every feature's values
+from ``dataset/`` in sorted order, plus summary quantiles read straight off
+those arrays. A lookup is two binary searches per feature, so no DataFrame
+is scanned per request::
+
+    index = load_index("diabetes")
+    index.percentiles(X)   # {class: (rows, features) array of 0-100 ranks}
+    index.summary()        # {class: {feature: {"p5": ..., "p50": ..., ...}}}
+
+The index is saved under ``.cache/percentiles`` together with the byte
+offset and hash of the CSV prefix it covers. When rows are appended to the
+CSV only the new tail is parsed and merged into the sorted arrays; any
+other edit triggers a full rebuild::
+
+    python -m mediguard.percentiles            # build/refresh all indexes
+"""
+import argparse
+import hashlib
+import io
+import sys
+
+import numpy as np
+
+from mediguard.ingest import dataset_table
+from mediguard.models import DATASET_DIR, DISEASES, ROOT, get_spec
+
+INDEX_DIR = ROOT / ".cache" / "percentiles"
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+FORMAT_VERSION = 2
+
+
+def _read_rows(path, start: int, end: int, columns, target: str, header: list[str]):
+    """Parse the complete CSV lines in bytes ``[start, end)``, past the header,
+    into ``(X, y)``."""
+    import pandas as pd
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    frame = pd.read_csv(io.BytesIO(data), header=None, names=header)
+    frame = frame.dropna(subset=[target])
+    return frame[list(columns)].to_numpy(dtype=np.float64), frame[target].to_numpy()
+
+
+def sorted_quantiles(values: np.ndarray, q=QUANTILES) -> np.ndarray:
+    """Linearly interpolated quantiles (as ``np.quantile``) of each row of
+    the already sorted ``values``, as a ``(len(q), rows)`` array."""
+    position = np.asarray(q) * (values.shape[1] - 1)
+    lo = np.floor(position).astype(np.intp)
+    hi = np.minimum(lo + 1, values.shape[1] - 1)
+    return values[:, lo].T + (values[:, hi] - values[:, lo]).T * (position - lo)[:, None]
+
+
+class PercentileIndex:
+    def __init__(self, name: str, columns, sorted_values: dict, offset: int = 0,
+                 digest: str = "", header=(), quantiles: dict | None = None):
+        self.name = name
+        self.columns = tuple(columns)
+        # {class label: (features, cases) array, each row sorted ascending}
+        self.sorted_values = sorted_values
+        self.offset = offset
+        self.digest = digest
+        self.header = list(header)
+        # {class label: (len(QUANTILES), features) array}
+        self.quantiles = quantiles if quantiles is not None else {
+            label: sorted_quantiles(values) for label, values in sorted_values.items()
+        }
+
+    @property
+    def classes(self) -> tuple:
+        return tuple(sorted(self.sorted_values))
+
+    def counts(self) -> dict:
+        return {label: values.shape[1] for label, values in self.sorted_values.items()}
+
+    def summary(self) -> dict:
+        """Per-class quantiles of every feature: ``{class: {feature: {"p5": ...}}}``."""
+        names = [f"p{round(q * 100)}" for q in QUANTILES]
+        return {
+            label: {
+                column: dict(zip(names, quantiles[:, j].tolist()))
+                for j, column in enumerate(self.columns)
+            }
+            for label, quantiles in self.quantiles.items()
+        }
+
+    @classmethod
+    def from_arrays(cls, name, columns, X, y, **kwargs) -> "PercentileIndex":
+        sorted_values = {
+            label.item(): np.sort(X[y == label].T, axis=1) for label in np.unique(y)
+        }
+        return cls(name, columns, sorted_values, **kwargs)
+
+    def merge(self, X, y, **kwargs) -> "PercentileIndex":
+        """Return a new index that also covers rows ``X``/``y``.
+
+        Each class's arrays are merged with the sorted new values in linear
+        time instead of being re-sorted.
+        """
+        sorted_values = dict(self.sorted_values)
+        for label in np.unique(y):
+            label = label.item()
+            new = np.sort(X[y == label].T, axis=1)
+            old = sorted_values.get(label)
+            if old is None:
+                sorted_values[label] = new
+                continue
+            merged = np.empty((old.shape[0], old.shape[1] + new.shape[1]))
+            for j in range(old.shape[0]):
+                positions = np.searchsorted(old[j], new[j], side="right") + np.arange(new.shape[1])
+                mask = np.ones(merged.shape[1], dtype=bool)
+                mask[positions] = False
+                merged[j, positions] = new[j]
+                merged[j, mask] = old[j]
+            sorted_values[label] = merged
+        return PercentileIndex(self.name, self.columns, sorted_values, **kwargs)
+
+    def percentiles(self, X) -> dict:
+        """Mid-rank percentile (0-100) of each value in ``X`` within each class.
+
+        Ties count half, so a value shared by every case in a class sits at
+        the 50th percentile rather than the 100th.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        out = {}
+        for label, values in self.sorted_values.items():
+            n = values.shape[1]
+            ranks = np.empty(X.shape)
+            for j in range(len(self.columns)):
+                below = np.searchsorted(values[j], X[:, j], side="left")
+                at_or_below = np.searchsorted(values[j], X[:, j], side="right")
+                ranks[:, j] = (below + at_or_below) / 2
+            out[label] = ranks * (100.0 / n)
+        return out
+
+    def save(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {f"class_{label}": values for label, values in self.sorted_values.items()}
+        arrays |= {f"quantiles_{label}": values for label, values in self.quantiles.items()}
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez(
+            tmp,
+            format_version=FORMAT_VERSION,
+            columns=np.array(self.columns),
+            quantile_levels=np.array(QUANTILES),
+            header=np.array(self.header),
+            offset=self.offset,
+            digest=self.digest,
+            **arrays,
+        )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, name: str, path) -> "PercentileIndex":
+        with np.load(path) as data:
+            if int(data["format_version"]) != FORMAT_VERSION:
+                raise ValueError(f"{path} has an unsupported index format")
+            if data["quantile_levels"].tolist() != list(QUANTILES):
+                raise ValueError(f"{path} was saved with different quantiles")
+            sorted_values = {
+                int(key[len("class_"):]): data[key] for key in data.files if key.startswith("class_")
+            }
+            quantiles = {label: data[f"quantiles_{label}"] for label in sorted_values}
+            return cls(name, data["columns"].tolist(), sorted_values, int(data["offset"]),
+                       str(data["digest"]), data["header"].tolist(), quantiles)
+
+
+def index_path(name: str):
+    return INDEX_DIR / f"{name}.npz"
+
+
+def build_index(name: str, index: PercentileIndex | None = None) -> tuple[PercentileIndex, str]:
+    """Bring ``index`` up to date with the dataset CSV.
+
+    Returns the index and how it was obtained: ``"unchanged"``,
+    ``"appended"`` or ``"rebuilt"``.
+    """
+    spec = get_spec(name)
+    path = DATASET_DIR / spec.dataset_file
+    with open(path, "rb") as f:
+        data = f.read()
+    end = len(data)
+    header = data[:data.find(b"\n")].decode("utf-8-sig").strip().split(",")
+    if (
+        index is not None
+        and index.columns == spec.features
+        and index.header == header
+        and 0 < index.offset <= end
+        and hashlib.sha256(data[:index.offset]).hexdigest() == index.digest
+        # Rows appended to a file without a trailing newline extend its last row.
+        and (data[index.offset - 1:index.offset] == b"\n"
+             or data[index.offset:index.offset + 1] in (b"", b"\n", b"\r"))
+    ):
+        if index.offset == end:
+            return index, "unchanged"
+        X, y = _read_rows(path, index.offset, end, spec.features, spec.target, header)
+        digest = hashlib.sha256(data[:end]).hexdigest()
+        return index.merge(X, y, offset=end, digest=digest, header=header), "appended"
+    # A full rebuild reads the parsed columns from the binary cache.
+    table = dataset_table(name)
+    X, y = table.matrix(spec.features), np.asarray(table.column(spec.target))
+    digest = hashlib.sha256(data[:end]).hexdigest()
+    return PercentileIndex.from_arrays(name, spec.features, X, y, offset=end, digest=digest,
+                                       header=header), "rebuilt"
+
+
+def _load_saved(name: str) -> PercentileIndex | None:
+    path = index_path(name)
+    if not path.exists():
+        return None
+    try:
+        return PercentileIndex.load(name, path)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def load_index(name: str, refresh: bool = True) -> PercentileIndex:
+    """Load the saved index for ``name``, refreshing and re-saving it if the
+    dataset has changed."""
+    index = _load_saved(name)
+    if index is not None and not refresh:
+        return index
+    index, how = build_index(name, index)
+    if how != "unchanged":
+        index.save(index_path(name))
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("diseases", nargs="*", help=f"default: {' '.join(DISEASES)}")
+    args = parser.parse_args(argv)
+
+    try:
+        for name in args.diseases or DISEASES:
+            get_spec(name)
+            index, how = build_index(name, _load_saved(name))
+            path = index_path(name)
+            if how != "unchanged":
+                index.save(path)
+            counts = ", ".join(f"class {k}: {v}" for k, v in sorted(index.counts().items()))
+            print(f"{name}: {how} ({counts}) -> {path}")
+    except (OSError, ValueError) as e:
+        sys.exit(f"error: {e}")
+
+
+if __name__ == "__main__":
+    main()
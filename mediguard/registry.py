@@ -0,0 +1,133 @@
+"""Hot-reloading model registry.
+
+Models are loaded lazily on first ``get``. A background thread then polls
+each loaded model's file (mtime/size, confirmed by content hash), loads a
+changed file off the request path and swaps it in atomically. Callers keep
+the ``LoadedModel`` they were handed, so in-flight predictions finish on the
+version they started with.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from mediguard import metrics
+from mediguard.cache import DEFAULT_CACHE_SIZE, cached, reset_cache
+from mediguard.models import load_scorer, model_source
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RELOAD_INTERVAL = float(os.environ.get("MEDIGUARD_RELOAD_INTERVAL", 5.0))
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stamp(path: Path) -> tuple:
+    st = path.stat()
+    return (str(path), st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    name: str
+    model: object
+    version: str
+    path: Path
+    digest: str
+    loaded_at: float = field(default_factory=time.time)
+
+    def predict(self, X, cache_size: int = DEFAULT_CACHE_SIZE):
+        with metrics.span("predict", model=self.name):
+            predictions = cached(self.name, self.model, cache_size, self.version).predict(X)
+        metrics.increment("mediguard_predictions_total", len(predictions), model=self.name)
+        return predictions
+
+
+class ModelRegistry:
+    def __init__(self, reload_interval: float = DEFAULT_RELOAD_INTERVAL,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        self.reload_interval = reload_interval
+        self.cache_size = cache_size
+        self._models: dict[str, LoadedModel] = {}
+        self._stamps: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get(self, name: str) -> LoadedModel:
+        entry = self._models.get(name)
+        if entry is None:
+            with self._lock:
+                entry = self._models.get(name)
+                if entry is None:
+                    entry = self._load(name)
+        return entry
+
+    def versions(self) -> dict[str, str]:
+        return {name: entry.version for name, entry in self._models.items()}
+
+    def _load(self, name: str) -> LoadedModel:
+        # Called with self._lock held.
+        path = model_source(name)
+        stamp = _stamp(path)
+        with metrics.span("load_model", model=name):
+            digest = file_digest(path)
+            model = load_scorer(name, path)
+        version = getattr(model, "version", None) or digest[:12]
+        entry = LoadedModel(name, model, version, path, digest)
+        reset_cache(name, version, self.cache_size)
+        self._models[name] = entry
+        self._stamps[name] = stamp
+        return entry
+
+    def refresh(self) -> list[str]:
+        """Reload every loaded model whose file changed; return their names."""
+        reloaded = []
+        for name in list(self._models):
+            stamp = None
+            try:
+                path = model_source(name)
+                stamp = _stamp(path)
+                if stamp == self._stamps.get(name):
+                    continue
+                with self._lock:
+                    if file_digest(path) == self._models[name].digest:
+                        self._stamps[name] = stamp
+                        continue
+                    old = self._models[name].version
+                    new = self._load(name).version
+                logger.info("Reloaded %s model from %s (%s -> %s)", name, path, old, new)
+                reloaded.append(name)
+            except Exception:
+                # A half-written or broken file must not take down serving;
+                # keep the current version until the file changes again.
+                logger.exception("Could not reload the %s model; keeping the current version", name)
+                if stamp is not None:
+                    self._stamps[name] = stamp
+        return reloaded
+
+    def start(self):
+        if self.reload_interval <= 0 or self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self._poll, name="model-reloader", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _poll(self):
+        while not self._stop.wait(self.reload_interval):
+            self.refresh()
@@ -0,0 +1,223 @@
+"""Declarative feature schemas: column order, dtype, bounds and encodings.
+
+Each disease has one :class:`FeatureSchema` that is the single source of
+truth for the model's input layout. The app renders its form widgets from
+it, and the batch scorer, HTTP service and screening page build their
+input matrices through it, so every path produces the same column order
+and is validated against the same bounds::
+
+    >>> schema = SCHEMAS["diabetes"]
+    >>> X = schema.from_values({"Glucose": 140, ...})    # (1, 8) float64
+    >>> X = schema.from_frame(chunk)                     # by column name
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+
+class SchemaError(ValueError):
+    """Input does not match a feature schema."""
+
+
+@dataclass(frozen=True)
+class Field:
+    column: str
+    label: str
+    # "int" fields must hold whole numbers; choice fields are always "int".
+    dtype: str = "float"
+    min: float | None = None
+    max: float | None = None
+    default: float | None = None
+    # Decimal places the value is entered with (also the cache key precision).
+    decimals: int = 0
+    step: float | None = None
+    help: str | None = None
+    # (label, code) pairs for categorical fields, in display order.
+    choices: tuple[tuple[str, int], ...] = ()
+    widget: str = "number"
+
+    @property
+    def codes(self) -> tuple[int, ...]:
+        return tuple(code for _, code in self.choices)
+
+    def describe_range(self) -> str:
+        if self.choices:
+            return "one of " + ", ".join(str(c) for c in self.codes)
+        lo = "-inf" if self.min is None else f"{self.min:g}"
+        hi = "inf" if self.max is None else f"{self.max:g}"
+        kind = "whole number" if self.dtype == "int" else "number"
+        return f"a {kind} in [{lo}, {hi}]"
+
+
+class FeatureSchema:
+    """Ordered fields for one model, with vectorized validation."""
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self.columns = tuple(f.column for f in self.fields)
+        if len(set(self.columns)) != len(self.columns):
+            raise ValueError("Duplicate column in schema")
+        self.precision = tuple(f.decimals for f in self.fields)
+        self._index = {c: i for i, c in enumerate(self.columns)}
+        self._lower = np.array([-np.inf if f.min is None else f.min for f in self.fields])
+        self._upper = np.array([np.inf if f.max is None else f.max for f in self.fields])
+        self._integral = np.array([f.dtype == "int" for f in self.fields])
+        self._categorical = [
+            (i, np.array(f.codes, dtype=np.float64)) for i, f in enumerate(self.fields) if f.choices
+        ]
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def __getitem__(self, column: str) -> Field:
+        return self.fields[self._index[column]]
+
+    def invalid(self, X: np.ndarray) -> np.ndarray:
+        """Boolean mask of the cells in ``X`` that violate the schema."""
+        bad = ~np.isfinite(X)
+        with np.errstate(invalid="ignore"):
+            bad |= (X < self._lower) | (X > self._upper)
+            bad[:, self._integral] |= X[:, self._integral] != np.rint(X[:, self._integral])
+        for i, codes in self._categorical:
+            bad[:, i] |= ~np.isin(X[:, i], codes)
+        return bad
+
+    def _problem(self, X: np.ndarray, r: int, c: int) -> str:
+        value = " missing or not a number" if np.isnan(X[r, c]) else f"={X[r, c]:g}"
+        return f"{self.columns[c]!r}{value} (expected {self.fields[c].describe_range()})"
+
+    def validate(self, X, first_row: int = 0) -> np.ndarray:
+        """Return ``X`` as a C-contiguous float64 matrix, or raise :class:`SchemaError`.
+
+        ``first_row`` offsets the row numbers in the error, e.g. for chunked input.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.fields):
+            raise SchemaError(f"Expected rows of {len(self.fields)} values, got shape {X.shape}")
+        bad = self.invalid(X)
+        if bad.any():
+            rows, cols = np.nonzero(bad)
+            problems = [f"row {first_row + r} {self._problem(X, r, c)}" for r, c in zip(rows[:5], cols[:5])]
+            more = f" and {len(rows) - 5} more" if len(rows) > 5 else ""
+            raise SchemaError("Invalid input: " + "; ".join(problems) + more)
+        return X
+
+    def row_errors(self, X: np.ndarray) -> np.ndarray:
+        """Per-row description of the schema violations in ``X``; ``""`` for valid rows."""
+        bad = self.invalid(X)
+        errors = np.full(len(X), "", dtype=object)
+        for r in np.flatnonzero(bad.any(axis=1)):
+            errors[r] = "; ".join(self._problem(X, r, c) for c in np.flatnonzero(bad[r]))
+        return errors
+
+    def from_values(self, values) -> np.ndarray:
+        """Build a validated ``(1, n)`` row from a ``{column: value}`` mapping."""
+        missing = [c for c in self.columns if c not in values]
+        if missing:
+            raise SchemaError(f"Missing {', '.join(missing)}")
+        X = np.empty((1, len(self.fields)), dtype=np.float64)
+        for i, column in enumerate(self.columns):
+            X[0, i] = values[column]
+        return self.validate(X)
+
+    def from_records(self, records) -> np.ndarray:
+        """Build a validated matrix from a list of dicts or of ordered value lists."""
+        n = len(self.fields)
+        X = np.empty((len(records), n), dtype=np.float64)
+        for i, row in enumerate(records):
+            if isinstance(row, dict):
+                missing = [c for c in self.columns if c not in row]
+                if missing:
+                    raise SchemaError(f"Row {i} is missing {', '.join(missing)}")
+                row = [row[c] for c in self.columns]
+            if len(row) != n:
+                raise SchemaError(f"Row {i} has {len(row)} values, expected {n}")
+            X[i] = row
+        return self.validate(X)
+
+    def from_frame(self, frame, first_row: int = 0, coerce: bool = False) -> np.ndarray:
+        """Select the schema's columns from a DataFrame by name and validate them.
+
+        With ``coerce``, cells that are not numbers become NaN and the matrix
+        is returned unvalidated, for the caller to check with :meth:`row_errors`.
+        """
+        missing = [c for c in self.columns if c not in frame.columns]
+        if missing:
+            raise SchemaError(f"Missing column(s) {', '.join(missing)}")
+        if coerce:
+            import pandas as pd
+
+            return np.column_stack([
+                pd.to_numeric(frame[c], errors="coerce").to_numpy(dtype=np.float64) for c in self.columns
+            ]).reshape(len(frame), len(self.columns))
+        return self.validate(frame[list(self.columns)].to_numpy(dtype=np.float64), first_row)
+
+
+YES_NO = (("No", 0), ("Yes", 1))
+
+SCHEMAS = {
+    "diabetes": FeatureSchema([
+        Field("Pregnancies", "Pregnancies", "int", 0, 20, 0, step=1,
+              help="Number of times pregnant (0 if not applicable)."),
+        Field("Glucose", "Glucose Level (mg/dL)", "int", 0, 500, 100,
+              help="Plasma glucose concentration."),
+        Field("BloodPressure", "Blood Pressure (mm Hg)", "int", 0, 200, 70),
+        Field("SkinThickness", "Skin Thickness (mm)", "int", 0, 100, 20,
+              help="Triceps skinfold thickness."),
+        Field("Insulin", "Insulin Level (µU/mL)", "int", 0, 900, 80,
+              help="2-hour serum insulin."),
+        Field("BMI", "Body Mass Index (BMI)", "float", 0.0, 70.0, 25.0, decimals=1),
+        Field("DiabetesPedigreeFunction", "Diabetes Pedigree Function", "float", 0.0, 2.5, 0.47,
+              decimals=3, help="Proxy for genetic predisposition based on family history."),
+        Field("Age", "Age (years)", "int", 0, 120, 30),
+    ]),
+    "heart": FeatureSchema([
+        Field("age", "Age (years)", "int", 1, 120, 50),
+        Field("sex", "Sex", "int", choices=(("Male", 1), ("Female", 0)), widget="select"),
+        Field("cp", "Chest Pain Type", "int", widget="select", choices=(
+            ("Typical Angina", 0), ("Atypical Angina", 1), ("Non-anginal Pain", 2), ("Asymptomatic", 3),
+        )),
+        Field("trestbps", "Resting Blood Pressure (mm Hg)", "int", 50, 250, 120),
+        Field("chol", "Serum Cholesterol (mg/dL)", "int", 100, 600, 200),
+        Field("fbs", "Fasting Blood Sugar > 120 mg/dL?", "int", choices=YES_NO, widget="select"),
+        Field("restecg", "Resting ECG Result", "int", widget="select", choices=(
+            ("Normal", 0), ("ST-T Wave Abnormality", 1), ("Left Ventricular Hypertrophy", 2),
+        )),
+        Field("thalach", "Max Heart Rate Achieved (bpm)", "int", 60, 220, 150),
+        Field("exang", "Exercise-Induced Angina?", "int", choices=YES_NO, widget="select"),
+        Field("oldpeak", "ST Depression (Oldpeak)", "float", 0.0, 10.0, 1.0, decimals=1, step=0.1,
+              help="ST depression induced by exercise relative to rest."),
+        Field("slope", "Slope of Peak Exercise ST Segment", "int", widget="select", choices=(
+            ("Upsloping", 0), ("Flat", 1), ("Downsloping", 2),
+        )),
+        # heart.csv codes a handful of unknown vessel counts as 4.
+        Field("ca", "Number of Major Vessels Seen in Fluoroscopy", "int", 0, 4, 0, widget="slider"),
+        Field("thal", "Thalassemia (Thal)", "int", widget="select", choices=(
+            ("Unknown", 0), ("Normal", 1), ("Fixed Defect", 2), ("Reversible Defect", 3),
+        )),
+    ]),
+    "parkinsons": FeatureSchema([
+        Field("MDVP:Fo(Hz)", "MDVP:Fo(Hz) – Avg Vocal Fundamental Frequency", default=119.99, decimals=2),
+        Field("MDVP:Fhi(Hz)", "MDVP:Fhi(Hz) – Max Vocal Fundamental Frequency", default=157.30, decimals=2),
+        Field("MDVP:Flo(Hz)", "MDVP:Flo(Hz) – Min Vocal Fundamental Frequency", default=74.99, decimals=2),
+        Field("MDVP:Jitter(%)", "MDVP:Jitter(%)", default=0.00784, decimals=5),
+        Field("MDVP:Jitter(Abs)", "MDVP:Jitter(Abs)", default=0.00007, decimals=5),
+        Field("MDVP:RAP", "MDVP:RAP", default=0.00370, decimals=5),
+        Field("MDVP:PPQ", "MDVP:PPQ", default=0.00554, decimals=5),
+        Field("Jitter:DDP", "Jitter:DDP", default=0.01109, decimals=5),
+        Field("MDVP:Shimmer", "MDVP:Shimmer", default=0.04374, decimals=5),
+        Field("MDVP:Shimmer(dB)", "MDVP:Shimmer(dB)", default=0.426, decimals=3),
+        Field("Shimmer:APQ3", "Shimmer:APQ3", default=0.02182, decimals=5),
+        Field("Shimmer:APQ5", "Shimmer:APQ5", default=0.03130, decimals=5),
+        Field("MDVP:APQ", "MDVP:APQ", default=0.02971, decimals=5),
+        Field("Shimmer:DDA", "Shimmer:DDA", default=0.06545, decimals=5),
+        Field("NHR", "NHR", default=0.02211, decimals=5),
+        Field("HNR", "HNR", default=21.033, decimals=2),
+        Field("RPDE", "RPDE", default=0.414783, decimals=6),
+        Field("DFA", "DFA", default=0.815285, decimals=6),
+        Field("spread1", "spread1", default=-4.813031, decimals=6),
+        Field("spread2", "spread2", default=0.266482, decimals=6),
+        Field("D2", "D2", default=2.301442, decimals=6),
+        Field("PPE", "PPE", default=0.284654, decimals=6),
+    ]),
+}
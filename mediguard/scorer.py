@@ -0,0 +1,59 @@
+"""Compiled NumPy scorer for the linear screening models.
+
+Both the linear-kernel ``SVC`` (diabetes, Parkinson's) and the
+``LogisticRegression`` (heart disease) models predict ``sign(w.x + b)``.
+Pulling ``w`` and ``b`` out once at load time lets every request skip
+sklearn's per-call validation and dispatch and just do a dot product.
+"""
+import numpy as np
+
+
+class LinearScorer:
+    def __init__(self, coef, intercept: float, classes, features=None, version=None):
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64).ravel()
+        self.intercept = float(intercept)
+        self.classes = np.asarray(classes)
+        self.features = tuple(features) if features is not None else None
+        self.version = version
+        if len(self.classes) != 2:
+            raise ValueError("LinearScorer only supports binary classifiers")
+
+    @property
+    def n_features(self) -> int:
+        return self.coef.shape[0]
+
+    @classmethod
+    def from_estimator(cls, estimator):
+        name = type(estimator).__name__
+        if name == "SVC":
+            if estimator.kernel != "linear":
+                raise ValueError(f"Cannot compile SVC with kernel={estimator.kernel!r}")
+            # Collapse the support vectors into a single weight vector.
+            coef = estimator.dual_coef_ @ estimator.support_vectors_
+        elif name in ("LogisticRegression", "LinearSVC", "SGDClassifier"):
+            coef = estimator.coef_
+        else:
+            raise ValueError(f"Cannot compile {name}")
+        if coef.shape[0] != 1:
+            raise ValueError(f"Cannot compile multi-class {name}")
+        features = getattr(estimator, "feature_names_in_", None)
+        return cls(np.asarray(coef).ravel(), estimator.intercept_[0], estimator.classes_, features)
+
+    def decision_function(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.shape[-1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[-1]}")
+        return X @ self.coef + self.intercept
+
+    def predict(self, X):
+        scores = np.atleast_1d(self.decision_function(X))
+        return self.classes[(scores > 0).astype(np.intp)]
+
+
+def compile_model(estimator):
+    """Return a ``LinearScorer`` for ``estimator``, or the estimator itself
+    when it is not a binary linear model."""
+    try:
+        return LinearScorer.from_estimator(estimator)
+    except (AttributeError, ValueError):
+        return estimator
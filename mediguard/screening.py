@@ -0,0 +1,86 @@
+"""Score one patient record against every disease model concurrently.
+
+The record is a flat mapping of column name to value, as in the
+``dataset/`` CSVs. Each model receives the fields it needs in its own
+feature order (matching names exactly, then case-insensitively, so
+``Age`` also feeds the heart model's ``age``); models whose fields are
+missing are reported as skipped rather than failing the whole screen.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from mediguard.models import DISEASES, get_spec
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=len(DISEASES), thread_name_prefix="screening")
+        return _executor
+
+
+def route_record(name: str, record: dict) -> tuple[np.ndarray | None, list[str]]:
+    """Return the ``name`` model's feature row from ``record`` and any missing fields.
+
+    Raises ``SchemaError`` if every field is present but a value is out of range.
+    """
+    schema = get_spec(name).schema
+    folded = {str(k).strip().lower(): v for k, v in record.items()}
+    values, missing = {}, []
+    for feature in schema.columns:
+        value = record.get(feature, folded.get(feature.lower()))
+        if value is None or value == "":
+            missing.append(feature)
+        else:
+            values[feature] = value
+    if missing:
+        return None, missing
+    return schema.from_values(values), []
+
+
+def screen_all(record: dict, predict, names=None) -> dict:
+    """Run every model in ``names`` (default: all) on ``record``.
+
+    ``predict(name, X)`` must return ``(predictions, model_version)``.
+    """
+    names = list(names or DISEASES)
+
+    def run(name):
+        X, missing = route_record(name, record)
+        if missing:
+            return {"status": "skipped", "missing": missing}
+        start = time.perf_counter()
+        predictions, version = predict(name, X)
+        return {
+            "status": "ok",
+            "prediction": np.asarray(predictions)[0].item(),
+            "model_version": version,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+
+    start = time.perf_counter()
+    futures = {name: _get_executor().submit(run, name) for name in names}
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            results[name] = {"status": "error", "error": str(e)}
+    return {"results": results, "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)}
+
+
+def registry_predictor(registry):
+    """Adapt a ``ModelRegistry`` to the ``predict`` callable ``screen_all`` takes."""
+
+    def predict(name, X):
+        entry = registry.get(name)
+        return entry.predict(X), entry.version
+
+    return predict
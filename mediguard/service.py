@@ -0,0 +1,336 @@
+"""Local HTTP JSON inference service with request micro-batching.
+
+Concurrent requests for the same disease are coalesced for up to
+``max_wait`` seconds (or ``max_batch_size`` rows) into one ``predict`` call.
+Retrained model files are picked up without a restart (see
+``mediguard.registry``) and every prediction is written to the audit log
+(see ``mediguard.audit``)::
+
+    python -m mediguard.service --port 8600 --max-batch-size 128 --max-wait-ms 5
+
+Endpoints:
+
+* ``POST /predict/<disease>`` with ``{"features": [...]}`` for one row, or
+  ``{"records": [[...], ...]}``; rows may also be objects keyed by column name.
+  Add ``"percentiles": true`` for each value's percentile among past positive
+  and negative cases, plus each class's feature quantiles under
+  ``"population"`` (see ``mediguard.percentiles``), and ``"neighbors": k``
+  for the k most similar past cases (see ``mediguard.neighbors``).
+* ``POST /screen`` with ``{"record": {...}}`` to score one patient record
+  against every model concurrently (see ``mediguard.screening``).
+* ``GET /health``
+* ``GET /stats`` for prediction cache hit/miss counters
+* ``GET /metrics`` for timing histograms and counters (see ``mediguard.metrics``)
+* ``GET /drift`` for per-feature drift of the inputs scored so far against
+  the training data (see ``mediguard.drift``)
+"""
+import argparse
+import json
+import logging
+import queue
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from mediguard import metrics
+from mediguard.audit import AuditLog
+from mediguard.cache import DEFAULT_CACHE_SIZE, cached, get_cache
+from mediguard.drift import DriftMonitor
+from mediguard.models import DISEASES, dataset_stamp, get_spec
+from mediguard.neighbors import load_neighbor_index
+from mediguard.percentiles import load_index
+from mediguard.registry import DEFAULT_RELOAD_INTERVAL, ModelRegistry
+from mediguard.screening import screen_all
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT = 0.005
+
+
+class MicroBatcher:
+    """Collects row blocks from many threads and scores them together.
+
+    Each block is submitted with the model it must be scored by, so requests
+    that started before a hot reload still finish on the old version.
+    """
+
+    def __init__(self, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait: float = DEFAULT_MAX_WAIT):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, model, X) -> Future:
+        future = Future()
+        self._queue.put((model, np.atleast_2d(np.asarray(X, dtype=np.float64)), future))
+        return future
+
+    def predict(self, model, X, timeout: float | None = None):
+        return self.submit(model, X).result(timeout)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            rows = len(item[1])
+            deadline = time.monotonic() + self.max_wait
+            while rows < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+                rows += len(item[1])
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[0]), []).append(item)
+            for group in groups.values():
+                self._flush(group[0][0], group)
+
+    def _flush(self, model, batch):
+        try:
+            predictions = model.predict(np.concatenate([X for _, X, _ in batch]))
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        start = 0
+        for _, X, future in batch:
+            future.set_result(predictions[start:start + len(X)])
+            start += len(X)
+
+
+class BatchedModel:
+    """Adapts one model version to the ``predict(X)`` interface via a batcher."""
+
+    def __init__(self, batcher: MicroBatcher, model):
+        self.batcher = batcher
+        self.model = model
+
+    def predict(self, X):
+        return self.batcher.predict(self.model, X)
+
+
+def parse_rows(name: str, payload: dict) -> np.ndarray:
+    if "features" in payload:
+        rows = [payload["features"]]
+    elif "records" in payload:
+        rows = payload["records"]
+    else:
+        raise ValueError("Expected a 'features' or 'records' field")
+    if not isinstance(rows, list) or not rows:
+        raise ValueError("'records' must be a non-empty list")
+    return get_spec(name).schema.from_records(rows)
+
+
+class InferenceServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait=DEFAULT_MAX_WAIT, cache_size=DEFAULT_CACHE_SIZE,
+                 reload_interval=DEFAULT_RELOAD_INTERVAL):
+        super().__init__(address, InferenceHandler)
+        self.cache_size = cache_size
+        self.registry = ModelRegistry(reload_interval, cache_size)
+        for name in DISEASES:
+            self.registry.get(name)
+        self.registry.start()
+        self.batchers = {name: MicroBatcher(max_batch_size, max_wait) for name in DISEASES}
+        self.audit = AuditLog.from_env("service")
+        self.drift = DriftMonitor.from_env("service")
+        self._indexes = {}
+        self._index_lock = threading.Lock()
+
+    def _index(self, kind: str, name: str, load):
+        # Reloaded when the CSV changes; load() then checks the saved index
+        # against the file's hash and merges appended rows or rebuilds.
+        stamp = dataset_stamp(name)
+        with self._index_lock:
+            entry = self._indexes.get((kind, name))
+            if entry is None or entry[0] != stamp:
+                entry = self._indexes[kind, name] = (stamp, load(name))
+            return entry[1]
+
+    def percentile_index(self, name: str):
+        return self._index("percentiles", name, load_index)
+
+    def neighbor_index(self, name: str):
+        return self._index("neighbors", name, load_neighbor_index)
+
+    def predict(self, name: str, X):
+        """Score ``X``; returns the predictions and the model version used."""
+        entry = self.registry.get(name)
+        # Cache hits are answered directly; only misses wait for a batch.
+        model = cached(name, BatchedModel(self.batchers[name], entry.model),
+                       self.cache_size, entry.version)
+        with metrics.span("predict", model=name):
+            predictions = model.predict(X)
+        metrics.increment("mediguard_predictions_total", len(predictions), model=name)
+        self.audit.record(name, X, predictions, entry.version)
+        self.drift.observe(name, X)
+        return predictions, entry.version
+
+    def server_close(self):
+        super().server_close()
+        self.registry.stop()
+        for batcher in self.batchers.values():
+            batcher.close()
+        self.audit.close()
+        self.drift.close()
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    server: InferenceServer
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "models": self.server.registry.versions()})
+        elif self.path == "/metrics":
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == "/stats":
+            self._send(200, {"cache": {name: get_cache(name).stats() for name in self.server.batchers}})
+        elif self.path == "/drift":
+            self._send(200, self.server.drift.report())
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        with metrics.profiled("request", route=self.path.split("/", 2)[1]):
+            self._post()
+
+    def _post(self):
+        if self.path == "/screen":
+            self._screen()
+            return
+        prefix = "/predict/"
+        name = self.path[len(prefix):] if self.path.startswith(prefix) else None
+        if name not in self.server.batchers:
+            self._send(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            X = parse_rows(name, payload)
+            neighbors = int(payload.get("neighbors") or 0)
+            if neighbors < 0:
+                raise ValueError("'neighbors' must not be negative")
+        except (TypeError, ValueError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        try:
+            predictions, version = self.server.predict(name, X)
+        except Exception as e:
+            logger.exception("Prediction failed for %s", name)
+            metrics.increment("mediguard_errors_total", model=name)
+            self._send(500, {"error": str(e)})
+            return
+        body = {
+            "disease": name,
+            "model_version": version,
+            "predictions": predictions.tolist(),
+        }
+        try:
+            if payload.get("percentiles"):
+                index = self.server.percentile_index(name)
+                ranks = index.percentiles(X)
+                columns = get_spec(name).features
+                body["percentiles"] = [
+                    {column: {"negative": round(ranks[0][i, j], 1), "positive": round(ranks[1][i, j], 1)}
+                     for j, column in enumerate(columns)}
+                    for i in range(len(X))
+                ]
+                summary = index.summary()
+                body["population"] = {"negative": summary[0], "positive": summary[1]}
+            if neighbors > 0:
+                body["neighbors"] = self.server.neighbor_index(name).similar(X, neighbors)
+        except Exception as e:
+            logger.exception("Loading the reference index failed for %s", name)
+            metrics.increment("mediguard_errors_total", model=name)
+            self._send(500, {"error": f"reference index unavailable: {e}"})
+            return
+        self._send(200, body)
+
+    def _screen(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            record = json.loads(self.rfile.read(length) or b"{}").get("record")
+            if not isinstance(record, dict):
+                raise ValueError("Expected a 'record' object")
+        except (AttributeError, TypeError, ValueError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        self._send(200, screen_all(record, self.server.predict))
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="rows per coalesced predict call")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT * 1000,
+                        help="how long to hold a request open waiting for others")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="LRU prediction cache entries per model (0 disables)")
+    parser.add_argument("--reload-interval", type=float, default=DEFAULT_RELOAD_INTERVAL,
+                        help="seconds between model file change checks (0 disables)")
+    args = parser.parse_args(argv)
+    if args.max_batch_size < 1:
+        parser.error("--max-batch-size must be positive")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    server = InferenceServer(
+        (args.host, args.port), args.max_batch_size, args.max_wait_ms / 1000,
+        args.cache_size, args.reload_interval,
+    )
+    logger.info("Serving %s on http://%s:%d", ", ".join(sorted(server.batchers)), args.host, args.port)
+    # Exit through the finally block on SIGTERM too, so queued audit entries
+    # are flushed.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Cold-start timing for the Streamlit app.
+
+``app.py`` wraps its heavy imports, model unpickling and first script run in
+:func:`phase`, which records each phase once per process. Run::
+
+    python -m mediguard.startup
+
+to launch a fresh interpreter, render the app headlessly and print the
+breakdown as JSON. Setting ``MEDIGUARD_STARTUP_REPORT=1`` also logs the
+report from a live server once the first render finishes.
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+TIMINGS: dict[str, float] = {}
+_render_start: float | None = None
+
+
+@contextmanager
+def phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        TIMINGS.setdefault(name, time.perf_counter() - start)
+
+
+def render_started():
+    global _render_start
+    if _render_start is None:
+        _render_start = time.perf_counter()
+
+
+def render_finished():
+    if _render_start is None or "first_render" in TIMINGS:
+        return
+    TIMINGS["first_render"] = time.perf_counter() - _render_start
+    if os.environ.get("MEDIGUARD_STARTUP_REPORT"):
+        logger.warning("Startup timings: %s", json.dumps(report()))
+
+
+def report() -> dict:
+    return {name: round(seconds * 1000, 3) for name, seconds in TIMINGS.items()}
+
+
+def _measure_child():
+    import warnings
+
+    # Run as __main__, this module is a different object from the
+    # mediguard.startup that app.py records into.
+    from mediguard import startup
+    from mediguard.models import ROOT
+
+    warnings.filterwarnings("ignore")
+    with startup.phase("import:streamlit"):
+        from streamlit.testing.v1 import AppTest
+
+    start = time.perf_counter()
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=60).run()
+    startup.TIMINGS["app_run_total"] = time.perf_counter() - start
+    if at.exception:
+        raise SystemExit(f"App raised: {at.exception[0].message}")
+    json.dump(startup.report(), sys.stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure a cold start of app.py")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        _measure_child()
+        return
+
+    from mediguard.models import ROOT
+
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-m", "mediguard.startup", "--child"],
+        cwd=ROOT, capture_output=True, text=True, check=False,
+    )
+    wall = time.perf_counter() - start
+    if out.returncode:
+        sys.exit(out.stderr.strip() or f"child exited with {out.returncode}")
+    timings = json.loads(out.stdout)
+    timings["process_wall"] = round(wall * 1000, 3)
+    print(json.dumps({"unit": "ms", "timings": timings}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Reproducible training pipeline for the three screening models.
+
+Rebuilds each model from ``dataset/`` with the same estimator and hold-out
+split the Colab notebooks use, runs k-fold cross-validation with the folds
+spread across cores, and writes a JSON report of timings and metrics::
+
+    python -m mediguard.training                 # all models, 5 folds
+    python -m mediguard.training heart --folds 10 --no-save
+
+Fold results are cached on disk keyed by the estimator configuration and
+the fold's data, so rerunning an unchanged configuration is instant.
+Trained models are written as both the pickle and the memory-mapped
+artifact, where a running app's registry hot-reloads them.
+"""
+import argparse
+import hashlib
+import json
+import pickle
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from mediguard.estimators import build_estimator, fit_fold
+from mediguard.models import DISEASES, ROOT, get_spec, load_dataset, model_path
+
+CACHE_DIR = ROOT / ".cache" / "training"
+REPORT_DIR = ROOT / "reports"
+
+
+@dataclass(frozen=True)
+class TrainingConfig:
+    estimator: str
+    params: dict = field(default_factory=dict)
+    stratify: bool = True
+    test_size: float = 0.2
+    random_state: int = 2
+
+
+# Mirrors colab_files_to_train_model/*.ipynb.
+CONFIGS = {
+    "diabetes": TrainingConfig("svc_linear"),
+    "heart": TrainingConfig("logistic_regression"),
+    "parkinsons": TrainingConfig("svc_linear", stratify=False),
+}
+
+
+def data_hash(X, y) -> str:
+    digest = hashlib.sha256()
+    digest.update(json.dumps(list(X.columns)).encode())
+    digest.update(np.ascontiguousarray(X.to_numpy(dtype=np.float64)).tobytes())
+    digest.update(np.ascontiguousarray(y.to_numpy()).tobytes())
+    return digest.hexdigest()
+
+
+def cross_validate(config: TrainingConfig, X, y, folds: int = 5, n_jobs: int = -1,
+                   cache_dir: Path | None = CACHE_DIR, params: dict | None = None,
+                   fold_indices=None) -> list[dict]:
+    """Return per-fold metrics for ``config`` (optionally overriding its params).
+
+    ``fold_indices`` restricts the run to a subset of the folds.
+    """
+    from joblib import Memory, Parallel, delayed
+    from sklearn.model_selection import KFold, StratifiedKFold
+
+    splitter_cls = StratifiedKFold if config.stratify else KFold
+    splitter = splitter_cls(n_splits=folds, shuffle=True, random_state=config.random_state)
+    splits = list(splitter.split(X, y))
+    if fold_indices is not None:
+        splits = [splits[i] for i in fold_indices]
+
+    # fit_fold lives in mediguard.estimators, which is never run as __main__,
+    # so its cache key does not depend on how training was launched.
+    fit = Memory(cache_dir, verbose=0).cache(fit_fold) if cache_dir else fit_fold
+    Xv, yv = X.to_numpy(dtype=np.float64), y.to_numpy()
+    params = config.params if params is None else params
+    return Parallel(n_jobs=n_jobs)(
+        delayed(fit)(config.estimator, params, Xv[tr], yv[tr], Xv[te], yv[te])
+        for tr, te in splits
+    )
+
+
+def summarize_folds(fold_metrics: list[dict]) -> dict:
+    keys = fold_metrics[0].keys()
+    return {
+        key: {
+            "mean": float(np.mean([m[key] for m in fold_metrics])),
+            "std": float(np.std([m[key] for m in fold_metrics])),
+        }
+        for key in keys
+    }
+
+
+def train(name: str, folds: int = 5, n_jobs: int = -1, output_dir: Path | None = None,
+          cache_dir: Path | None = CACHE_DIR, config: TrainingConfig | None = None) -> dict:
+    """Cross-validate and fit the ``name`` model; return its report.
+
+    The final model is fit on the notebook's training split and, unless
+    ``output_dir`` is None, saved there as ``.sav`` and ``.mgm``.
+    """
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
+
+    from mediguard.artifact import export_artifact
+
+    spec = get_spec(name)
+    config = config or CONFIGS[name]
+    timings = {}
+
+    start = time.perf_counter()
+    X, y = load_dataset(name)
+    timings["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fold_metrics = cross_validate(config, X, y, folds, n_jobs, cache_dir)
+    timings["cross_validation"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y,
+        test_size=config.test_size,
+        stratify=y if config.stratify else None,
+        random_state=config.random_state,
+    )
+    model = build_estimator(config.estimator, config.params)
+    model.fit(X_train, y_train)
+    timings["fit"] = time.perf_counter() - start
+
+    report = {
+        "model": name,
+        "config": asdict(config),
+        "data_sha256": data_hash(X, y),
+        "rows": len(X),
+        "folds": folds,
+        "cv": summarize_folds(fold_metrics),
+        "cv_folds": fold_metrics,
+        "train_accuracy": accuracy_score(y_train, model.predict(X_train)),
+        "test_accuracy": accuracy_score(y_test, model.predict(X_test)),
+    }
+
+    if output_dir is not None:
+        start = time.perf_counter()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        sav = output_dir / spec.model_file
+        with open(sav, "wb") as f:
+            pickle.dump(model, f)
+        header = export_artifact(model, output_dir / spec.artifact_file, name, spec.features)
+        timings["save"] = time.perf_counter() - start
+        report["saved"] = [str(sav), str(output_dir / spec.artifact_file)]
+        report["artifact_sha256"] = header["sha256"]
+
+    report["timings_seconds"] = timings
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Retrain the screening models from dataset/")
+    parser.add_argument("diseases", nargs="*", help=f"any of {', '.join(DISEASES)} (default: all)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1, help="parallel fold workers (-1: all cores)")
+    parser.add_argument("--output-dir", type=Path,
+                        help="where to write models (default: the directory the app loads from)")
+    parser.add_argument("--no-save", action="store_true", help="only cross-validate and report")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and skip the fold cache")
+    parser.add_argument("--report-dir", type=Path, default=REPORT_DIR)
+    args = parser.parse_args(argv)
+    if args.folds < 2:
+        parser.error("--folds must be at least 2")
+
+    import sklearn
+
+    started = time.strftime("%Y%m%dT%H%M%S")
+    run = {"started": started, "sklearn": sklearn.__version__, "models": {}}
+    try:
+        for name in args.diseases or DISEASES:
+            output_dir = None
+            if not args.no_save:
+                output_dir = args.output_dir or model_path(get_spec(name).model_file).parent
+            report = train(name, args.folds, args.jobs, output_dir,
+                           None if args.no_cache else CACHE_DIR)
+            run["models"][name] = report
+            cv = report["cv"]
+            print(
+                f"{name}: cv accuracy {cv['accuracy']['mean']:.3f} ± {cv['accuracy']['std']:.3f}, "
+                f"test accuracy {report['test_accuracy']:.3f} "
+                f"({sum(report['timings_seconds'].values()):.2f}s)",
+                file=sys.stderr,
+            )
+    except (OSError, ValueError) as e:
+        sys.exit(f"error: {e}")
+
+    args.report_dir.mkdir(parents=True, exist_ok=True)
+    path = args.report_dir / f"training-{started}.json"
+    with open(path, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"Report written to {path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Parallel hyperparameter search with a persistent on-disk result cache.
+
+Candidates are evaluated by successive halving over the cross-validation
+folds: every candidate is scored on the first fold(s), only the best
+``1/eta`` move on to more folds, and the survivors of the last rung are
+ranked on all of them. Fold evaluations run in a process pool, and each
+(config, data hash, fold) result is written to ``.cache/tuning/``, so an
+interrupted or repeated search resumes from where it stopped::
+
+    python -m mediguard.tuning diabetes --folds 5 --workers 4
+    python -m mediguard.tuning heart --train-best
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, replace
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from mediguard.models import DISEASES, ROOT, get_spec, load_dataset, model_path
+from mediguard.training import CONFIGS, REPORT_DIR, TrainingConfig, cross_validate, data_hash, train
+
+CACHE_DIR = ROOT / ".cache" / "tuning"
+
+_C_VALUES = (0.001, 0.01, 0.1, 1.0, 10.0)
+_CLASS_WEIGHTS = (None, "balanced")
+
+SEARCH_SPACES = {
+    "svc_linear": [
+        {"C": c, "class_weight": w} for c, w in itertools.product(_C_VALUES, _CLASS_WEIGHTS)
+    ],
+    "logistic_regression": [
+        {"C": c, "class_weight": w, "max_iter": 5000}
+        for c, w in itertools.product(_C_VALUES, _CLASS_WEIGHTS)
+    ],
+}
+
+
+def candidates(name: str) -> list[TrainingConfig]:
+    base = CONFIGS[name]
+    return [replace(base, params=params) for params in SEARCH_SPACES[base.estimator]]
+
+
+class ResultCache:
+    """One JSON file per (config, data hash, fold); writes are atomic."""
+
+    def __init__(self, directory: Path | None = CACHE_DIR):
+        self.directory = directory
+
+    @staticmethod
+    def key(config: TrainingConfig, data_sha256: str, folds: int, fold: int) -> str:
+        blob = json.dumps([asdict(config), data_sha256, folds, fold], sort_keys=True)
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        if self.directory is None:
+            return None
+        try:
+            with open(self.directory / f"{key}.json") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, result: dict):
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f"{key}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp, self.directory / f"{key}.json")
+
+
+@lru_cache(maxsize=None)
+def _dataset(name: str):
+    return load_dataset(name)
+
+
+def _evaluate_fold(name: str, config: TrainingConfig, folds: int, fold: int) -> dict:
+    X, y = _dataset(name)
+    return cross_validate(config, X, y, folds, n_jobs=1, cache_dir=None, fold_indices=[fold])[0]
+
+
+def rung_schedule(folds: int, eta: int) -> list[int]:
+    """Folds evaluated at each rung, e.g. 5 folds, eta 3 -> [1, 3, 5]."""
+    schedule, n = [], 1
+    while n < folds:
+        schedule.append(n)
+        n *= eta
+    return schedule + [folds]
+
+
+def search(name: str, folds: int = 5, eta: int = 3, workers: int | None = None,
+           metric: str = "accuracy", cache: ResultCache | None = None, log=None) -> dict:
+    """Run successive-halving search for ``name``; return the ranked results."""
+    cache = cache or ResultCache()
+    X, y = load_dataset(name)
+    data_sha256 = data_hash(X, y)
+    scores: dict[int, dict[int, dict]] = {}  # candidate index -> fold -> metrics
+    pool_configs = candidates(name)
+    alive = list(range(len(pool_configs)))
+    stats = {"evaluated": 0, "cached": 0}
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rung, n_folds in enumerate(rung_schedule(folds, eta)):
+            pending = {}
+            for idx in alive:
+                for fold in range(n_folds):
+                    if fold in scores.setdefault(idx, {}):
+                        continue
+                    key = ResultCache.key(pool_configs[idx], data_sha256, folds, fold)
+                    hit = cache.get(key)
+                    if hit is not None:
+                        scores[idx][fold] = hit
+                        stats["cached"] += 1
+                    else:
+                        future = pool.submit(_evaluate_fold, name, pool_configs[idx], folds, fold)
+                        pending[future] = (idx, fold, key)
+            for future in as_completed(pending):
+                idx, fold, key = pending[future]
+                result = future.result()
+                cache.put(key, result)
+                scores[idx][fold] = result
+                stats["evaluated"] += 1
+
+            ranked = sorted(alive, key=lambda i: _mean(scores[i], metric), reverse=True)
+            if log:
+                best = ranked[0]
+                log(f"{name} rung {rung}: {len(alive)} candidates on {n_folds} fold(s), "
+                    f"best {metric} {_mean(scores[best], metric):.4f} {pool_configs[best].params}")
+            if n_folds < folds:
+                alive = ranked[:max(1, math.ceil(len(ranked) / eta))]
+
+    results = [
+        {
+            "params": pool_configs[i].params,
+            "folds_evaluated": len(scores[i]),
+            metric: _mean(scores[i], metric),
+            "survived": i in alive,
+        }
+        for i in range(len(pool_configs))
+        if scores.get(i)
+    ]
+    results.sort(key=lambda r: (r["survived"], r["folds_evaluated"], r[metric]), reverse=True)
+    return {
+        "model": name,
+        "metric": metric,
+        "folds": folds,
+        "eta": eta,
+        "data_sha256": data_sha256,
+        "best": results[0],
+        "results": results,
+        "fold_evaluations": stats,
+        "elapsed_seconds": time.perf_counter() - start,
+    }
+
+
+def _mean(fold_scores: dict[int, dict], metric: str) -> float:
+    return float(np.mean([m[metric] for m in fold_scores.values()]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hyperparameter search for the screening models")
+    parser.add_argument("diseases", nargs="*", help=f"any of {', '.join(DISEASES)} (default: all)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--eta", type=int, default=3, help="keep the best 1/eta candidates per rung")
+    parser.add_argument("--workers", type=int, help="process pool size (default: all cores)")
+    parser.add_argument("--metric", default="accuracy",
+                        choices=["accuracy", "precision", "recall", "f1", "roc_auc"])
+    parser.add_argument("--no-cache", action="store_true", help="neither read nor write cached results")
+    parser.add_argument("--train-best", action="store_true",
+                        help="retrain with the winning params and save the model")
+    parser.add_argument("--report-dir", type=Path, default=REPORT_DIR)
+    args = parser.parse_args(argv)
+    if args.folds < 2 or args.eta < 2:
+        parser.error("--folds and --eta must be at least 2")
+
+    def log(msg):
+        print(msg, file=sys.stderr)
+
+    cache = ResultCache(None if args.no_cache else CACHE_DIR)
+    started = time.strftime("%Y%m%dT%H%M%S")
+    args.report_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        for name in args.diseases or DISEASES:
+            get_spec(name)
+            report = search(name, args.folds, args.eta, args.workers, args.metric, cache, log)
+            if args.train_best:
+                config = replace(CONFIGS[name], params=report["best"]["params"])
+                output_dir = model_path(get_spec(name).model_file).parent
+                report["trained"] = train(name, args.folds, output_dir=output_dir, config=config)
+            path = args.report_dir / f"tuning-{name}-{started}.json"
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+            log(f"{name}: best {report['best']} "
+                f"({report['fold_evaluations']['evaluated']} fits, "
+                f"{report['fold_evaluations']['cached']} cached) -> {path}")
+    except (OSError, ValueError) as e:
+        sys.exit(f"error: {e}")
+
+
+if __name__ == "__main__":
+    main()
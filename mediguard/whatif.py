@@ -0,0 +1,120 @@
+"""What-if sensitivity sweeps over one or two input features.
+
+A sweep holds a patient's other values fixed, lays a 1-D or 2-D grid over
+the chosen features' ranges, and scores every grid point in one batched
+call, so a 100x100 grid is a single (10000, n) matrix product::
+
+    result = sweep("diabetes", scorer, version, X[0], ["Glucose", "BMI"], resolution=100)
+    result.scores        # (100, 100) decision scores; > 0 means positive
+
+Results are cached per model version, patient and grid.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from mediguard.models import get_spec, load_dataset
+
+DEFAULT_RESOLUTION = 50
+MAX_RESOLUTION = 200
+CACHE_SIZE = 64
+
+
+@dataclass(frozen=True)
+class Sweep:
+    columns: tuple[str, ...]
+    # One array of grid values per swept column.
+    axes: tuple[np.ndarray, ...]
+    # Decision scores (or class predictions for non-linear models), shaped
+    # by the axes; > 0 is the positive side of the boundary.
+    scores: np.ndarray
+    predictions: np.ndarray
+
+
+@lru_cache(maxsize=None)
+def _dataset_range(name: str) -> tuple[np.ndarray, np.ndarray]:
+    X, _ = load_dataset(name)
+    X = X.to_numpy(dtype=np.float64)
+    return X.min(axis=0), X.max(axis=0)
+
+
+def feature_range(name: str, column: str) -> tuple[float, float]:
+    """The form's bounds for ``column``, falling back to the dataset's range."""
+    spec = get_spec(name)
+    field = spec.schema[column]
+    if field.choices:
+        return float(min(field.codes)), float(max(field.codes))
+    if field.min is not None and field.max is not None:
+        return float(field.min), float(field.max)
+    lo, hi = _dataset_range(name)
+    j = spec.features.index(column)
+    return (float(lo[j]) if field.min is None else float(field.min),
+            float(hi[j]) if field.max is None else float(field.max))
+
+
+def axis(name: str, column: str, resolution: int = DEFAULT_RESOLUTION) -> np.ndarray:
+    """Grid values for ``column``; whole-number fields get at most one point per value."""
+    lo, hi = feature_range(name, column)
+    values = np.linspace(lo, hi, resolution)
+    if get_spec(name).schema[column].dtype == "int":
+        values = np.unique(np.rint(values))
+    return values
+
+
+def build_grid(row, positions, axes) -> np.ndarray:
+    """Copies of ``row`` with the columns at ``positions`` set to every grid
+    combination, in C order of the axes."""
+    row = np.asarray(row, dtype=np.float64).ravel()
+    mesh = np.meshgrid(*axes, indexing="ij")
+    X = np.empty((mesh[0].size, row.shape[0]), dtype=np.float64)
+    X[:] = row
+    for j, values in zip(positions, mesh):
+        X[:, j] = values.ravel()
+    return X
+
+
+_cache: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+
+
+def sweep(name: str, model, version, row, columns, resolution: int = DEFAULT_RESOLUTION) -> Sweep:
+    """Score ``row`` with ``columns`` (one or two) swept across their ranges.
+
+    ``model`` is scored directly rather than through the prediction cache, as
+    grid points are rarely requested again individually.
+    """
+    columns = tuple(columns)
+    if not 1 <= len(columns) <= 2 or len(set(columns)) != len(columns):
+        raise ValueError("Sweep one or two distinct features")
+    if not 2 <= resolution <= MAX_RESOLUTION:
+        raise ValueError(f"Resolution must be between 2 and {MAX_RESOLUTION}")
+    row = np.ascontiguousarray(row, dtype=np.float64).ravel()
+    key = (name, version, row.tobytes(), columns, resolution)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    features = get_spec(name).features
+    positions = [features.index(c) for c in columns]
+    axes = tuple(axis(name, c, resolution) for c in columns)
+    X = build_grid(row, positions, axes)
+    shape = tuple(len(a) for a in axes)
+    classes = getattr(model, "classes_", getattr(model, "classes", None))
+    if hasattr(model, "decision_function") and classes is not None and len(classes) == 2:
+        # One pass: a binary linear model predicts classes[score > 0].
+        scores = np.asarray(model.decision_function(X), dtype=np.float64)
+        predictions = np.asarray(classes)[(scores > 0).astype(np.intp)]
+    else:
+        predictions = np.asarray(model.predict(X))
+        scores = predictions.astype(np.float64) - 0.5
+    result = Sweep(columns, axes, scores.reshape(shape), predictions.reshape(shape))
+
+    with _lock:
+        _cache[key] = result
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
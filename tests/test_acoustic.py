@@ -0,0 +1,120 @@
+import csv
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from mediguard import acoustic
+
+
+def wav(signal, rate):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes((np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes())
+    buffer.seek(0)
+    return buffer
+
+
+def vowel(f0, rate, seconds=2.0):
+    """A harmonic-rich tone, whose autocorrelation also peaks at 2 and 3 periods."""
+    phase = 2 * np.pi * f0 * np.arange(int(rate * seconds)) / rate
+    x = sum(0.8 ** h * np.sin(h * phase) for h in range(1, 12))
+    return 0.5 * x / np.abs(x).max()
+
+
+@pytest.mark.parametrize("f0, rate", [(70, 16000), (120, 22050), (150, 22050), (250, 44100), (500, 16000)])
+def test_pitch_of_vowel(f0, rate):
+    features = acoustic.extract_features(wav(vowel(f0, rate), rate))
+    assert features["MDVP:Fo(Hz)"] == pytest.approx(f0, rel=0.01)
+    assert features["MDVP:Flo(Hz)"] == pytest.approx(f0, rel=0.01)
+    assert features["MDVP:Fhi(Hz)"] == pytest.approx(f0, rel=0.01)
+
+
+def test_pitch_of_sine():
+    rate = 16000
+    tone = 0.5 * np.sin(2 * np.pi * 220 * np.arange(2 * rate) / rate)
+    assert acoustic.extract_features(wav(tone, rate))["MDVP:Fo(Hz)"] == pytest.approx(220, rel=0.01)
+
+
+def test_jitter_is_a_fraction():
+    f0, rate = 120, 22050
+    features = acoustic.extract_features(wav(vowel(f0, rate), rate))
+    # A steady tone: well under the dataset's smallest value (0.00168).
+    assert 0 <= features["MDVP:Jitter(%)"] < 0.0015
+    assert features["MDVP:Jitter(Abs)"] == pytest.approx(features["MDVP:Jitter(%)"] / f0, rel=0.05)
+
+
+def test_block_size_does_not_change_features():
+    rate = 22050
+    data = wav(vowel(150, rate), rate).getvalue()
+    a = acoustic.extract_features(io.BytesIO(data), block_seconds=1.0)
+    b = acoustic.extract_features(io.BytesIO(data), block_seconds=0.25)
+    assert a["MDVP:Fo(Hz)"] == pytest.approx(b["MDVP:Fo(Hz)"], rel=1e-3)
+    assert a["MDVP:Jitter(%)"] == pytest.approx(b["MDVP:Jitter(%)"], abs=1e-4)
+
+
+def test_unmeasured_features_are_left_out():
+    rate = 22050
+    features = acoustic.extract_features(wav(vowel(150, rate), rate))
+    assert not set(acoustic.UNMEASURED) & set(features)
+    assert list(features) == [f for f in acoustic.FEATURES if f not in acoustic.UNMEASURED]
+
+
+def test_implausible_flags_nan_and_out_of_range():
+    assert acoustic.implausible({"MDVP:Fo(Hz)": 150.0, "D2": float("nan"), "PPE": 5.0}) == ["D2", "PPE"]
+
+
+def test_silence_is_rejected():
+    with pytest.raises(ValueError):
+        acoustic.extract_features(wav(np.zeros(22050), 22050))
+
+
+def recording(tmp_path):
+    rate = 22050
+    path = tmp_path / "a.wav"
+    path.write_bytes(wav(vowel(150, rate), rate).getvalue())
+    return path
+
+
+def test_cli_leaves_unmeasured_blank(tmp_path, monkeypatch):
+    from mediguard import batch, ingest
+
+    monkeypatch.setattr(ingest, "TABLE_DIR", tmp_path / "tables")
+    out = tmp_path / "voice.csv"
+    acoustic.main([str(recording(tmp_path)), "-o", str(out), "--workers", "1"])
+    with open(out, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 1
+    assert "imputed" not in rows[0]
+    assert all(rows[0][name] == "" for name in acoustic.UNMEASURED)
+    scored = tmp_path / "scored.csv"
+    batch.main(["parkinsons", str(out), str(scored), "--id-column", "recording"])
+    with open(scored, newline="") as f:
+        row = next(csv.DictReader(f))
+    assert row["prediction"] == "" and "spread1" in row["error"]
+
+
+def test_cli_imputes_unmeasured(tmp_path, monkeypatch):
+    from mediguard import batch, ingest
+
+    monkeypatch.setattr(ingest, "TABLE_DIR", tmp_path / "tables")
+    out = tmp_path / "voice.csv"
+    acoustic.main([str(recording(tmp_path)), "-o", str(out), "--workers", "1", "--impute"])
+    with open(out, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 1
+    assert set(acoustic.UNMEASURED) <= set(rows[0]["imputed"].split(";"))
+    assert all(rows[0][name] not in ("", "nan") for name in acoustic.FEATURES)
+
+    scored = tmp_path / "scored.csv"
+    for extra in ([], ["--allow-imputed"]):
+        batch.main(["parkinsons", str(out), str(scored), "--id-column", "recording"] + extra)
+        with open(scored, newline="") as f:
+            row = next(csv.DictReader(f))
+        assert row["imputed"] == rows[0]["imputed"]
+        assert (row["prediction"] == "") == (not extra)
+        assert ("imputed" in row["error"]) == (not extra)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from mediguard.artifact import ArtifactError, export_artifact, load_artifact, read_header
+from mediguard.scorer import LinearScorer
+
+FEATURES = ["a", "b", "c"]
+
+
+def scorer(coef, intercept):
+    return LinearScorer(coef, intercept, [0, 1], FEATURES)
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "model.mgm"
+    header = export_artifact(scorer([1.5, -2.0, 0.25], 0.5), path, "test")
+    loaded = load_artifact(path)
+    assert loaded.features == tuple(FEATURES)
+    np.testing.assert_array_equal(loaded.coef, [1.5, -2.0, 0.25])
+    assert loaded.intercept == 0.5
+    assert loaded.version == header["sha256"][:12]
+    assert read_header(path)["payload_offset"] % 64 == 0
+    X = np.array([[1.0, 2.0, 3.0], [0.0, -1.0, 4.0]])
+    np.testing.assert_array_equal(loaded.predict(X), scorer([1.5, -2.0, 0.25], 0.5).predict(X))
+
+
+def test_overwrite_leaves_loaded_scorer_unchanged(tmp_path):
+    path = tmp_path / "model.mgm"
+    export_artifact(scorer([1.0, 2.0, 3.0], 1.0), path)
+    old = load_artifact(path)
+    export_artifact(scorer([-9.0, -9.0, -9.0], -5.0), path)
+    np.testing.assert_array_equal(old.coef, [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(load_artifact(path).coef, [-9.0, -9.0, -9.0])
+    assert [p.name for p in tmp_path.iterdir()] == ["model.mgm"]
+
+
+def test_corrupt_payload_fails_hash_check(tmp_path):
+    path = tmp_path / "model.mgm"
+    export_artifact(scorer([1.0, 2.0, 3.0], 1.0), path)
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(ArtifactError):
+        load_artifact(path)
+
+
+def test_feature_count_mismatch(tmp_path):
+    with pytest.raises(ArtifactError):
+        export_artifact(scorer([1.0, 2.0, 3.0], 0.0), tmp_path / "m.mgm", features=["a"])
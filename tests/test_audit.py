@@ -0,0 +1,91 @@
+import json
+import time
+
+import numpy as np
+import pytest
+
+from mediguard.audit import AuditLog
+
+ROW = np.array([[2, 120, 70, 20, 80, 25.0, 0.5, 40]], dtype=float)
+
+
+def lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_close_flushes_queued_entries(tmp_path):
+    log = AuditLog(tmp_path / "app.jsonl", flush_interval=60)
+    for i in range(5):
+        log.record("diabetes", ROW, [i % 2], "v1")
+    log.close()
+    entries = lines(tmp_path / "app.jsonl")
+    assert [e["prediction"] for e in entries] == [0, 1, 0, 1, 0]
+    assert entries[0]["inputs"]["Glucose"] == 120
+    assert entries[0]["model_version"] == "v1"
+
+
+def test_sqlite_mirror(tmp_path):
+    import sqlite3
+
+    log = AuditLog(tmp_path / "app.jsonl", flush_interval=0, sqlite_path=tmp_path / "audit.db")
+    log.record("diabetes", np.repeat(ROW, 3, axis=0), [0, 1, 1], "v1")
+    log.close()
+    with sqlite3.connect(tmp_path / "audit.db") as db:
+        assert db.execute("SELECT count(*), sum(prediction) FROM audit").fetchone() == (3, 2)
+
+
+def test_rotation_keeps_every_file_by_default(tmp_path):
+    log = AuditLog(tmp_path / "app.jsonl", flush_interval=0, max_bytes=1)
+    for i in range(4):
+        log.record("diabetes", ROW, [0], "v1")
+        time.sleep(0.05)
+    log.close()
+    rotated = log.rotated()
+    assert len(rotated) == 4
+    assert sum(len(lines(p)) for p in rotated) == 4
+
+
+def test_backup_count_deletes_oldest(tmp_path):
+    log = AuditLog(tmp_path / "app.jsonl", flush_interval=0, max_bytes=1, backup_count=2)
+    for i in range(4):
+        log.record("diabetes", ROW, [i], "v1")
+        time.sleep(0.05)
+    log.close()
+    rotated = log.rotated()
+    assert [lines(p)[0]["prediction"] for p in rotated] == [2, 3]
+
+
+def test_failed_write_is_retried(tmp_path):
+    # The log's directory is a file at first, so opening the log fails.
+    blocker = tmp_path / "logs"
+    blocker.write_text("")
+    log = AuditLog(blocker / "app.jsonl", flush_interval=0, retry_interval=0.05)
+    log.record("diabetes", ROW, [1], "v1")
+    time.sleep(0.2)
+    assert log._thread.is_alive()
+    blocker.unlink()
+    log.close()
+    assert [e["prediction"] for e in lines(blocker / "app.jsonl")] == [1]
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_record_raises_when_writer_is_dead(tmp_path):
+    log = AuditLog(tmp_path / "app.jsonl")
+    log._queue.put(object())  # not a valid entry: kills the writer
+    log._thread.join(5)
+    assert not log._thread.is_alive()
+    with pytest.raises(RuntimeError, match="stopped"):
+        log.record("diabetes", ROW, [0], "v1")
+
+
+def test_full_queue_times_out(tmp_path):
+    blocker = tmp_path / "logs"
+    blocker.write_text("")
+    log = AuditLog(blocker / "app.jsonl", flush_interval=0, max_queue=1,
+                   retry_interval=60, put_timeout=0.1)
+    log.record("diabetes", ROW, [0], "v1")  # taken by the writer, which then stalls
+    time.sleep(0.1)
+    log.record("diabetes", ROW, [0], "v1")  # fills the queue
+    with pytest.raises(RuntimeError, match="has not accepted"):
+        log.record("diabetes", ROW, [0], "v1")
+    log.close(timeout=0)
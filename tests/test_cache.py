@@ -0,0 +1,47 @@
+import numpy as np
+
+from mediguard import cache
+from mediguard.registry import ModelRegistry
+
+
+class Counting:
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += len(X)
+        return np.zeros(len(X), dtype=int)
+
+
+def test_lru_evicts_beyond_maxsize():
+    c = cache.PredictionCache([0, 0], maxsize=2)
+    for key in [(1, 1), (2, 2), (3, 3)]:
+        c.put(key, 0)
+    assert c.stats()["size"] == 2
+    c.get((3, 3))
+    c.put((4, 4), 0)
+    assert list(c._data) == [(3, 3), (4, 4)]
+
+
+def test_rows_rounded_to_form_precision_share_an_entry():
+    c = cache.PredictionCache([1, 0], maxsize=8)
+    model = Counting()
+    cached_model = cache.CachedModel(model, c)
+    cached_model.predict([[1.04, 3.0]])
+    cached_model.predict([[1.01, 3.2], [2.0, 3.0]])
+    assert model.calls == 2
+
+
+def test_zero_maxsize_disables_caching():
+    model = Counting()
+    assert cache.cached("diabetes", model, maxsize=0) is model
+
+
+def test_registry_uses_requested_cache_size():
+    registry = ModelRegistry(reload_interval=0, cache_size=7)
+    entry = registry.get("diabetes")
+    assert cache.get_cache("diabetes").maxsize == 7
+    assert cache.get_cache("diabetes").version == entry.version
+    X = np.random.default_rng(0).uniform(0, 100, size=(20, 8))
+    entry.predict(X, 7)
+    assert cache.get_cache("diabetes").stats()["size"] == 7
@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mediguard import ingest
+
+
+@pytest.fixture
+def table_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "TABLE_DIR", tmp_path / "tables")
+    return tmp_path / "tables"
+
+
+def write_csv(path, rows=100, seed=0):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({"id": [f"{i:03d}" for i in range(rows)], "a": rng.normal(size=rows),
+                  "b": rng.integers(0, 9, rows), "note": ["x"] * rows}).to_csv(path, index=False)
+    return path
+
+
+def test_round_trip_keeps_text_ids(tmp_path, table_dir):
+    path = write_csv(tmp_path / "in.csv")
+    table = ingest.load_table(path, {"id": "str"})
+    expected = pd.read_csv(path, dtype={"id": str})
+    assert table.column("id")[0:3].tolist() == ["000", "001", "002"]
+    assert np.allclose(table.matrix(["a", "b"]), expected[["a", "b"]].to_numpy())
+
+
+def test_columns_limit_what_is_cached(tmp_path, table_dir):
+    path = write_csv(tmp_path / "in.csv")
+    table = ingest.load_table(path, columns=["a"])
+    assert table.columns == ("a",)
+    # Asking for another column rebuilds with it.
+    assert "b" in ingest.load_table(path, columns=["a", "b"]).columns
+
+
+def test_rebuilt_when_file_changes(tmp_path, table_dir):
+    path = write_csv(tmp_path / "in.csv", rows=10)
+    assert len(ingest.load_table(path)) == 10
+    write_csv(path, rows=20)
+    assert len(ingest.load_table(path)) == 20
+
+
+def test_prune_evicts_least_recently_used(tmp_path, table_dir):
+    paths = [write_csv(tmp_path / f"in{i}.csv", rows=2000, seed=i) for i in range(3)]
+    tables = [ingest.load_table(p) for p in paths]
+    for i, table in enumerate(tables):
+        os.utime(table.directory, (1000 + i, 1000 + i))
+    one = ingest._size(tables[0].directory)
+    removed = ingest.prune(max_bytes=2 * one)
+    assert removed == [tables[0].directory]
+    assert not tables[0].directory.exists() and tables[2].directory.exists()
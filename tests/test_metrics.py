@@ -0,0 +1,25 @@
+import threading
+import time
+
+from mediguard.metrics import SlowRequestProfiler
+
+
+def test_sections_of_exited_threads_are_pruned(tmp_path):
+    profiler = SlowRequestProfiler(threshold=60, output_dir=tmp_path)
+    thread = threading.Thread(target=profiler.start, args=("rerun",))
+    thread.start()
+    thread.join()
+    deadline = time.monotonic() + 5
+    while profiler._active and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not profiler._active
+
+
+def test_slow_section_is_written(tmp_path):
+    profiler = SlowRequestProfiler(threshold=0.02, output_dir=tmp_path)
+    session = profiler.start("slow")
+    time.sleep(0.05)
+    profiler.finish(session)
+    assert not profiler._active
+    [path] = tmp_path.glob("*-slow-*.folded")
+    assert "test_slow_section_is_written" in path.read_text()
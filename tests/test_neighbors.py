@@ -0,0 +1,39 @@
+import numpy as np
+
+from mediguard import neighbors
+from mediguard.models import load_dataset
+
+
+def test_nearest_case_is_itself():
+    X, y = load_dataset("heart")
+    index = neighbors.NeighborIndex("heart", X.to_numpy(dtype=np.float64), y.to_numpy())
+    distances, rows = index.query(X.iloc[[10, 20]].to_numpy(), k=3)
+    assert rows[:, 0].tolist() == [10, 20]
+    assert np.allclose(distances[:, 0], 0)
+    assert (np.diff(distances, axis=1) >= 0).all()
+
+
+def test_saved_without_pickle_and_reloaded(tmp_path, monkeypatch):
+    monkeypatch.setattr(neighbors, "INDEX_DIR", tmp_path)
+    built = neighbors.load_neighbor_index("heart")
+    with np.load(tmp_path / "heart.npz", allow_pickle=False) as data:
+        assert data["X"].shape == built.X.shape
+    loaded = neighbors.load_neighbor_index("heart")
+    X = built.X[:5] + 0.1
+    assert loaded.similar(X) == built.similar(X)
+
+
+def test_tree_is_restored_not_refitted(tmp_path, monkeypatch):
+    import sklearn.neighbors
+
+    monkeypatch.setattr(neighbors, "INDEX_DIR", tmp_path)
+    built = neighbors.load_neighbor_index("parkinsons")
+
+    class NoFit(sklearn.neighbors.KDTree):
+        def __init__(self, *args, **kwargs):
+            raise AssertionError("tree was rebuilt")
+
+    monkeypatch.setattr(sklearn.neighbors, "KDTree", NoFit)
+    loaded = neighbors.load_neighbor_index("parkinsons")
+    X = built.X[::20] * 1.01
+    np.testing.assert_array_equal(loaded.query(X, 4)[1], built.query(X, 4)[1])
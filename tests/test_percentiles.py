@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from mediguard import ingest, percentiles
+from mediguard.models import DATASET_DIR
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    """A private copy of dataset/heart.csv holding only its first 200 rows."""
+    monkeypatch.setattr(percentiles, "DATASET_DIR", tmp_path)
+    monkeypatch.setattr(ingest, "DATASET_DIR", tmp_path)
+    monkeypatch.setattr(ingest, "TABLE_DIR", tmp_path / "tables")
+    lines = (DATASET_DIR / "heart.csv").read_bytes().splitlines(keepends=True)
+    path = tmp_path / "heart.csv"
+    path.write_bytes(b"".join(lines[:201]))
+    return path, lines[201:]
+
+
+def assert_same(a, b):
+    assert a.classes == b.classes
+    for label in a.classes:
+        np.testing.assert_array_equal(a.sorted_values[label], b.sorted_values[label])
+        np.testing.assert_allclose(a.quantiles[label], b.quantiles[label])
+
+
+def test_append_matches_rebuild(dataset):
+    path, rest = dataset
+    index, how = percentiles.build_index("heart")
+    assert how == "rebuilt"
+    with open(path, "ab") as f:
+        f.write(b"".join(rest))
+    appended, how = percentiles.build_index("heart", index)
+    assert how == "appended"
+    rebuilt, _ = percentiles.build_index("heart")
+    assert_same(appended, rebuilt)
+    assert appended.offset == rebuilt.offset and appended.digest == rebuilt.digest
+
+
+def test_edit_forces_rebuild(dataset):
+    path, _ = dataset
+    index, _ = percentiles.build_index("heart")
+    data = path.read_bytes()
+    path.write_bytes(data.replace(b"\n63,", b"\n64,", 1))
+    assert percentiles.build_index("heart", index)[1] == "rebuilt"
+
+
+def test_unchanged_and_save_round_trip(dataset, tmp_path):
+    index, _ = percentiles.build_index("heart")
+    assert percentiles.build_index("heart", index)[1] == "unchanged"
+    index.save(tmp_path / "heart.npz")
+    loaded = percentiles.PercentileIndex.load("heart", tmp_path / "heart.npz")
+    assert_same(index, loaded)
+    assert percentiles.build_index("heart", loaded)[1] == "unchanged"
+
+
+def test_mid_rank_percentiles():
+    X = np.array([[1.0], [2.0], [2.0], [3.0]])
+    index = percentiles.PercentileIndex.from_arrays("t", ["a"], X, np.zeros(4, dtype=int))
+    ranks = index.percentiles([[2.0], [0.0], [9.0]])[0][:, 0]
+    assert ranks.tolist() == [50.0, 0.0, 100.0]
+
+
+def test_quantiles_match_numpy(dataset):
+    path, rest = dataset
+    index, _ = percentiles.build_index("heart")
+    with open(path, "ab") as f:
+        f.write(b"".join(rest))
+    index, how = percentiles.build_index("heart", index)
+    assert how == "appended"
+    X, y = ingest.dataset_table("heart").frame().pipe(
+        lambda frame: (frame[list(index.columns)].to_numpy(dtype=float), frame["target"].to_numpy()))
+    for label in index.classes:
+        expected = np.quantile(X[y == label], percentiles.QUANTILES, axis=0)
+        np.testing.assert_allclose(index.quantiles[label], expected)
+    summary = index.summary()
+    assert summary[1]["chol"]["p50"] == pytest.approx(np.median(X[y == 1, index.columns.index("chol")]))
+    assert list(summary[0]["age"]) == ["p5", "p25", "p50", "p75", "p95"]
@@ -0,0 +1,78 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mediguard.batch import score_csv
+from mediguard.schema import SCHEMAS, SchemaError
+
+DIABETES = SCHEMAS["diabetes"]
+VALID = {"Pregnancies": 2, "Glucose": 120, "BloodPressure": 70, "SkinThickness": 20,
+         "Insulin": 80, "BMI": 25.0, "DiabetesPedigreeFunction": 0.5, "Age": 40}
+
+
+def test_from_values_orders_columns():
+    X = DIABETES.from_values(dict(reversed(VALID.items())))
+    assert X.tolist() == [list(VALID.values())]
+
+
+@pytest.mark.parametrize("column, value", [
+    ("Glucose", -1), ("Glucose", 501), ("Pregnancies", 1.5), ("BMI", float("nan")),
+])
+def test_out_of_bounds_is_rejected(column, value):
+    with pytest.raises(SchemaError, match=column):
+        DIABETES.from_values(VALID | {column: value})
+
+
+def test_categorical_codes():
+    heart = SCHEMAS["heart"]
+    row = {f.column: f.default if f.default is not None else f.codes[0] for f in heart.fields}
+    heart.from_values(row)
+    with pytest.raises(SchemaError, match="'cp'"):
+        heart.from_values(row | {"cp": 4})
+
+
+def test_missing_column():
+    with pytest.raises(SchemaError, match="Glucose"):
+        DIABETES.from_values({k: v for k, v in VALID.items() if k != "Glucose"})
+
+
+def test_row_errors_marks_only_bad_rows():
+    frame = pd.DataFrame([VALID, VALID | {"Glucose": "abc"}, VALID | {"Age": 200}])
+    X = DIABETES.from_frame(frame, coerce=True)
+    errors = DIABETES.row_errors(X)
+    assert errors[0] == ""
+    assert "'Glucose' missing or not a number" in errors[1]
+    assert "'Age'=200" in errors[2]
+
+
+def test_batch_marks_invalid_rows_and_keeps_going():
+    rows = [VALID, VALID | {"Glucose": "abc"}, VALID, VALID | {"Age": -3}, VALID]
+    src = io.StringIO(pd.DataFrame(rows).to_csv(index=False))
+    dst = io.StringIO()
+    assert score_csv("diabetes", src, dst, chunk_size=2) == (5, 2)
+    dst.seek(0)
+    out = pd.read_csv(dst, keep_default_na=False)
+    assert len(out) == 5
+    assert (out["error"] != "").tolist() == [False, True, False, True, False]
+    assert (out["prediction"] == "").tolist() == [False, True, False, True, False]
+    assert np.isin(out["prediction"][out["error"] == ""].astype(int), [0, 1]).all()
+
+
+@pytest.mark.parametrize("table_cache", [True, False])
+def test_batch_keeps_zero_padded_ids_across_chunks(tmp_path, monkeypatch, table_cache):
+    from mediguard import batch, ingest
+
+    monkeypatch.setattr(ingest, "TABLE_DIR", tmp_path / "tables")
+    ids = ["001", "002", "003", "004", "A05", "006", "007"]
+    frame = pd.DataFrame([VALID | {"patient": i} for i in ids])
+    src = tmp_path / "in.csv"
+    frame.to_csv(src, index=False)
+    dst = tmp_path / "out.csv"
+    args = ["diabetes", str(src), str(dst), "--chunk-size", "3", "--id-column", "patient"]
+    batch.main(args + ([] if table_cache else ["--no-cache"]))
+    out = pd.read_csv(dst, dtype={"patient": str})
+    assert out["patient"].tolist() == ids
+    with open(dst) as f:
+        assert [line.split(",")[0] for line in f.read().splitlines()[1:]] == ids
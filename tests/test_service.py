@@ -0,0 +1,55 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from mediguard.service import InferenceServer
+
+RECORD = {"Pregnancies": 2, "Glucose": 120, "BloodPressure": 70, "SkinThickness": 20,
+          "Insulin": 80, "BMI": 25.0, "DiabetesPedigreeFunction": 0.5, "Age": 40}
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEDIGUARD_AUDIT_DIR", str(tmp_path / "audit"))
+    monkeypatch.setenv("MEDIGUARD_DRIFT_DIR", str(tmp_path / "drift"))
+    server = InferenceServer(("127.0.0.1", 0), max_wait=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, payload):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{server.server_port}/predict/diabetes",
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_bad_neighbors_option_is_rejected(server):
+    status, body = post(server, {"features": RECORD, "neighbors": "many"})
+    assert status == 400 and body["error"]
+    status, body = post(server, {"features": RECORD, "neighbors": -1})
+    assert status == 400 and "neighbors" in body["error"]
+
+
+def test_failing_index_load_is_reported(server, monkeypatch):
+    def fail(name):
+        raise OSError("disk unavailable")
+
+    monkeypatch.setattr(server, "percentile_index", fail)
+    status, body = post(server, {"features": RECORD, "percentiles": True})
+    assert status == 500
+    assert "disk unavailable" in body["error"]
+    status, body = post(server, {"features": RECORD})
+    assert status == 200 and body["predictions"] in ([0], [1])
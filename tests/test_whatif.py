@@ -0,0 +1,41 @@
+import numpy as np
+
+from mediguard import whatif
+from mediguard.models import get_spec
+from mediguard.scorer import LinearScorer
+
+
+class Counting(LinearScorer):
+    calls = 0
+
+    def decision_function(self, X):
+        self.calls += 1
+        return super().decision_function(X)
+
+
+def make_model():
+    features = get_spec("diabetes").features
+    coef = np.zeros(len(features))
+    coef[features.index("Glucose")] = 0.05
+    return Counting(coef, -6.0, [0, 1], features, "t")
+
+
+def test_sweep_scores_once_and_labels_match_predict():
+    model = make_model()
+    row = np.array([2, 120, 70, 20, 80, 25.0, 0.5, 40])
+    result = whatif.sweep("diabetes", model, "t1", row, ["Glucose", "BMI"], resolution=11)
+    assert model.calls == 1
+    grid = whatif.build_grid(row, [1, 5], result.axes)
+    assert (result.predictions.ravel() == model.predict(grid)).all()
+    # The boundary sits at Glucose = 120.
+    glucose = result.axes[0]
+    assert (result.predictions[glucose > 120] == 1).all()
+    assert (result.predictions[glucose <= 120] == 0).all()
+
+
+def test_repeat_sweep_is_cached():
+    model = make_model()
+    row = np.array([1, 100, 70, 20, 80, 30.0, 0.3, 50])
+    first = whatif.sweep("diabetes", model, "t2", row, ["Age"], resolution=5)
+    assert whatif.sweep("diabetes", model, "t2", row, ["Age"], resolution=5) is first
+    assert model.calls == 1